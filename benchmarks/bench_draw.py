@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""抽奖延迟基准测试
+
+随名单规模（默认 1千 到 1千万）测量每轮抽取的耗时，用于验证抽奖延迟不随总人数增长。
+
+用法:
+    python benchmarks/bench_draw.py
+    python benchmarks/bench_draw.py --sizes 1000 100000 --winners 500
+    python benchmarks/bench_draw.py --backend columnar --memory
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.columnar_pool import ColumnarPool
+from src.models.participant_pool import ParticipantPool
+
+BACKENDS = {"list": ParticipantPool, "columnar": ColumnarPool}
+
+DEPARTMENTS = ["技术部", "市场部", "财务部", "人事部", "运营部"]
+
+
+def build_pool(backend: str, size: int):
+    """构造指定规模的参与者池（部门与姓名复用少量字符串以节省内存）"""
+    names = [f"员工{i}" for i in range(1000)]
+    pool = BACKENDS[backend]()
+    pool.extend((DEPARTMENTS[i % len(DEPARTMENTS)], names[i % 1000]) for i in range(size))
+    pool.ids()  # 列式后端在首次查询时合并暂存数据
+    return pool
+
+
+def bench(backend: str, size: int, winners: int, repeat: int, memory: bool):
+    """返回抽取 winners 人的中位耗时（毫秒）和参与者池占用内存（MB）"""
+    if memory:
+        tracemalloc.start()
+    pool = build_pool(backend, size)
+    pool_mb = None
+    if memory:
+        pool_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+        tracemalloc.stop()
+    timings = []
+    for _ in range(repeat):
+        if len(pool) < winners:
+            pool.reset()
+        start = time.perf_counter()
+        ids = pool.take(winners)
+        [pool.get(pid) for pid in ids]
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), pool_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽奖延迟基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--winners", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="list")
+    parser.add_argument("--memory", action="store_true", help="同时统计参与者池内存占用（较慢）")
+    args = parser.parse_args()
+
+    print(f"{'roster':>12} {'winners':>8} {'draw ms (median)':>18} {'pool MB':>10}")
+    for size in args.sizes:
+        winners = min(args.winners, size)
+        elapsed, pool_mb = bench(args.backend, size, winners, args.repeat, args.memory)
+        memory = f"{pool_mb:.1f}" if pool_mb is not None else "-"
+        print(f"{size:>12,} {winners:>8} {elapsed:>18.3f} {memory:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""抽奖展示容器帧耗时基准测试
+
+在无窗口环境（QT_QPA_PLATFORM=offscreen）下连续刷新 DrawContainer，
+统计每帧耗时，并检查卡片控件（WinnerCard）路径在稳定状态下是否新建了卡片控件。
+默认依次测试 widgets 和 canvas 两种绘制模式；auto 模式下 40 张及以上的卡片
+会改用 CardCanvas 绘制，不经过卡片池。
+
+用法:
+    python benchmarks/bench_draw_container.py
+    python benchmarks/bench_draw_container.py --cards 40 --frames 300 --mode widgets
+    python benchmarks/bench_draw_container.py --cards 300 --mode canvas
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from src.gui.widgets import DrawContainer
+
+DEPARTMENTS = ["技术部", "市场部", "财务部", "人事部", "运营部"]
+
+
+def run(app, mode, cards, frames):
+    """以指定绘制模式连续刷新展示容器
+
+    Returns:
+        (每帧耗时列表, 预热时创建的卡片数, 之后新建的卡片数, 是否使用卡片控件)
+    """
+    container = DrawContainer(render_mode=mode)
+    container.resize(1000, 800)
+    container.show()
+
+    def frame():
+        return [(random.choice(DEPARTMENTS), f"员工{random.randint(1, 99999)}") for _ in range(cards)]
+
+    # 第一帧建立卡片池
+    container.update_display(frame())
+    app.processEvents()
+    created_after_warmup = container.cards_created
+    uses_widgets = not container._use_canvas(cards)
+
+    timings = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        container.update_display(frame())
+        app.processEvents()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    container.show_winners(frame())
+    app.processEvents()
+    container.close()
+
+    timings.sort()
+    return timings, created_after_warmup, container.cards_created - created_after_warmup, uses_widgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽奖展示容器帧耗时基准测试")
+    parser.add_argument("--cards", type=int, default=40)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--mode", choices=["both", "auto", "widgets", "canvas"], default="both",
+                        help="绘制模式，默认 both 依次测试 widgets 和 canvas")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    modes = ["widgets", "canvas"] if args.mode == "both" else [args.mode]
+    ok = True
+    for mode in modes:
+        timings, created_after_warmup, new_cards, uses_widgets = run(app, mode, args.cards, args.frames)
+        print(f"cards per frame:   {args.cards} ({mode}, {'widgets' if uses_widgets else 'canvas'} path)")
+        print(f"frame p50:         {statistics.median(timings):.2f} ms")
+        print(f"frame p99:         {timings[int(len(timings) * 0.99) - 1]:.2f} ms")
+        if uses_widgets:
+            # 卡片池只在卡片控件路径上存在，绘制模式不创建控件，检查无意义
+            print(f"cards created:     {created_after_warmup} (warm-up), {new_cards} (steady state + reveal)")
+            ok = ok and created_after_warmup > 0 and new_cards == 0
+        else:
+            print("cards created:     n/a (canvas path draws cards without widgets)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
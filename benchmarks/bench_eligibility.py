@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""排除规则基准测试
+
+用 bench_model 的合成名单（默认 200万人），从中随机取 10万人写成排除名单，测量:
+    ExclusionList.keys[parse]     解析排除名单（首次编译时）
+    compile                       编译为参与者ID位图（排除名单已解析；从名单缓存打开时含载入身份键）
+    compile[cached]               名单和排除名单都未变时再次编译（两轮之间、重置抽奖时）
+    set_exclusion                 编译并从剩余池移除全部被排除者
+    set_exclusion[release]        撤销排除，被排除者回到剩余池
+    WeightedPool.remove_many      加权参与者池移除全部被排除者
+    IdSet.union / intersection    两个排除位图的并集和交集
+
+用法:
+    python benchmarks/bench_eligibility.py
+    python benchmarks/bench_eligibility.py --size 100000 --excluded 5000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_model import generate_roster, roster_path  # noqa: E402
+
+
+def write_exclusion_list(path: str, roster: str, count: int, seed: int) -> None:
+    """从名单中随机取 count 行写成排除名单，已存在时直接复用"""
+    if os.path.exists(path):
+        return
+    with open(roster, encoding='utf-8') as f:
+        header = f.readline()
+        lines = f.readlines()
+    chosen = random.Random(seed).sample(range(len(lines)), min(count, len(lines)))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(header)
+        f.writelines(lines[index] for index in chosen)
+    os.replace(tmp_path, path)
+
+
+def elapsed_ms(func) -> float:
+    """执行一次 func，返回耗时（毫秒）"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="排除规则基准测试")
+    parser.add_argument("--size", type=int, default=2_000_000, help="名单人数")
+    parser.add_argument("--excluded", type=int, default=100_000, help="排除名单人数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "lucky_draw_bench"),
+                        help="合成名单目录，名单会被复用")
+    args = parser.parse_args()
+
+    from src.models.eligibility import ExclusionList, IdSet
+    from src.models.lucky_draw_model import LuckyDrawModel
+    from src.models.weighted_pool import WeightedPool
+
+    path = roster_path(args.work_dir, args.size, args.seed)
+    generate_roster(path, args.size, args.seed)
+    exclusion_path = os.path.join(os.path.dirname(path), f"exclude_{args.excluded}.csv")
+    write_exclusion_list(exclusion_path, path, args.excluded, args.seed)
+
+    journal_dir = tempfile.mkdtemp()
+    model = LuckyDrawModel(path, os.path.join(journal_dir, "journal.jsonl"),
+                           history_path=os.path.join(journal_dir, "history.sqlite3"))
+    print(f"{model.pool.total:,} 人（{type(model.pool).__name__}），排除名单 {args.excluded:,} 人")
+
+    rule = ExclusionList(exclusion_path)
+    results = {
+        "ExclusionList.keys[parse]": elapsed_ms(rule.keys),
+        "compile": elapsed_ms(lambda: rule.compile(model.identity, model.history)),
+        "compile[cached]": elapsed_ms(lambda: rule.compile(model.identity, model.history)),
+        "set_exclusion": elapsed_ms(lambda: model.set_exclusion(rule)),
+    }
+    excluded = model.excluded
+    remaining = len(model.pool)
+    results["set_exclusion[release]"] = elapsed_ms(lambda: model.set_exclusion(None))
+
+    ids = excluded.ids()
+    weighted = WeightedPool(model.pool, [1.0] * model.pool.total)
+    results["WeightedPool.remove_many"] = elapsed_ms(lambda: weighted.remove_many(ids))
+
+    other = IdSet.from_ids(random.Random(args.seed + 1).sample(range(model.pool.total), len(ids)))
+    results["IdSet.union"] = elapsed_ms(lambda: excluded | other)
+    results["IdSet.intersection"] = elapsed_ms(lambda: excluded & other)
+    model.close()
+
+    print(f"排除 {len(excluded):,} 人，剩余 {remaining:,} 人")
+    for name, ms in results.items():
+        print(f"  {name:<28} {ms:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
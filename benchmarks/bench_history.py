@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""抽奖历史库基准测试
+
+构造多年的抽奖历史（默认 260 次活动、每次 10 轮共 1000 名获奖者、5万名参与者），
+测量写入一轮的事务耗时，以及常用查询的耗时：
+    has_won                  某人最近 3 次活动是否中过奖
+    winners_per_department   单次活动 / 全部历史的各部门获奖人数
+    audit                    单次活动的完整抽奖记录
+
+历史库会被复用，再次运行时不重新构造。
+
+用法:
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --events 1000 --winners 2000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.history_store import HistoryStore
+from src.models.identity_index import IdentityIndex
+
+DEPARTMENTS = ["技术部", "市场部", "销售部", "人事部", "财务部", "行政部", "客服部", "研发中心"]
+
+
+def person(index: int):
+    """第 index 位合成参与者: (部门, 姓名, 工号)"""
+    return DEPARTMENTS[index % len(DEPARTMENTS)], f"员工{index}", f"E{index:06d}"
+
+
+def build_history(store: HistoryStore, events: int, rounds: int, winners: int, people: int,
+                  rng: random.Random) -> None:
+    """写入 events 次活动，每次 rounds 轮、共 winners 名获奖者"""
+    identity = IdentityIndex()
+    per_round = max(winners // rounds, 1)
+    for _ in range(events):
+        event_id = store.start_event("roster.csv", people, "merge")
+        chosen = rng.sample(range(people), per_round * rounds)
+        records = []
+        for round_num in range(1, rounds + 1):
+            round_winners = []
+            for index in chosen[(round_num - 1) * per_round:round_num * per_round]:
+                department, name, key = identity.prepare(*person(index))
+                round_winners.append((index, key, department, name))
+            records.append((round_num, round_winners))
+        store.record_rounds(event_id, records)
+        store.end_event(event_id)
+
+
+def measure(fn, repeat: int) -> float:
+    """重复执行 fn，返回耗时中位数（毫秒）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽奖历史库基准测试")
+    parser.add_argument("--events", type=int, default=260, help="活动次数（每周一次约5年）")
+    parser.add_argument("--rounds", type=int, default=10, help="每次活动的轮数")
+    parser.add_argument("--winners", type=int, default=1000, help="每次活动的获奖人数")
+    parser.add_argument("--people", type=int, default=50_000, help="参与者人数")
+    parser.add_argument("--repeat", type=int, default=50, help="每个查询的重复次数，取中位数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "lucky_draw_bench"),
+                        help="历史库目录，历史库会被复用")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    path = os.path.join(args.work_dir, f"history_{args.events}_{args.rounds}_{args.winners}_"
+                                       f"{args.people}_{args.seed}.sqlite3")
+    store = HistoryStore(path)
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        build_history(store, args.events, args.rounds, args.winners, args.people, rng)
+        print(f"构造历史库 {time.perf_counter() - start:.1f} s: {path}")
+
+    events = store.events(1)
+    last_event = events[0]["id"]
+    print(f"{last_event:,} 次活动，{last_event * args.winners:,} 条获奖记录，"
+          f"{os.path.getsize(path) / 2 ** 20:.1f} MB")
+
+    # 写入耗时在单独的历史库中测量，不改变复用的历史库
+    scratch = HistoryStore(os.path.join(tempfile.mkdtemp(), "history.sqlite3"))
+    identity = IdentityIndex()
+    event_id = scratch.start_event("roster.csv", args.people, "merge")
+    round_nums = iter(range(1, args.repeat + 1))
+
+    def write_round():
+        round_winners = []
+        for index in rng.sample(range(args.people), 100):
+            department, name, key = identity.prepare(*person(index))
+            round_winners.append((index, key, department, name))
+        scratch.record_rounds(event_id, [(next(round_nums), round_winners)])
+
+    people = iter([person(rng.randrange(args.people)) for _ in range(args.repeat)])
+    results = {
+        "record_rounds[100]": measure(write_round, args.repeat),
+        "has_won[3 events]": measure(lambda: store.has_won(*next(people)), args.repeat),
+        "winners_per_department[event]": measure(lambda: store.winners_per_department(last_event),
+                                                 args.repeat),
+        "winners_per_department[all]": measure(store.winners_per_department, args.repeat),
+        "audit[event]": measure(lambda: store.audit(last_event), args.repeat),
+        "events[20]": measure(store.events, args.repeat),
+    }
+    scratch.close()
+    store.close()
+
+    for name, ms in results.items():
+        print(f"  {name:<32} {ms:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
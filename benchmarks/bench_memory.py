@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""参与者存储的内存基准测试
+
+用 bench_model 的合成名单，比较各种参与者存储方式每人占用的字节数（tracemalloc 统计，
+包括 numpy 数组）:
+    list[tuple]        最初的实现：(部门, 姓名) 元组列表，外加一份剩余名单副本
+    ParticipantPool    紧凑的纯 Python 实现：部门编码 array('H')、姓名UTF-8缓冲区加偏移数组
+    ColumnarPool       numpy 列式实现（需要 numpy）
+    WeightedPool       包装 ParticipantPool 后权重和树状数组的额外开销
+
+每种方式在独立进程中测量，互不影响。
+
+用法:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --sizes 100000 1000000 --json memory.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_model import generate_roster, roster_path  # noqa: E402
+
+LAYOUTS = ["list[tuple]", "ParticipantPool", "ColumnarPool", "WeightedPool"]
+
+
+def build(layout: str, path: str):
+    """按 layout 从名单构建参与者存储，返回需要保持存活的对象"""
+    from src.models.roster_loader import iter_roster
+
+    if layout == "list[tuple]":
+        participants = [(department, name) for department, name in iter_roster(path)]
+        return participants, participants.copy()
+    if layout == "ParticipantPool":
+        from src.models.participant_pool import ParticipantPool
+        pool = ParticipantPool()
+        pool.extend(iter_roster(path))
+        return pool
+    if layout == "ColumnarPool":
+        from src.models.columnar_pool import ColumnarPool
+        pool = ColumnarPool()
+        pool.extend(iter_roster(path))
+        pool.ids()  # 合并暂存的行
+        return pool
+    raise ValueError(layout)
+
+
+def run_child(layout: str, path: str) -> dict:
+    """在当前进程中测量一种存储方式"""
+    if layout == "WeightedPool":
+        # 只统计权重部分：先建好被包装的参与者池
+        pool = build("ParticipantPool", path)
+        gc.collect()
+        tracemalloc.start()
+        from src.models.weighted_pool import WeightedPool
+        weighted = WeightedPool(pool, [1.0] * pool.total)
+        rows = pool.total
+    else:
+        gc.collect()
+        tracemalloc.start()
+        weighted = build(layout, path)
+        rows = (len(weighted[0]) if layout == "list[tuple]" else weighted.total)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"rows": rows, "bytes": current, "peak_bytes": peak,
+            "bytes_per_participant": current / rows if rows else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="参与者存储的内存基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--layouts", nargs="+", default=LAYOUTS, choices=LAYOUTS)
+    parser.add_argument("--seed", type=int, default=0, help="合成名单的随机种子")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "lucky_draw_bench"),
+                        help="合成名单目录，名单会被复用")
+    parser.add_argument("--json", help="把结果写入JSON文件")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    results = {}
+    for size in args.sizes:
+        path = roster_path(args.work_dir, size, args.seed)
+        generate_roster(path, size, args.seed)
+        print(f"{size:,} 人")
+        results[str(size)] = {}
+        for layout in args.layouts:
+            child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", layout, path],
+                                   capture_output=True, text=True)
+            if child.returncode != 0:
+                # 例如未安装 numpy 时跳过 ColumnarPool
+                print(f"  {layout:<16} 跳过: {child.stderr.strip().splitlines()[-1]}")
+                continue
+            value = json.loads(child.stdout.strip().splitlines()[-1])
+            results[str(size)][layout] = value
+            print(f"  {layout:<16} {value['bytes_per_participant']:8.1f} 字节/人  "
+                  f"共 {value['bytes'] / 2 ** 20:8.1f} MB  峰值 {value['peak_bytes'] / 2 ** 20:8.1f} MB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""抽奖模型基准测试
+
+生成合成名单（部门人数按 Zipf 分布倾斜、常见姓氏加权的中文姓名），
+对每个规模在独立进程中测量 LuckyDrawModel 的主要操作:
+    load_participants             流式解析名单（不使用缓存）
+    roster_cache.write            大名单写入二进制缓存
+    load_participants[cached]     从二进制缓存打开大名单
+    draw[k]                       抽取 k 人（含日志 fsync），取中位数
+    get_random_names[k]           动画取帧，首帧（含窗口填充）与稳定状态中位数
+    save_results                  提交 1000 人结果并等待后台写入完成
+    reset                         重置抽奖状态
+每项记录耗时（毫秒）以及该操作使进程峰值内存（ru_maxrss）增加的量。
+
+结果为 JSON，可用 --baseline 与之前的结果比较，任一耗时变慢超过 --tolerance
+（且绝对差值超过 --min-ms）即以退出码 1 结束。
+
+用法:
+    python benchmarks/bench_model.py
+    python benchmarks/bench_model.py --sizes 1000 100000 --json model.json
+    python benchmarks/bench_model.py --baseline model.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DRAW_SIZES = [1, 10, 100, 1000]
+FRAME_SIZES = [10, 100]
+
+# 常见姓氏（大致按人口比例加权）
+SURNAMES = ("王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢"
+            "姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤")
+GIVEN_CHARS = ("伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英华建国建华志强文斌海燕玉兰红梅晓东丹鹏辉"
+               "飞鑫宇浩然子轩梓涵欣怡一诺雨泽思远佳琪俊杰博文嘉怡子豪晨阳雅婷")
+DEPARTMENTS = ["技术部", "产品部", "市场部", "销售部", "运营部", "财务部", "人事部", "法务部", "行政部", "采购部",
+               "客服部", "质量部", "研发一部", "研发二部", "研发三部", "数据部", "安全部", "设计部", "品牌部", "战略部",
+               "投资部", "审计部", "公关部", "培训部", "物流部", "供应链部", "海外事业部", "华东大区", "华南大区", "华北大区"]
+
+
+def roster_path(work_dir: str, size: int, seed: int) -> str:
+    """合成名单路径；结果输出目录（名单目录的 ../../output）落在 work_dir 内"""
+    return os.path.join(work_dir, "rosters", f"{size}_{seed}_v2", "roster.csv")
+
+
+def generate_roster(path: str, size: int, seed: int) -> None:
+    """生成合成名单，已存在时直接复用
+
+    随机姓名在同一部门内会重名，因此带上 employee_id 列，保证每行都是不同的参与者。
+    """
+    if os.path.exists(path):
+        return
+    rng = random.Random(seed)
+    department_weights = [1 / (rank + 1) for rank in range(len(DEPARTMENTS))]
+    surname_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(SURNAMES))]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write("employee_id,department,name\n")
+        remaining = size
+        while remaining:
+            batch = min(remaining, 100_000)
+            departments = rng.choices(DEPARTMENTS, department_weights, k=batch)
+            surnames = rng.choices(SURNAMES, surname_weights, k=batch)
+            given = "".join(rng.choices(GIVEN_CHARS, k=batch * 2))
+            lengths = rng.choices((1, 2), (3, 7), k=batch)
+            first = size - remaining
+            f.writelines(f"E{first + i:08d},{departments[i]},{surnames[i]}{given[2 * i:2 * i + lengths[i]]}\n"
+                         for i in range(batch))
+            remaining -= batch
+    os.replace(tmp_path, path)
+
+
+def peak_rss_mb() -> float:
+    """进程峰值常驻内存（MB），Linux 下 ru_maxrss 单位为 KB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != "darwin" else peak / 1024 / 1024
+
+
+def measure(results: dict, key: str, func, repeat: int = 1) -> None:
+    """执行 func repeat 次，记录中位耗时和峰值内存增量"""
+    peak_before = peak_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    results[key] = {"ms": statistics.median(timings), "peak_mb": peak_rss_mb() - peak_before}
+
+
+def run_child(path: str, repeat: int) -> dict:
+    """在当前进程中对一个名单执行全部测量"""
+    from src.models.lucky_draw_model import LuckyDrawModel
+
+    with tempfile.TemporaryDirectory() as journal_dir:
+        model = LuckyDrawModel(path, os.path.join(journal_dir, "journal.jsonl"), load=False, use_cache=False,
+                               history_path=os.path.join(journal_dir, "history.sqlite3"))
+        results = {}
+        measure(results, "load_participants", model.load_participants)
+        if type(model.pool).__name__ == "ColumnarPool":
+            measure(results, "roster_cache.write", lambda: model._write_roster_cache(
+                model.csv_path, model.pool, model.load_report, model.identity, None))
+            model.use_cache = True
+            measure(results, "load_participants[cached]", model.load_participants)
+        # 日志是新建的，无需回放，只开始一个会话
+        model.journal.record_roster(path, model.pool.total, model.identity.policy)
+        model.loaded = True
+        results["pool"] = type(model.pool).__name__
+        results["rows"] = model.pool.total
+
+        for count in DRAW_SIZES:
+            if count * repeat <= model.pool.total:
+                measure(results, f"draw[{count}]", lambda: model.draw(count), repeat)
+
+        for count in FRAME_SIZES:
+            model.animation.reset()
+            measure(results, f"get_random_names[{count}].first", lambda: model.get_random_names(count))
+            measure(results, f"get_random_names[{count}]", lambda: model.get_random_names(count), 200)
+
+        winners = model.winners[:1000]
+
+        def save():
+            model.save_results(winners)
+            model.writer.flush()
+
+        measure(results, "save_results", save, repeat)
+        measure(results, "reset", model.reset, repeat)
+        model.close()
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_ms: float) -> bool:
+    """打印与基准的对比，返回是否存在回退"""
+    regressed = False
+    print(f"与基准比较（允许慢 {tolerance:.0%}，忽略小于 {min_ms} ms 的差值）:")
+    for size, ops in results["sizes"].items():
+        base_ops = baseline.get("sizes", {}).get(size, {})
+        for op, value in ops.items():
+            if not isinstance(value, dict) or op not in base_ops:
+                continue
+            old, new = base_ops[op]["ms"], value["ms"]
+            change = new / old - 1 if old else 0.0
+            slower = change > tolerance and new - old > min_ms
+            regressed = regressed or slower
+            print(f"  {size:>10} {op:<28} {old:10.3f} -> {new:10.3f} ms ({change:+.0%}){'  回退' if slower else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抽奖模型基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5, help="draw/save/reset 的重复次数，取中位数")
+    parser.add_argument("--seed", type=int, default=0, help="合成名单的随机种子")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "lucky_draw_bench"),
+                        help="合成名单和输出文件目录，名单会被复用")
+    parser.add_argument("--json", help="把结果写入JSON文件")
+    parser.add_argument("--baseline", help="与之前保存的JSON结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许比基准慢的比例")
+    parser.add_argument("--min-ms", type=float, default=0.5, help="忽略小于该值的绝对差值（毫秒）")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.repeat)))
+        return
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "sizes": {},
+    }
+    for size in args.sizes:
+        path = roster_path(args.work_dir, size, args.seed)
+        start = time.perf_counter()
+        generate_roster(path, size, args.seed)
+        generated_s = time.perf_counter() - start
+        if generated_s > 1:
+            print(f"已生成 {size:,} 人名单（{generated_s:.1f} s）: {path}", file=sys.stderr)
+
+        # 每个规模在独立进程中测量，峰值内存互不影响
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path,
+                                "--repeat", str(args.repeat)],
+                               capture_output=True, text=True)
+        if child.returncode != 0:
+            print(child.stderr, file=sys.stderr)
+            sys.exit(child.returncode)
+        ops = json.loads(child.stdout.strip().splitlines()[-1])
+        results["sizes"][str(size)] = ops
+
+        print(f"{size:,} 人（{ops['pool']}，峰值内存 {ops['peak_rss_mb']:.1f} MB）")
+        for op, value in ops.items():
+            if isinstance(value, dict):
+                print(f"  {op:<28} {value['ms']:10.3f} ms  {value['peak_mb']:+8.1f} MB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance, args.min_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
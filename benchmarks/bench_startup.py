@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""启动耗时基准测试
+
+每次测量都启动一个新的 Python 进程（冷启动），包括:
+    1. python -X importtime 导入主窗口模块，汇总总导入耗时和最慢的模块
+    2. QT_QPA_PLATFORM=offscreen 下从进程启动到主窗口首次绘制（first_paint），
+       以及到名单解析完成（ready）的时间
+    3. 命令行抽奖模式的导入耗时，并检查是否误导入了 PyQt5
+    4. 从进程启动到 main.py draw 完成一轮抽奖并退出的总耗时（cli_draw）
+
+多次测量取中位数。指定 --baseline 时与之前保存的结果比较，
+任一指标变慢超过 --tolerance 即以退出码 1 结束，可用于发现启动耗时回退。
+
+用法:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --save startup_baseline.json
+    python benchmarks/bench_startup.py --baseline startup_baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程中测量首次绘制时间的脚本；t0 取自父进程传入的启动时刻
+FIRST_PAINT_SCRIPT = r"""
+import os, sys, time
+t0 = float(sys.argv[1])
+sys.path.insert(0, os.getcwd())
+from PyQt5.QtCore import QObject, QEvent, QTimer
+from PyQt5.QtWidgets import QApplication
+from src.gui.main_window import MainWindow
+imported = time.time()
+
+app = QApplication(sys.argv[:1])
+window = MainWindow()
+marks = {}
+
+class PaintWatcher(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and "first_paint" not in marks:
+            marks["first_paint"] = time.time()
+        return False
+
+def poll():
+    if window.model.loaded and "first_paint" in marks:
+        marks["ready"] = time.time()
+        app.quit()
+
+watcher = PaintWatcher()
+window.installEventFilter(watcher)
+timer = QTimer()
+timer.timeout.connect(poll)
+timer.start(1)
+window.show()
+app.exec_()
+print("{} {} {}".format((imported - t0) * 1000, (marks["first_paint"] - t0) * 1000, (marks["ready"] - t0) * 1000))
+"""
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出
+
+    Returns:
+        (总导入耗时毫秒, [(带缩进的模块名, 累计耗时毫秒), ...])
+    """
+    modules = []
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = line.replace("import time:", "|", 1).split("|")
+        total_us += int(self_us)
+        # 模块名前的缩进表示被谁导入，保留以便区分顶层导入
+        modules.append((name[1:].rstrip(), int(cumulative_us) / 1000))
+    return total_us / 1000, modules
+
+
+def measure_importtime(statement):
+    """在新进程中执行 statement 并返回导入耗时汇总"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, QT_QPA_PLATFORM="offscreen"))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def measure_first_paint():
+    """在新进程中测量导入完成、首次绘制和名单就绪的时间（毫秒）"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    t0 = time.time()
+    result = subprocess.run([sys.executable, "-c", FIRST_PAINT_SCRIPT, str(t0)],
+                            cwd=ROOT, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    imported, first_paint, ready = (float(value) for value in result.stdout.split())
+    return imported, first_paint, ready
+
+
+def measure_cli_draw():
+    """在新进程中用 main.py draw 对示例名单抽一轮，返回从启动到退出的耗时（毫秒）"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        command = [sys.executable, os.path.join(ROOT, "main.py"), "draw",
+                   "--roster", os.path.join(ROOT, "data", "participants.csv"), "--rounds", "1", "--seed", "1",
+                   "--output-dir", work_dir, "-o", os.path.join(work_dir, "winners.csv")]
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=work_dir, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="测量次数，取中位数")
+    parser.add_argument("--top", type=int, default=10, help="列出累计导入耗时最长的模块数")
+    parser.add_argument("--save", help="把结果保存为JSON，作为以后比较的基准")
+    parser.add_argument("--baseline", help="与之前保存的JSON结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="允许比基准慢的比例，默认 0.25")
+    args = parser.parse_args()
+
+    gui_imports, cli_imports, cli_draws, imported, first_paint, ready = [], [], [], [], [], []
+    modules = []
+    cli_modules = []
+    for _ in range(args.repeat):
+        total, modules = measure_importtime("import src.gui.main_window")
+        gui_imports.append(total)
+        total, cli_modules = measure_importtime("import src.cli, src.models.lucky_draw_model")
+        cli_imports.append(total)
+        cli_draws.append(measure_cli_draw())
+        timings = measure_first_paint()
+        imported.append(timings[0])
+        first_paint.append(timings[1])
+        ready.append(timings[2])
+
+    results = {
+        "gui_import_ms": statistics.median(gui_imports),
+        "cli_import_ms": statistics.median(cli_imports),
+        "cli_draw_ms": statistics.median(cli_draws),
+        "window_import_ms": statistics.median(imported),
+        "first_paint_ms": statistics.median(first_paint),
+        "ready_ms": statistics.median(ready),
+    }
+
+    print(f"测量 {args.repeat} 次，取中位数")
+    for key, value in results.items():
+        print(f"  {key:<18} {value:8.1f} ms")
+    print("主窗口模块直接导入的模块，按累计耗时排序（最后一次测量）:")
+    direct = [(name.strip(), cumulative) for name, cumulative in modules
+              if len(name) - len(name.lstrip()) == 2]
+    for name, cumulative in sorted(direct, key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40} {cumulative:8.1f} ms")
+
+    failed = False
+    heavy = [name.strip() for name, _ in cli_modules if name.strip().split('.')[0] in ("PyQt5", "pandas")]
+    if heavy:
+        print(f"命令行模式导入了不需要的模块: {', '.join(sorted(set(heavy)))}")
+        failed = True
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"与基准 {args.baseline} 比较（允许慢 {args.tolerance:.0%}）:")
+        for key, value in results.items():
+            if key not in baseline:
+                continue
+            change = value / baseline[key] - 1 if baseline[key] else 0.0
+            regressed = change > args.tolerance
+            failed = failed or regressed
+            print(f"  {key:<18} {baseline[key]:8.1f} -> {value:8.1f} ms ({change:+.0%}){'  回退' if regressed else ''}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"结果已保存到 {args.save}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
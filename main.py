@@ -3,12 +3,16 @@
 
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QIcon, QFontDatabase
-from src.gui.main_window import MainWindow
+
+# 命令行模式下的子命令，不加载 PyQt5
+CLI_COMMANDS = ("draw", "history")
 
 def main():
     """程序入口函数"""
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QIcon, QFontDatabase
+    from src.gui.main_window import MainWindow
+    
     # 创建应用程序
     app = QApplication(sys.argv)
     
@@ -31,6 +35,17 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # 打包后的程序中，解析名单的工作进程会重新执行入口，须先交给 multiprocessing 处理；
+        # 未打包时不导入 multiprocessing，以免拖慢启动
+        import multiprocessing
+        multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS + ("-h", "--help"):
+        # 无界面模式：路径参数按调用时的工作目录解析
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
     # 确保当前工作目录正确
     script_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(script_dir)
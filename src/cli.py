@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""无界面的命令行抽奖
+
+用法:
+    python main.py draw --roster data/participants.csv --rounds 5x20 --seed 42
+    python main.py draw --roster sites/*.csv extra.xlsx --rounds 3x10 -o winners.csv
+    python main.py draw --roster data/participants.csv --rounds 1x3 --exclude on_leave.csv --exclude-winners 3
+    python main.py history --db output/history.sqlite3 --audit 12
+
+只依赖 LuckyDrawModel，不导入 PyQt5；numpy 仅在名单较大时才会加载，
+可在没有显示器的服务器上运行。结果按 round,department,name 写为CSV，
+默认输出到标准输出；指定多个名单时增加 source 列（参与者首次出现的名单文件）。
+抽奖日志、历史库和名单缓存写入 --output-dir（默认为当前目录下的 output）；
+未指定 -o 时每轮结果还写入该目录下的 round_N.csv。
+history 子命令查询抽奖历史库（见 src.models.history_store），同样以CSV输出。
+"""
+
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from src.models.identity_index import DUPLICATE_POLICIES
+
+
+def parse_rounds(spec: str) -> List[int]:
+    """解析轮次安排
+
+    支持逗号分隔的 "轮数x人数" 或单独的人数，例如 "5x20"、"3x10,1x5"、"20,20,10"。
+
+    Args:
+        spec: 轮次安排字符串
+
+    Returns:
+        List[int]: 每轮中奖人数
+    """
+    sizes = []
+    for part in spec.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        try:
+            if 'x' in part:
+                rounds, size = (int(value) for value in part.split('x', 1))
+            else:
+                rounds, size = 1, int(part)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"无法解析轮次安排: {part}")
+        if rounds <= 0 or size <= 0:
+            raise argparse.ArgumentTypeError(f"轮数和人数必须为正整数: {part}")
+        sizes.extend([size] * rounds)
+    if not sizes:
+        raise argparse.ArgumentTypeError("轮次安排不能为空")
+    return sizes
+
+
+def format_time(timestamp: Optional[float]) -> str:
+    """把历史库中的时间戳格式化为本地时间，空值为空字符串"""
+    if timestamp is None:
+        return ""
+    return datetime.fromtimestamp(timestamp).isoformat(sep=' ', timespec='seconds')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="main.py", description="幸运抽奖系统")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    draw = commands.add_parser("draw", help="不启动界面，直接执行抽奖")
+    draw.add_argument("--roster", required=True, nargs="+",
+                      help="参与者名单路径（CSV / Excel / Parquet），多个名单按顺序合并")
+    draw.add_argument("--workers", type=int, help="解析多个名单的工作进程数，默认为CPU核数")
+    draw.add_argument("--rounds", required=True, type=parse_rounds,
+                      help='轮次安排，如 "5x20"、"3x10,1x5"')
+    draw.add_argument("--seed", type=int, help="随机种子，指定后结果可复现")
+    draw.add_argument("--output", "-o", help="结果输出文件，默认输出到标准输出")
+    draw.add_argument("--output-dir", default="output",
+                      help="日志、历史库、名单缓存和每轮结果（未指定 -o 时）的目录，默认为当前目录下的 output")
+    draw.add_argument("--journal", help="抽奖日志路径，默认为输出目录下的 draw_journal.jsonl")
+    draw.add_argument("--resume", action="store_true",
+                      help="接着日志中该名单未完成的会话继续抽奖，而不是开始新会话")
+    draw.add_argument("--duplicates", choices=DUPLICATE_POLICIES, default="merge",
+                      help="重复参与者的处理方式：merge 合并（默认）、reject 报错、tickets 每次出现加一票")
+    draw.add_argument("--no-cache", action="store_true",
+                      help="不使用也不写入大名单的二进制缓存，总是重新解析")
+    draw.add_argument("--metrics-jsonl", help="把加载、抽奖和保存的耗时指标写入 JSON Lines 文件")
+    draw.add_argument("--history", help="抽奖历史库路径，默认为输出目录下的 history.sqlite3")
+    draw.add_argument("--exclude", nargs="+", default=[], metavar="FILE",
+                      help="不参与抽奖的人员名单（格式同参与者名单），如休假人员、组织者")
+    draw.add_argument("--exclude-winners", type=int, nargs="?", const=-1, metavar="EVENTS",
+                      help="排除历史库中往届活动的获奖者，可指定最近的活动数，默认统计全部历史")
+    draw.add_argument("--exclude-rounds", type=int, nargs="+", metavar="ROUND",
+                      help="与 --exclude-winners 一起使用：只排除这些轮次（如大奖所在轮次）的获奖者")
+    draw.add_argument("--allow", nargs="+", default=[], metavar="FILE",
+                      help="即使满足排除条件也参与抽奖的人员名单")
+
+    history = commands.add_parser("history", help="查询抽奖历史库，默认列出最近的活动")
+    history.add_argument("--db", required=True, help="抽奖历史库路径")
+    query = history.add_mutually_exclusive_group()
+    query.add_argument("--audit", type=int, metavar="EVENT", help="输出某次活动的完整抽奖记录")
+    query.add_argument("--departments", type=int, nargs="?", const=-1, metavar="EVENT",
+                       help="各部门获奖人数，可指定活动，默认统计全部历史")
+    query.add_argument("--won", nargs=2, metavar=("DEPARTMENT", "NAME"),
+                       help="某人在最近几次活动中是否中过奖")
+    history.add_argument("--employee-id", default="", help="与 --won 一起使用：名单含工号时按工号识别")
+    history.add_argument("--within", type=int, default=3, help="与 --won 一起使用：最近的活动数，默认3")
+    history.add_argument("--limit", type=int, default=20, help="列出的活动数，默认20")
+    return parser
+
+
+def build_exclusion(args: argparse.Namespace):
+    """按命令行参数组合排除规则：排除名单与往届获奖者的并集，去掉 --allow 名单中的人
+
+    Args:
+        args: 解析后的命令行参数
+
+    Returns:
+        Optional[ExclusionRule]: 排除规则，未指定任何排除条件时为None
+    """
+    from src.models.eligibility import ExclusionList, PastWinners, UnionRule
+
+    rules = [ExclusionList(path) for path in args.exclude]
+    if args.exclude_winners is not None:
+        within = args.exclude_winners if args.exclude_winners > 0 else None
+        rules.append(PastWinners(within, args.exclude_rounds))
+    if not rules:
+        return None
+    rule = UnionRule(*rules)
+    if args.allow:
+        rule = rule - UnionRule(*(ExclusionList(path) for path in args.allow))
+    return rule
+
+
+def run_draw(args: argparse.Namespace) -> int:
+    """执行命令行抽奖
+
+    Args:
+        args: 解析后的命令行参数
+
+    Returns:
+        int: 进程退出码
+    """
+    from src.metrics import JsonLinesExporter, Metrics
+    from src.models.lucky_draw_model import LuckyDrawModel
+
+    rosters = [os.path.abspath(path) for path in args.roster]
+    missing = [path for path in args.roster + args.exclude + args.allow if not os.path.exists(path)]
+    if missing:
+        print(f"名单文件不存在: {missing[0]}", file=sys.stderr)
+        return 1
+    if args.resume and args.seed is not None:
+        print("--resume 会沿用日志中的随机状态，不能与 --seed 同时使用", file=sys.stderr)
+        return 2
+    if args.exclude_rounds and args.exclude_winners is None:
+        print("--exclude-rounds 须与 --exclude-winners 一起使用", file=sys.stderr)
+        return 2
+
+    output_dir = os.path.abspath(args.output_dir)
+    if os.path.exists(output_dir) and not os.path.isdir(output_dir):
+        print(f"输出目录不是目录: {output_dir}", file=sys.stderr)
+        return 1
+
+    metrics = Metrics()
+    if args.metrics_jsonl:
+        metrics.add_observer(JsonLinesExporter(args.metrics_jsonl))
+    try:
+        model = LuckyDrawModel(rosters[0], args.journal, metrics=metrics, duplicate_policy=args.duplicates,
+                               sources=rosters, workers=args.workers, use_cache=not args.no_cache,
+                               history_path=args.history, exclusion=build_exclusion(args),
+                               output_dir=output_dir, save_round_files=not args.output)
+    except OSError as e:
+        print(f"无法写入抽奖日志或历史库: {e}", file=sys.stderr)
+        metrics.close()
+        return 1
+    try:
+        if model.load_error:
+            print(f"加载名单失败: {model.load_error}", file=sys.stderr)
+            return 1
+        if not model.pool.total:
+            print(f"名单中没有有效的参与者: {' '.join(args.roster)}", file=sys.stderr)
+            return 1
+        if not args.resume:
+            # 每次命令行运行都是一个新会话；从日志恢复的参与者池已被打乱，
+            # 恢复原始排列后同一种子的结果才可复现
+            model.reset(canonical=args.seed is not None)
+            if args.seed is not None:
+                model.rng.seed(args.seed)
+
+        rounds = model.run_schedule(args.rounds)
+        if not rounds:
+            print(f"剩余人数不足: 需要 {sum(args.rounds)} 人，剩余 {model.get_remaining_count()} 人",
+                  file=sys.stderr)
+            return 1
+
+        out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+        try:
+            writer = csv.writer(out, lineterminator='\n')
+            first_round = model.current_round - len(rounds) + 1
+            if len(rosters) > 1:
+                writer.writerow(['round', 'department', 'name', 'source'])
+                winner_ids = iter(model.winner_ids[len(model.winner_ids) - sum(map(len, rounds)):])
+                for round_num, winners in enumerate(rounds, first_round):
+                    for department, name in winners:
+                        source = os.path.basename(model.source_of(next(winner_ids)))
+                        writer.writerow((round_num, department, name, source))
+            else:
+                writer.writerow(['round', 'department', 'name'])
+                for round_num, winners in enumerate(rounds, first_round):
+                    writer.writerows((round_num, department, name) for department, name in winners)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        report = model.load_report
+        if report.bad_row_count:
+            print(f"已跳过 {report.bad_row_count} 行无效数据", file=sys.stderr)
+        if any(source.partial_bytes for source in report.sources or [report]):
+            print("名单末行没有换行符，可能尚未写完，未参与抽奖", file=sys.stderr)
+        if model.identity.duplicate_count:
+            print(f"已按 {model.identity.policy} 方式处理 {model.identity.duplicate_count} 条重复记录",
+                  file=sys.stderr)
+        if model.excluded:
+            print(f"已按排除规则排除 {len(model.excluded)} 人", file=sys.stderr)
+        return 0
+    except OSError as e:
+        print(f"写入失败: {e}", file=sys.stderr)
+        return 1
+    finally:
+        model.close()
+        metrics.close()
+
+
+def run_history(args: argparse.Namespace) -> int:
+    """查询抽奖历史库
+
+    Args:
+        args: 解析后的命令行参数
+
+    Returns:
+        int: 进程退出码；--won 查询中过奖时为0，否则为1
+    """
+    from src.models.history_store import HistoryStore
+
+    if not os.path.exists(args.db):
+        print(f"抽奖历史库不存在: {args.db}", file=sys.stderr)
+        return 1
+    store = HistoryStore(args.db)
+    try:
+        writer = csv.writer(sys.stdout, lineterminator='\n')
+        if args.won:
+            won = store.has_won(*args.won, employee_id=args.employee_id, within_events=args.within)
+            print("yes" if won else "no")
+            return 0 if won else 1
+        if args.departments is not None:
+            event_id = args.departments if args.departments >= 0 else None
+            writer.writerow(['department', 'winners'])
+            writer.writerows(store.winners_per_department(event_id).items())
+            return 0
+        if args.audit is not None:
+            records = store.audit(args.audit)
+            if not records:
+                print(f"活动 {args.audit} 没有抽奖记录", file=sys.stderr)
+                return 1
+        else:
+            records = store.events(args.limit)
+        if records:
+            writer.writerow(list(records[0]))
+            for record in records:
+                writer.writerow(format_time(value) if key.endswith('_at') else value
+                                for key, value in record.items())
+        return 0
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口
+
+    Args:
+        argv: 命令行参数（不含程序名），默认使用 sys.argv[1:]
+
+    Returns:
+        int: 进程退出码
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == "draw":
+        return run_draw(args)
+    if args.command == "history":
+        return run_history(args)
+    return 2
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import QObject, QTimer, QElapsedTimer, QEasingCurve, Qt, pyqtSignal
+
+from src.metrics import Metrics
+
+
+class ShuffleStats:
+    """换人帧耗时统计
+
+    只统计真正更新了画面的帧（每次发出 shuffle 的那一帧），空转的定时器帧不计入：
+    interval_ms 记录相邻两次换人之间的实际间隔，work_ms 记录换人时更新展示的耗时
+    （设置文字和排布，不含绘制）。实际间隔比计划间隔晚出一个目标帧以上时计为一次迟到。
+    """
+
+    def __init__(self, target_fps: float, max_samples: int = 100_000):
+        self.target_ms = 1000.0 / target_fps
+        self.max_samples = max_samples
+        self.interval_ms: List[float] = []
+        self.work_ms: List[float] = []
+        self.shuffles = 0
+        self.late = 0
+
+    def record(self, interval_ms: float, planned_ms: float, work_ms: float) -> None:
+        """记录一次换人
+
+        Args:
+            interval_ms: 距上次换人的实际间隔
+            planned_ms: 计划的换人间隔
+            work_ms: 更新展示的耗时
+        """
+        self.shuffles += 1
+        # 定时器按帧触发，换人最多晚一个目标帧属于正常的对齐误差
+        if interval_ms > planned_ms + self.target_ms:
+            self.late += 1
+        if len(self.interval_ms) < self.max_samples:
+            self.interval_ms.append(interval_ms)
+            self.work_ms.append(work_ms)
+
+    @staticmethod
+    def _percentile(samples: List[float], percent: float) -> float:
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def summary(self) -> Dict[str, float]:
+        """换人帧耗时汇总（毫秒）"""
+        return {
+            "target_ms": self.target_ms,
+            "shuffles": self.shuffles,
+            "late": self.late,
+            "interval_p50_ms": self._percentile(self.interval_ms, 50),
+            "interval_p99_ms": self._percentile(self.interval_ms, 99),
+            "work_p50_ms": self._percentile(self.work_ms, 50),
+            "work_p99_ms": self._percentile(self.work_ms, 99),
+        }
+
+    def dump(self, path: str) -> None:
+        """把汇总和逐次换人数据写入JSON文件"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"summary": self.summary(), "interval_ms": self.interval_ms, "work_ms": self.work_ms}, f)
+
+
+class AnimationEngine(QObject):
+    """以单调时钟驱动的抽奖动画引擎
+
+    定时器按目标帧率触发，用 QElapsedTimer 测量时间。
+    逻辑上的"换一批候选人"（shuffle 信号）按独立的节奏发出，与帧率解耦，
+    耗时统计只记录发出 shuffle 的帧；
+    停止时在 stop_duration_ms 内按缓动曲线把换人间隔拉长，结束后发出 finished。
+    """
+    shuffle = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None, target_fps: float = 60.0,
+                 shuffle_interval_ms: float = 80.0, stop_interval_ms: float = 600.0,
+                 stop_duration_ms: float = 1500.0, metrics: Optional[Metrics] = None):
+        """初始化动画引擎
+
+        Args:
+            parent: 父对象
+            target_fps: 目标帧率
+            shuffle_interval_ms: 正常滚动时的换人间隔
+            stop_interval_ms: 减速结束时的换人间隔
+            stop_duration_ms: 减速时长，为0时立即停止
+            metrics: 指标上报入口，每次换人上报 shuffle_interval_ms / shuffle_work_ms
+        """
+        super().__init__(parent)
+        self.target_fps = target_fps
+        self.shuffle_interval_ms = shuffle_interval_ms
+        self.stop_interval_ms = stop_interval_ms
+        self.stop_duration_ms = stop_duration_ms
+        self.easing = QEasingCurve(QEasingCurve.OutCubic)
+        self.stats = ShuffleStats(target_fps)
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.shuffle_work_ms = 0.0   # 由 shuffle 处理函数写入本次换人的更新耗时
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        self._clock = QElapsedTimer()
+        self._last_ns = 0
+        self._last_shuffle_ns = 0
+        self._since_shuffle_ms = 0.0
+        self._stop_started_ms = None
+
+    @property
+    def running(self) -> bool:
+        return self._timer.isActive()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop_started_ms is not None
+
+    def start(self) -> None:
+        """开始滚动，立即发出第一次 shuffle"""
+        self._clock.start()
+        self._last_ns = 0
+        self._last_shuffle_ns = 0
+        self._since_shuffle_ms = 0.0
+        self._stop_started_ms = None
+        self._timer.start(max(1, int(1000 / self.target_fps)))
+        self.shuffle.emit()
+
+    def begin_stop(self) -> None:
+        """开始减速，减速结束后发出 finished"""
+        if not self.running or self.stopping:
+            return
+        if self.stop_duration_ms <= 0:
+            self._finish()
+            return
+        self._stop_started_ms = self._clock.nsecsElapsed() / 1e6
+
+    def cancel(self) -> None:
+        """立即停止，不发出 finished"""
+        self._timer.stop()
+        self._stop_started_ms = None
+
+    def _finish(self) -> None:
+        self.cancel()
+        self.finished.emit()
+
+    def current_interval_ms(self, now_ms: float) -> float:
+        """当前的换人间隔，减速阶段按缓动曲线插值"""
+        if self._stop_started_ms is None:
+            return self.shuffle_interval_ms
+        progress = min(1.0, (now_ms - self._stop_started_ms) / self.stop_duration_ms)
+        eased = self.easing.valueForProgress(progress)
+        return self.shuffle_interval_ms + (self.stop_interval_ms - self.shuffle_interval_ms) * eased
+
+    def _tick(self) -> None:
+        now_ns = self._clock.nsecsElapsed()
+        now_ms = now_ns / 1e6
+        frame_ms = (now_ns - self._last_ns) / 1e6
+        self._last_ns = now_ns
+
+        self._since_shuffle_ms += frame_ms
+        planned_ms = self.current_interval_ms(now_ms)
+        if self._since_shuffle_ms >= planned_ms:
+            self._since_shuffle_ms = 0.0
+            self.shuffle_work_ms = 0.0
+            self.shuffle.emit()
+            interval_ms = (now_ns - self._last_shuffle_ns) / 1e6
+            self._last_shuffle_ns = now_ns
+            self.stats.record(interval_ms, planned_ms, self.shuffle_work_ms)
+            self.metrics.timing("shuffle_interval_ms", interval_ms)
+            self.metrics.timing("shuffle_work_ms", self.shuffle_work_ms)
+
+        if self._stop_started_ms is not None and now_ms - self._stop_started_ms >= self.stop_duration_ms:
+            self._finish()
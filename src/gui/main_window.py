@@ -2,25 +2,39 @@
 # -*- coding: utf-8 -*-
 
 import os
-import sys
-import random
-from typing import List, Tuple
+import time
+from typing import Optional
 
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                           QFrame, QMessageBox, QSplitter, QTableWidget,
-                           QTableWidgetItem, QHeaderView, QFileDialog)
-from PyQt5.QtGui import QFont, QColor
-from PyQt5.QtCore import Qt, QTimer, pyqtSlot
+                           QFrame, QMessageBox, QSplitter, QTableView,
+                           QHeaderView, QFileDialog, QLabel, QShortcut, QProgressDialog,
+                           QMenu)
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtCore import Qt, QTimer, QFileSystemWatcher, pyqtSlot
 
-from src.gui.widgets import (CustomButton, CustomLabel, WinnerCard, DrawContainer,
+from src.gui.animation_engine import AnimationEngine
+from src.gui.results_table import ResultsTableModel
+from src.gui.roster_import import RosterImportThread
+from src.gui.widgets import (CustomButton, CustomLabel, DrawContainer,
                            NumberInputWidget, StatusWidget)
+from src.models.eligibility import ExclusionList, UnionRule
 from src.models.lucky_draw_model import LuckyDrawModel
+from src.metrics import Metrics, metrics_from_env
+
+# 名单文件的轮询间隔（毫秒），作为文件变化通知的补充
+ROSTER_POLL_MS = 2000
 
 class MainWindow(QMainWindow):
     """抽奖程序主窗口"""
     
-    def __init__(self):
+    def __init__(self, metrics: Optional[Metrics] = None):
+        """初始化主窗口
+        
+        Args:
+            metrics: 指标上报入口，默认按环境变量创建（见 src.metrics.metrics_from_env）
+        """
         super().__init__()
+        self.metrics = metrics if metrics is not None else metrics_from_env()
         
         # 初始化窗口属性
         self.setWindowTitle("幸运抽奖系统")
@@ -29,24 +43,97 @@ class MainWindow(QMainWindow):
         # 初始化抽奖模型
         script_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
         csv_path = os.path.join(script_dir, "data", "participants.csv")
-        self.model = LuckyDrawModel(csv_path)
+        # 名单在窗口首次绘制之后再解析，见 paintEvent / load_roster
+        self.model = LuckyDrawModel(csv_path, load=False, metrics=self.metrics)
+        self._roster_scheduled = False
+        self.import_thread = None    # 正在后台导入名单的线程
+        self.import_progress = None  # 导入进度对话框
         
         # 抽奖状态
         self.is_drawing = False
         
-        # 动画控制 - 使用简单的定时器
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.update_animation)
-        self.animation_speed = 200  # 初始动画速度（毫秒）
+        # 动画控制 - 按单调时钟计帧，减速后再开奖
+        self.animation = AnimationEngine(self, metrics=self.metrics)
+        self.animation.shuffle.connect(self.update_animation)
+        self.animation.finished.connect(self.finish_draw)
         
         # 创建用户界面
         self.init_ui()
         
+        # 名单加载完成前禁用抽奖操作
+        self.set_controls_enabled(False)
+        
         # 更新状态信息
         self.update_status()
         
         # 显示欢迎信息
         self.display_welcome()
+        
+        # 现场签到会向名单文件追加行：文件变化通知加定时轮询，只读取新增的行
+        self.roster_watcher = QFileSystemWatcher(self)
+        self.roster_watcher.fileChanged.connect(self.ingest_roster_updates)
+        self.roster_poll = QTimer(self)
+        self.roster_poll.timeout.connect(self.ingest_roster_updates)
+        
+        # 换人耗时调试浮层：F12 切换，或设置环境变量 LUCKY_DRAW_DEBUG=1
+        self.debug_timer = QTimer(self)
+        self.debug_timer.timeout.connect(self.update_debug_overlay)
+        QShortcut(QKeySequence("F12"), self, activated=self.toggle_debug_overlay)
+        if os.environ.get("LUCKY_DRAW_DEBUG"):
+            self.toggle_debug_overlay()
+    
+    def paintEvent(self, event):
+        """首次绘制后再加载名单，使窗口尽快显示"""
+        super().paintEvent(event)
+        if not self._roster_scheduled:
+            self._roster_scheduled = True
+            QTimer.singleShot(0, self.load_roster)
+    
+    @pyqtSlot()
+    def load_roster(self):
+        """解析名单并回放抽奖日志，恢复上次未完成抽奖的结果"""
+        if self.model.loaded:
+            return
+        # 上次会话导入了其他名单时打开该名单，才能回放其抽奖日志
+        self.model.use_journal_roster()
+        self.model.open()
+        self.update_results_table()
+        self.update_status()
+        self.set_controls_enabled(True)
+        self.watch_roster()
+    
+    def watch_roster(self):
+        """开始跟踪当前名单文件的追加内容"""
+        watched = self.roster_watcher.files()
+        if watched:
+            self.roster_watcher.removePaths(watched)
+        # 只有单个CSV名单可以读取追加的行
+        if not self.model.streaming:
+            self.roster_poll.stop()
+            return
+        if os.path.exists(self.model.csv_path):
+            self.roster_watcher.addPath(self.model.csv_path)
+        self.roster_poll.start(ROSTER_POLL_MS)
+    
+    @pyqtSlot()
+    def ingest_roster_updates(self):
+        """把名单文件新追加的参与者并入剩余名单，不影响已有抽奖结果"""
+        if self.importing():
+            return
+        if self.model.ingest_appended():
+            self.update_status()
+        # 文件被替换后监视会失效，重新添加
+        if not self.roster_watcher.files() and os.path.exists(self.model.csv_path):
+            self.roster_watcher.addPath(self.model.csv_path)
+    
+    def set_controls_enabled(self, enabled: bool):
+        """启用或禁用抽奖控制按钮"""
+        self.start_button.setEnabled(enabled)
+        self.undo_button.setEnabled(enabled)
+        self.reset_button.setEnabled(enabled)
+        self.import_button.setEnabled(enabled)
+        self.exclude_button.setEnabled(enabled)
+        self.number_input.setEnabled(enabled)
     
     def init_ui(self):
         """初始化用户界面"""
@@ -133,6 +220,11 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(buttons_layout)
         
+        # 撤销按钮
+        self.undo_button = CustomButton("撤销本轮", panel, "neutral")
+        self.undo_button.clicked.connect(self.undo_round)
+        layout.addWidget(self.undo_button)
+        
         # 重置按钮
         self.reset_button = CustomButton("重置抽奖", panel, "neutral")
         self.reset_button.clicked.connect(self.reset_draw)
@@ -143,8 +235,15 @@ class MainWindow(QMainWindow):
         self.import_button.clicked.connect(self.import_participants)
         layout.addWidget(self.import_button)
         
+        # 排除名单按钮
+        self.exclude_button = CustomButton("排除名单", panel, "neutral")
+        self.exclude_button.clicked.connect(self.choose_exclusion)
+        layout.addWidget(self.exclude_button)
+        
         # 帮助信息
-        help_text = "提示: 点击'开始抽奖'后，系统将随机展示参与者，\n再点击'停止抽奖'确定本轮中奖人员。"
+        help_text = ("提示: 点击'开始抽奖'后，系统将随机展示参与者，\n再点击'停止抽奖'确定本轮中奖人员。\n"
+                     "获奖者缺席时，在结果表格中右键该行可补抽一人。\n"
+                     "休假人员、组织者等可通过'排除名单'移出抽奖名单。")
         help_label = CustomLabel(help_text, panel)
         help_label.setStyleSheet("""
             font-size: 14px;
@@ -184,16 +283,30 @@ class MainWindow(QMainWindow):
         self.draw_container = DrawContainer(panel)
         layout.addWidget(self.draw_container, 1)
         
+        # 换人耗时调试浮层（默认隐藏）
+        self.debug_overlay = QLabel(panel)
+        self.debug_overlay.setStyleSheet("""
+            background-color: rgba(0, 0, 0, 160);
+            color: #00ff66;
+            font-family: monospace;
+            font-size: 12px;
+            padding: 6px;
+            border-radius: 4px;
+        """)
+        self.debug_overlay.move(30, 30)
+        self.debug_overlay.hide()
+        
         return panel
     
-    def create_results_table(self) -> QTableWidget:
+    def create_results_table(self) -> QTableView:
         """创建结果表格"""
-        table = QTableWidget(0, 3)  # 0行，3列
-        table.setHorizontalHeaderLabels(["轮次", "部门", "姓名"])
+        self.results_model = ResultsTableModel(self.model, self)
+        table = QTableView()
+        table.setModel(self.results_model)
         
         # 设置表格样式
         table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 alternate-background-color: #f5f5f5;
                 border: 1px solid #e0e0e0;
@@ -207,16 +320,18 @@ class MainWindow(QMainWindow):
                 border: none;
                 padding: 8px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
         """)
         
-        # 设置表头
+        # 设置表头（固定宽度，避免按全部行内容计算列宽）
         header = table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Fixed)
+        header.resizeSection(0, 90)
         header.setSectionResizeMode(1, QHeaderView.Stretch)
         header.setSectionResizeMode(2, QHeaderView.Stretch)
+        table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
         # 设置表格高度
         table.setMaximumHeight(200)
@@ -224,6 +339,10 @@ class MainWindow(QMainWindow):
         # 设置交替行颜色
         table.setAlternatingRowColors(True)
         
+        # 右键菜单：缺席重抽
+        table.setContextMenuPolicy(Qt.CustomContextMenu)
+        table.customContextMenuRequested.connect(self.show_results_menu)
+        
         return table
     
     def update_status(self):
@@ -278,18 +397,19 @@ class MainWindow(QMainWindow):
         self.is_drawing = True
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
+        self.undo_button.setEnabled(False)
         self.reset_button.setEnabled(False)
         self.number_input.setEnabled(False)
         
         # 保存当前请求的中奖人数
         self.requested_winners = num_winners
+        self.draw_started = time.perf_counter()
         
-        # 启动定时器实现滚动动画
-        self.animation_speed = 150  # 初始150ms每次更新
-        self.animation_timer.start(self.animation_speed)
+        # 启动动画引擎实现滚动动画
+        self.animation.start()
     
     def update_animation(self):
-        """更新抽奖动画（由定时器触发）- 简化版"""
+        """更新抽奖动画（由动画引擎按换人节奏触发）- 简化版"""
         if not self.is_drawing:
             return
         
@@ -300,26 +420,28 @@ class MainWindow(QMainWindow):
         
         # 更新UI显示 - 简单滚动效果
         self.draw_container.update_display(random_participants)
-        
-        # 动态调整动画速度
-        if random.random() < 0.2:  # 有20%的概率改变速度
-            # 在100-300ms之间变化速度
-            self.animation_speed = random.randint(100, 300)
-            self.animation_timer.setInterval(self.animation_speed)
+        self.animation.shuffle_work_ms = self.draw_container.last_update_ms
     
     @pyqtSlot()
     def stop_draw(self):
-        """停止抽奖"""
-        if not self.is_drawing:
+        """停止抽奖：动画先减速，结束后开奖"""
+        if not self.is_drawing or self.animation.stopping:
             return
         
-        # 停止动画定时器
-        self.animation_timer.stop()
+        self.stop_button.setEnabled(False)
+        self.animation.begin_stop()
+    
+    @pyqtSlot()
+    def finish_draw(self):
+        """减速结束，执行抽奖并展示结果"""
+        if not self.is_drawing:
+            return
         
         # 更新状态
         self.is_drawing = False
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
+        self.undo_button.setEnabled(True)
         self.reset_button.setEnabled(True)
         self.number_input.setEnabled(True)
         
@@ -329,33 +451,50 @@ class MainWindow(QMainWindow):
         
         # 显示中奖结果
         self.draw_container.show_winners(winners)
+        self.metrics.timing("draw_cycle_ms", (time.perf_counter() - self.draw_started) * 1000)
         
         # 更新结果表格
-        self.update_results_table(winners)
+        self.update_results_table()
         
         # 更新状态信息
         self.update_status()
     
-    def update_results_table(self, winners: List[Tuple[str, str]]):
-        """更新结果表格，修复UI问题：每轮抽奖后只插入本轮中奖者，避免重复或错位。"""
-        for department, name in winners:
-            row_position = self.results_table.rowCount()
-            self.results_table.insertRow(row_position)
-            
-            # 添加轮次
-            round_item = QTableWidgetItem(f"第{self.model.current_round}轮")
-            round_item.setTextAlignment(Qt.AlignCenter)
-            self.results_table.setItem(row_position, 0, round_item)
-            
-            # 添加部门
-            dept_item = QTableWidgetItem(department)
-            self.results_table.setItem(row_position, 1, dept_item)
-            
-            # 添加姓名
-            name_item = QTableWidgetItem(name)
-            name_item.setFont(QFont("Arial", 10, QFont.Bold))
-            name_item.setForeground(QColor("#2E7D32"))
-            self.results_table.setItem(row_position, 2, name_item)
+    def update_results_table(self):
+        """更新结果表格：把新一轮的中奖者一次性追加到表格模型。"""
+        self.results_model.sync()
+    
+    def toggle_debug_overlay(self):
+        """显示或隐藏换人耗时调试浮层"""
+        if self.debug_overlay.isVisible():
+            self.debug_timer.stop()
+            self.debug_overlay.hide()
+        else:
+            self.update_debug_overlay()
+            self.debug_overlay.show()
+            self.debug_overlay.raise_()
+            self.debug_timer.start(500)
+    
+    def update_debug_overlay(self):
+        """刷新调试浮层中的换人耗时统计"""
+        stats = self.animation.stats.summary()
+        self.debug_overlay.setText(
+            f"目标帧间隔 {stats['target_ms']:.1f} ms\n"
+            f"换人间隔 p50 {stats['interval_p50_ms']:.1f} ms  p99 {stats['interval_p99_ms']:.1f} ms\n"
+            f"换人更新（不含绘制） p50 {stats['work_p50_ms']:.1f} ms  p99 {stats['work_p99_ms']:.1f} ms\n"
+            f"换人次数 {stats['shuffles']}  迟到 {stats['late']}"
+        )
+        self.debug_overlay.adjustSize()
+    
+    def closeEvent(self, event):
+        """关闭窗口前保存换人耗时统计并等待抽奖结果写入完成"""
+        self.animation.cancel()
+        if self.importing():
+            self.import_thread.wait()
+        if self.animation.stats.shuffles:
+            self.animation.stats.dump(os.path.join(self.model.output_dir(), "shuffle_stats.json"))
+        self.model.close()
+        self.metrics.close()
+        super().closeEvent(event)
     
     @pyqtSlot()
     def reset_draw(self):
@@ -370,7 +509,7 @@ class MainWindow(QMainWindow):
             self.model.reset()
             
             # 清空结果表格
-            self.results_table.setRowCount(0)
+            self.results_model.reset()
             
             # 显示欢迎信息
             self.display_welcome()
@@ -380,15 +519,161 @@ class MainWindow(QMainWindow):
             
             QMessageBox.information(self, "重置完成", "抽奖状态已重置")
     
+    @pyqtSlot()
+    def undo_round(self):
+        """撤销最后一轮抽奖，本轮中奖者回到抽奖名单"""
+        if self.is_drawing or not self.model.current_round:
+            return
+        reply = QMessageBox.question(self, "确认撤销",
+                                   f"确定要撤销第{self.model.current_round}轮抽奖吗？本轮中奖者将回到抽奖名单。",
+                                   QMessageBox.Yes | QMessageBox.No,
+                                   QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        self.model.undo_round()
+        
+        # 结果表格随获奖者列表缩短而重建
+        self.update_results_table()
+        self.display_welcome()
+        self.update_status()
+    
+    def show_results_menu(self, pos):
+        """结果表格的右键菜单"""
+        index = self.results_table.indexAt(pos)
+        if not index.isValid() or self.is_drawing or self.importing():
+            return
+        menu = QMenu(self)
+        redraw_action = menu.addAction("缺席重抽")
+        if menu.exec_(self.results_table.viewport().mapToGlobal(pos)) is redraw_action:
+            self.redraw_absent(index.row())
+    
+    def redraw_absent(self, row: int):
+        """结果表格第 row 行的获奖者缺席，从剩余参与者中补抽一人替换
+        
+        Args:
+            row: 结果表格的行号
+        """
+        department, name = self.model.winners[row]
+        reply = QMessageBox.question(self, "确认重抽",
+                                   f"{department} {name} 缺席，确定要从剩余参与者中补抽一人替换吗？",
+                                   QMessageBox.Yes | QMessageBox.No,
+                                   QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        if self.model.redraw_absent(row) is None:
+            QMessageBox.warning(self, "无法重抽", "没有剩余的参与者")
+            return
+        
+        self.results_model.refresh_rows(row, row)
+        # 补抽的是最后一轮时同步更新展示区
+        if self.results_model.round_of(row) == self.model.current_round:
+            self.draw_container.show_winners(self.model.get_round_winners()[-1])
+        self.update_status()
+    
+    def choose_exclusion(self):
+        """选择不参与抽奖的人员名单（休假人员、组织者等），可在两轮之间更换"""
+        if self.is_drawing or self.importing():
+            return
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择排除名单", "",
+            "名单文件 (*.csv *.xlsx *.xlsm *.parquet);;CSV Files (*.csv);;All Files (*)")
+        if not file_paths:
+            return
+        
+        if not self.model.set_exclusion(UnionRule(*(ExclusionList(path) for path in file_paths))):
+            QMessageBox.critical(self, "排除失败", "无法读取排除名单，请确认文件包含 department 和 name 列")
+            return
+        QMessageBox.information(self, "排除名单",
+                                f"已排除{len(self.model.excluded)}人，"
+                                f"剩余{self.model.get_remaining_count()}人参与抽奖")
+        self.update_status()
+    
+    def importing(self) -> bool:
+        """是否正在后台导入名单"""
+        return self.import_thread is not None and self.import_thread.isRunning()
+    
     def import_participants(self):
-        """导入参与者名单"""
+        """导入参与者名单：可选择多个 CSV / Excel / Parquet 文件，在后台线程中并行解析后合并"""
+        if self.importing():
+            return
         options = QFileDialog.Options()
-        file_path, _ = QFileDialog.getOpenFileName(self, "选择参与者名单", "", "CSV Files (*.csv);;All Files (*)", options=options)
-        if file_path:
-            try:
-                self.model.add_csv_path(file_path)
-                self.model.load_participants()
-                QMessageBox.information(self, "导入成功", "参与者名单已成功导入")
-                self.update_status()
-            except Exception as e:
-                QMessageBox.critical(self, "导入失败", f"导入过程中发生错误: {str(e)}")
\ No newline at end of file
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择参与者名单", "",
+            "名单文件 (*.csv *.xlsx *.xlsm *.parquet);;CSV Files (*.csv);;All Files (*)", options=options)
+        if not file_paths:
+            return
+        
+        # 导入期间禁用抽奖操作，暂停跟踪名单追加
+        self.set_controls_enabled(False)
+        self.roster_poll.stop()
+        self.import_progress = QProgressDialog("正在导入名单...", "", 0, 1000, self)
+        self.import_progress.setWindowTitle("导入名单")
+        self.import_progress.setCancelButton(None)
+        self.import_progress.setWindowModality(Qt.WindowModal)
+        self.import_progress.setMinimumDuration(0)
+        self.import_progress.setValue(0)
+        
+        self.import_thread = RosterImportThread(self.model, file_paths, self)
+        self.import_thread.progress.connect(self.update_import_progress)
+        self.import_thread.loaded.connect(self.finish_import)
+        self.import_thread.start()
+    
+    @pyqtSlot(int, int, int)
+    def update_import_progress(self, rows: int, done_bytes: int, total_bytes: int):
+        """刷新导入进度"""
+        if self.import_progress is None:
+            return
+        if total_bytes:
+            self.import_progress.setValue(min(999, done_bytes * 1000 // total_bytes))
+        self.import_progress.setLabelText(f"正在导入名单... 已读取 {rows} 人")
+    
+    @pyqtSlot(bool)
+    def finish_import(self, ok: bool):
+        """后台解析结束后装入新名单并显示导入报告"""
+        if self.import_progress is not None:
+            self.import_progress.close()
+            self.import_progress = None
+        self.set_controls_enabled(True)
+        if not ok:
+            reason = self.model.load_error or "请确认文件包含 department 和 name 列"
+            QMessageBox.critical(self, "导入失败", f"无法读取名单: {reason}")
+            self.watch_roster()
+            return
+        
+        # 后台线程只解析到新的对象，在界面线程中替换名单，结果表格不会读到替换中的状态；
+        # 导入的名单从新会话开始，清空上一份名单的抽奖结果
+        self.model.install_sources(self.import_thread.result)
+        self.import_thread.result = None
+        self.results_model.reset()
+        self.display_welcome()
+        
+        report = self.model.load_report
+        identity = self.model.identity
+        message = f"参与者名单已成功导入，共{self.model.pool.total}人"
+        if report.sources:
+            # 多个来源：逐个列出人数和错误行数
+            for source in report.sources[:10]:
+                message += f"\n{os.path.basename(source.path)}: {source.rows}人"
+                if source.bad_row_count:
+                    message += f"，跳过{source.bad_row_count}行格式错误的数据"
+                if source.partial_bytes:
+                    message += "，末行没有换行符，未导入"
+            if len(report.sources) > 10:
+                message += f"\n……共{len(report.sources)}个文件"
+        elif report.bad_row_count:
+            line_nos = "、".join(str(line_no) for line_no, _ in report.bad_rows[:10])
+            message += f"\n跳过{report.bad_row_count}行格式错误的数据（行号: {line_nos}）"
+        if not report.sources and report.partial_bytes:
+            message += "\n末行没有换行符，可能尚未写完，补上换行符后自动导入"
+        if identity.duplicate_count:
+            record_nos = "、".join(str(record_no) for record_no, _ in identity.duplicates[:10])
+            message += f"\n合并{identity.duplicate_count}条重复记录（第 {record_nos} 条）"
+        if identity.normalized_count:
+            message += f"\n规范化了{identity.normalized_count}条记录中的全角字符或多余空格"
+        if self.model.excluded:
+            message += f"\n按排除名单排除{len(self.model.excluded)}人"
+        QMessageBox.information(self, "导入成功", message)
+        self.update_status()
+        self.watch_roster()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from bisect import bisect_right
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFont, QColor, QBrush
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """获奖结果表格模型，直接读取 LuckyDrawModel.winners
+
+    不复制数据，也不为每个单元格创建对象：视图只对可见行调用 data()，
+    轮次由 round_offsets 二分查找得到，字体和画刷在类上共享。
+    新一轮结果通过 sync() 以一次 beginInsertRows 批量通知视图，
+    撤销一轮后 sync() 重建表格，缺席重抽替换的行由 refresh_rows() 通知重绘。
+    """
+    HEADERS = ["轮次", "部门", "姓名"]
+
+    NAME_FONT = None          # 首次使用时创建，需在 QApplication 之后
+    NAME_BRUSH = None
+
+    def __init__(self, draw_model, parent=None):
+        super().__init__(parent)
+        self.draw_model = draw_model
+        self._rows = 0
+        if ResultsTableModel.NAME_FONT is None:
+            ResultsTableModel.NAME_FONT = QFont("Arial", 10, QFont.Bold)
+            ResultsTableModel.NAME_BRUSH = QBrush(QColor("#2E7D32"))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return f"第{self.round_of(row)}轮"
+            return self.draw_model.winners[row][column - 1]
+        if column == 0 and role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if column == 2:
+            if role == Qt.FontRole:
+                return self.NAME_FONT
+            if role == Qt.ForegroundRole:
+                return self.NAME_BRUSH
+        return None
+
+    def round_of(self, row):
+        """获取某一行所属的轮次，O(log 轮数)"""
+        return bisect_right(self.draw_model.round_offsets, row)
+
+    def sync(self):
+        """把抽奖模型中新增的获奖者批量追加到表格"""
+        total = len(self.draw_model.winners)
+        if total < self._rows:
+            self.reset()
+        elif total > self._rows:
+            self.beginInsertRows(QModelIndex(), self._rows, total - 1)
+            self._rows = total
+            self.endInsertRows()
+
+    def refresh_rows(self, first, last):
+        """获奖者被替换后通知视图重绘第 first 到 last 行"""
+        self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.HEADERS) - 1))
+
+    def reset(self):
+        """按抽奖模型的当前状态重建表格"""
+        self.beginResetModel()
+        self._rows = len(self.draw_model.winners)
+        self.endResetModel()
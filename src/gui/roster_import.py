@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from typing import List, Optional
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from src.models.lucky_draw_model import LoadedRoster, LuckyDrawModel
+
+
+class RosterImportThread(QThread):
+    """在后台线程中导入名单，界面线程只接收进度和结果
+
+    多个来源由 LuckyDrawModel.parse_sources 交给工作进程并行解析，
+    本线程只负责等待结果并合并到新的参与者池，不修改抽奖模型的当前状态；
+    界面线程收到 loaded 信号后用 LuckyDrawModel.install_sources 装入 result。
+    """
+
+    # 已读行数, 已读字节数, 总字节数
+    progress = pyqtSignal(int, int, int)
+    # 是否导入成功
+    loaded = pyqtSignal(bool)
+
+    def __init__(self, model: LuckyDrawModel, paths: List[str], parent=None):
+        """初始化导入线程
+
+        Args:
+            model: 抽奖模型，导入期间界面不应修改它
+            paths: 名单来源文件路径
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.model = model
+        self.paths = list(paths)
+        self.result: Optional[LoadedRoster] = None  # 解析结果，失败时为None
+
+    def run(self):
+        try:
+            self.result = self.model.parse_sources(self.paths, self.progress.emit)
+        except Exception as e:
+            print(f"导入名单出错: {e}")
+            self.model.load_error = str(e)
+            self.result = None
+        self.loaded.emit(self.result is not None)
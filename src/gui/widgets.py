@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import time
+from collections import OrderedDict
+
 from PyQt5.QtWidgets import (QPushButton, QLabel, QVBoxLayout, QWidget, 
                             QFrame, QGraphicsDropShadowEffect, QSizePolicy,
-                            QSpinBox, QHBoxLayout, QGridLayout, QComboBox)
-from PyQt5.QtGui import QFont, QColor, QCursor, QPalette, QBrush, QLinearGradient
-from PyQt5.QtCore import Qt, QPropertyAnimation, QSize, pyqtProperty, QEasingCurve
+                            QSpinBox, QHBoxLayout, QGridLayout,
+                            QGraphicsScene, QGraphicsPathItem)
+from PyQt5.QtGui import (QFont, QColor, QCursor, QPainter, QPainterPath, QPen,
+                         QPixmap, QFontMetrics)
+from PyQt5.QtCore import Qt, QPropertyAnimation, QSize, QRectF
+
+# 自动模式下，展示人数达到该值时改用 CardCanvas 绘制
+CANVAS_CARD_THRESHOLD = 40
 
 class CustomButton(QPushButton):
     def __init__(self, text, parent=None, button_type="primary"):
@@ -160,30 +168,184 @@ class WinnerCard(QFrame):
         layout = QVBoxLayout(self)
         
         # 部门标签
-        dept_label = QLabel(self.department)
-        dept_label.setAlignment(Qt.AlignCenter)
-        dept_label.setFont(QFont("Arial", 14))
-        dept_label.setStyleSheet("color: #666666;")
+        self.dept_label = QLabel(self.department)
+        self.dept_label.setAlignment(Qt.AlignCenter)
+        self.dept_label.setFont(QFont("Arial", 14))
+        self.dept_label.setStyleSheet("color: #666666;")
         
         # 获奖者名字标签
-        name_label = QLabel(self.name)
-        name_label.setAlignment(Qt.AlignCenter)
-        name_label.setFont(QFont("Arial", 20, QFont.Bold))
-        name_label.setStyleSheet("color: #2E7D32; letter-spacing: 1px;")
-        name_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        
-        layout.addWidget(dept_label)
-        layout.addWidget(name_label)
+        self.name_label = QLabel(self.name)
+        self.name_label.setAlignment(Qt.AlignCenter)
+        self.name_label.setFont(QFont("Arial", 20, QFont.Bold))
+        self.name_label.setStyleSheet("color: #2E7D32; letter-spacing: 1px;")
+        self.name_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        
+        layout.addWidget(self.dept_label)
+        layout.addWidget(self.name_label)
         layout.setContentsMargins(15, 15, 15, 15)
         
         # 固定卡片尺寸
         self.setMinimumSize(200, 140)
         self.setMaximumSize(200, 140)
+    
+    def set_participant(self, department, name):
+        """更新卡片显示的部门和姓名（复用卡片时调用）"""
+        if department != self.department:
+            self.department = department
+            self.dept_label.setText(department)
+        if name != self.name:
+            self.name = name
+            self.name_label.setText(name)
 
-class DrawContainer(QWidget):
-    """抽奖动画和结果展示容器 - 简化版，只有基本滚动效果"""
+class CardCanvas(QWidget):
+    """在单个控件上绘制整组获奖者卡片，用于大批量展示
+    
+    卡片背景（含阴影）按尺寸只渲染一次并缓存为 QPixmap，
+    部门和姓名文字渲染后放入 LRU 文字缓存，每帧只是贴图，
+    不需要布局计算，也不需要逐卡片合成阴影效果。
+    """
+    CARD_WIDTH = 200
+    CARD_HEIGHT = 140
+    SPACING = 20
+    SHADOW_MARGIN = 20
+    TEXT_CACHE_SIZE = 4096
+    
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.participants = []
+        self._card_pixmaps = {}            # (宽, 高, 设备像素比) -> 卡片背景
+        self._text_cache = OrderedDict()   # (文字, 角色, 宽, 设备像素比) -> 文字贴图
+        self._dept_font = QFont("Arial", 14)
+        self._name_font = QFont("Arial", 20, QFont.Bold)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+    
+    def set_participants(self, participants):
+        """更新要绘制的参与者 (部门, 姓名) 列表"""
+        self.participants = list(participants)
+        self.update()
+    
+    def _grid(self):
+        """选择让卡片缩放比例最大的列数，返回 (列数, 缩放比例)"""
+        count = len(self.participants)
+        width = max(1, self.width())
+        height = max(1, self.height())
+        cell_w = self.CARD_WIDTH + self.SPACING
+        cell_h = self.CARD_HEIGHT + self.SPACING
+        best = (1, 0.0)
+        for cols in range(1, count + 1):
+            rows = (count + cols - 1) // cols
+            scale = min(1.0, width / (cols * cell_w), height / (rows * cell_h))
+            if scale > best[1]:
+                best = (cols, scale)
+        return best
+    
+    def _card_pixmap(self, width, height, ratio):
+        """获取指定尺寸的卡片背景，阴影只在首次使用时渲染"""
+        key = (width, height, ratio)
+        pixmap = self._card_pixmaps.get(key)
+        if pixmap is not None:
+            return pixmap
+        
+        margin = self.SHADOW_MARGIN
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(0, 0, width, height), 15, 15)
+        item = QGraphicsPathItem(path)
+        item.setBrush(QColor("#f0faf0"))
+        item.setPen(QPen(QColor("#4CAF50"), 2))
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(15)
+        shadow.setColor(QColor(0, 0, 0, 80))
+        shadow.setOffset(0, 4)
+        item.setGraphicsEffect(shadow)
+        scene = QGraphicsScene()
+        scene.addItem(item)
+        
+        full = QRectF(-margin, -margin, width + 2 * margin, height + 2 * margin)
+        pixmap = QPixmap(int(full.width() * ratio), int(full.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        scene.render(painter, QRectF(0, 0, full.width(), full.height()), full)
+        painter.end()
+        
+        self._card_pixmaps[key] = pixmap
+        return pixmap
+    
+    def _text_pixmap(self, text, is_name, width, scale, ratio):
+        """获取文字贴图，命中缓存时不再排版和光栅化"""
+        key = (text, is_name, width, ratio)
+        pixmap = self._text_cache.get(key)
+        if pixmap is not None:
+            self._text_cache.move_to_end(key)
+            return pixmap
+        
+        font = QFont(self._name_font if is_name else self._dept_font)
+        font.setPointSizeF(font.pointSizeF() * scale)
+        height = QFontMetrics(font).height()
+        pixmap = QPixmap(int(width * ratio), int(height * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(font)
+        painter.setPen(QColor("#2E7D32") if is_name else QColor("#666666"))
+        painter.drawText(QRectF(0, 0, width, height), Qt.AlignCenter, text)
+        painter.end()
+        
+        self._text_cache[key] = pixmap
+        if len(self._text_cache) > self.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return pixmap
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        if not self.participants:
+            return
+        
+        ratio = self.devicePixelRatioF()
+        cols, scale = self._grid()
+        card_w = int(self.CARD_WIDTH * scale)
+        card_h = int(self.CARD_HEIGHT * scale)
+        spacing = int(self.SPACING * scale)
+        margin = self.SHADOW_MARGIN
+        rows = (len(self.participants) + cols - 1) // cols
+        left = (self.width() - cols * (card_w + spacing) + spacing) // 2
+        top = (self.height() - rows * (card_h + spacing) + spacing) // 2
+        background = self._card_pixmap(card_w, card_h, ratio)
+        
+        for i, (department, name) in enumerate(self.participants):
+            x = left + (i % cols) * (card_w + spacing)
+            y = top + (i // cols) * (card_h + spacing)
+            painter.drawPixmap(x - margin, y - margin, background)
+            
+            dept = self._text_pixmap(department, False, card_w, scale, ratio)
+            name_pixmap = self._text_pixmap(name, True, card_w, scale, ratio)
+            dept_h = dept.height() / ratio
+            name_h = name_pixmap.height() / ratio
+            gap = (card_h - dept_h - name_h) / 3
+            painter.drawPixmap(x, int(y + gap), dept)
+            painter.drawPixmap(x, int(y + 2 * gap + dept_h), name_pixmap)
+
+
+class DrawContainer(QWidget):
+    """抽奖动画和结果展示容器 - 简化版，只有基本滚动效果
+    
+    卡片放在对象池中复用：展示人数不变时每帧只更新卡片文字，
+    不创建、不销毁控件；人数变化时才重新排布并按需补充卡片。
+    
+    render_mode 为 "widgets" 时使用 WinnerCard 控件，为 "canvas" 时在
+    CardCanvas 上直接绘制；默认 "auto" 在人数达到 CANVAS_CARD_THRESHOLD 时使用绘制模式。
+    """
+    def __init__(self, parent=None, render_mode="auto"):
+        super().__init__(parent)
+        self.render_mode = render_mode
+        self._cards = []          # 卡片池
+        self._layout_key = None   # 当前排布 (卡片数, 起始行, 是否显示标题)
+        self.cards_created = 0    # 累计创建的卡片数
+        self.last_update_ms = 0.0 # 最近一次更新展示耗时（毫秒）
         self.initUI()
         
     def initUI(self):
@@ -208,66 +370,111 @@ class DrawContainer(QWidget):
         shadow.setOffset(0, 5)
         self.setGraphicsEffect(shadow)
         
+        # 复用的标题和提示标签
+        self._title = CustomLabel("🎉 恭喜以下人员中奖 🎉", self, is_title=True)
+        self._title.hide()
+        self._message = CustomLabel("", self)
+        self._message.setAlignment(Qt.AlignCenter)
+        self._message.hide()
+        self._canvas = CardCanvas(self)
+        self._canvas.hide()
+        
     def update_display(self, participants):
         """更新抽奖展示 - 简单的滚动效果"""
-        # 清空当前布局
-        self.clear()
+        start = time.perf_counter()
         
         # 没有数据时显示提示信息
         if not participants:
-            empty_label = CustomLabel("开始抽奖后将在此处展示候选人", self)
-            empty_label.setAlignment(Qt.AlignCenter)
-            self.layout.addWidget(empty_label, 0, 0, 1, 4)
-            return
-        
-        # 计算行列数 (最多4列)
-        cols = min(4, len(participants))
-        rows = (len(participants) + cols - 1) // cols
+            self._show_message("开始抽奖后将在此处展示候选人", 0)
+        else:
+            self._show_cards(participants, with_title=False)
         
-        # 添加参与者卡片
-        for i, (department, name) in enumerate(participants):
-            row = i // cols
-            col = i % cols
-            
-            # 创建卡片
-            card = WinnerCard(department, name, self)
-            self.layout.addWidget(card, row, col)
+        self.last_update_ms = (time.perf_counter() - start) * 1000
     
     def show_winners(self, winners):
         """显示中奖人员"""
-        # 先清空当前布局
-        self.clear()
-        
-        # 添加标题
-        title = CustomLabel("🎉 恭喜以下人员中奖 🎉", self, is_title=True)
-        self.layout.addWidget(title, 0, 0, 1, 4)
-        
         # 没有中奖者时显示提示
         if not winners:
-            empty_label = CustomLabel("没有中奖人员", self)
-            empty_label.setAlignment(Qt.AlignCenter)
-            self.layout.addWidget(empty_label, 1, 0, 1, 4)
+            if self._arrange(("no_winners",)):
+                self._add_pooled(self._title, 0, 0, 1, 4)
+                self._add_pooled(self._message, 1, 0, 1, 4)
+            self._message.setText("没有中奖人员")
             return
         
-        # 计算行列数 (最多4列)
-        cols = min(4, len(winners))
-        rows = (len(winners) + cols - 1) // cols
+        self._show_cards(winners, with_title=True)
+    
+    def _show_message(self, text, row):
+        """在指定行显示提示信息"""
+        if self._arrange(("message", row)):
+            self._add_pooled(self._message, row, 0, 1, 4)
+        self._message.setText(text)
+    
+    def _use_canvas(self, count):
+        if self.render_mode == "canvas":
+            return True
+        return self.render_mode == "auto" and count >= CANVAS_CARD_THRESHOLD
+    
+    def _show_cards(self, participants, with_title):
+        """用卡片池展示参与者，排布不变时只更新文字"""
+        count = len(participants)
+        first_row = 1 if with_title else 0
+        
+        if self._use_canvas(count):
+            if self._arrange(("canvas", first_row)):
+                if with_title:
+                    self._add_pooled(self._title, 0, 0, 1, 4)
+                self._add_pooled(self._canvas, first_row, 0, 1, 4)
+                self.layout.setRowStretch(first_row, 1)
+            self._canvas.set_participants(participants)
+            return
         
-        # 添加中奖者卡片
-        for i, (department, name) in enumerate(winners):
-            row = (i // cols) + 1  # +1是因为第0行是标题
-            col = i % cols
+        if self._arrange((count, first_row)):
+            if with_title:
+                self._add_pooled(self._title, 0, 0, 1, 4)
             
-            # 创建卡片
-            card = WinnerCard(department, name, self)
-            self.layout.addWidget(card, row, col)
+            # 按需补充卡片
+            while len(self._cards) < count:
+                card = WinnerCard("", "", self)
+                card.hide()
+                self._cards.append(card)
+                self.cards_created += 1
+            
+            # 计算行列数 (最多4列)
+            cols = min(4, count)
+            for i in range(count):
+                self._add_pooled(self._cards[i], first_row + i // cols, i % cols)
         
+        for card, (department, name) in zip(self._cards, participants):
+            card.set_participant(department, name)
+    
+    def _arrange(self, layout_key):
+        """切换到新的排布，排布未变时返回False"""
+        if layout_key == self._layout_key:
+            return False
+        self.clear()
+        self._layout_key = layout_key
+        return True
+    
+    def _add_pooled(self, widget, row, col, row_span=1, col_span=1):
+        self.layout.addWidget(widget, row, col, row_span, col_span)
+        widget.show()
+    
     def clear(self):
-        """清除所有展示项目"""
+        """清除所有展示项目，池中的控件只隐藏不销毁"""
+        pooled = set(self._cards)
+        pooled.update((self._title, self._message, self._canvas))
         while self.layout.count():
             item = self.layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+            widget = item.widget()
+            if widget is None:
+                continue
+            if widget in pooled:
+                widget.hide()
+            else:
+                widget.deleteLater()
+        for row in range(self.layout.rowCount()):
+            self.layout.setRowStretch(row, 0)
+        self._layout_key = None
     
     def set_animation_level(self, level):
         """设置动画强度级别 - 为了兼容保留此方法但不做实际操作"""
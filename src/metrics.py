@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""指标与追踪钩子
+
+LuckyDrawModel、AnimationEngine 和 MainWindow 通过 Metrics 上报耗时、计数和当前值，
+观察者（导出器）通过 add_observer 注册。没有观察者时每次上报只是一次空方法调用。
+
+内置导出器:
+    JsonLinesExporter   每个事件一行JSON，写入本地文件
+    PrometheusExporter  在本机端口以 Prometheus 文本格式提供 /metrics
+
+环境变量（见 metrics_from_env）:
+    LUCKY_DRAW_METRICS_JSONL  JSON Lines 文件路径
+    LUCKY_DRAW_METRICS_PORT   Prometheus 端口，只监听 127.0.0.1
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+# 耗时直方图的桶上限（毫秒）
+TIMING_BUCKETS_MS = (1, 2, 5, 10, 17, 33, 50, 100, 250, 500, 1000, 5000, 30000)
+
+
+class MetricEvent(NamedTuple):
+    """一次上报
+
+    kind 为 timing（毫秒）、counter（增量）或 gauge（当前值）
+    """
+    kind: str
+    name: str
+    value: float
+    labels: Dict[str, str]
+    time: float
+
+
+class Metrics:
+    """指标上报入口，把事件分发给已注册的观察者
+
+    观察者是带 observe(event) 方法的对象，可选提供 close()。
+    """
+
+    def __init__(self):
+        self._observers: List = []
+
+    @property
+    def enabled(self) -> bool:
+        """是否有观察者；上报前需要额外计算时可先检查"""
+        return bool(self._observers)
+
+    def add_observer(self, observer) -> None:
+        """注册观察者"""
+        self._observers = self._observers + [observer]
+
+    def remove_observer(self, observer) -> None:
+        """注销观察者"""
+        self._observers = [item for item in self._observers if item is not observer]
+
+    def _emit(self, kind: str, name: str, value: float, labels: Dict[str, str]) -> None:
+        event = MetricEvent(kind, name, value, labels, time.time())
+        for observer in self._observers:
+            try:
+                observer.observe(event)
+            except Exception as e:
+                print(f"指标导出出错: {e}")
+
+    def timing(self, name: str, ms: float, **labels: str) -> None:
+        """上报一次耗时（毫秒）"""
+        if self._observers:
+            self._emit("timing", name, ms, labels)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        """计数器增加 value"""
+        if self._observers:
+            self._emit("counter", name, value, labels)
+
+    def gauge(self, name: str, value: float, **labels: str) -> None:
+        """上报当前值"""
+        if self._observers:
+            self._emit("gauge", name, value, labels)
+
+    def close(self) -> None:
+        """关闭所有观察者"""
+        observers, self._observers = self._observers, []
+        for observer in observers:
+            close = getattr(observer, "close", None)
+            if close is not None:
+                close()
+
+
+class JsonLinesExporter:
+    """把每个事件作为一行JSON追加到文件"""
+
+    def __init__(self, path: str):
+        """初始化导出器
+
+        Args:
+            path: 输出文件路径
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def observe(self, event: MetricEvent) -> None:
+        line = json.dumps({"time": round(event.time, 6), "kind": event.kind, "name": event.name,
+                           "value": event.value, **({"labels": event.labels} if event.labels else {})},
+                          ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + '\n')
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class PrometheusExporter:
+    """聚合事件并以 Prometheus 文本格式在本机提供 /metrics
+
+    counter 累加，gauge 取最后一次的值，timing 汇总为直方图（毫秒）。
+    所有指标名加 lucky_draw_ 前缀。
+    """
+
+    PREFIX = "lucky_draw_"
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1"):
+        """初始化导出器并在后台线程启动HTTP服务
+
+        Args:
+            port: 监听端口，为0时由系统分配（见 self.port）
+            host: 监听地址，默认只监听本机
+        """
+        # 延迟导入：只有启用导出器时才加载 http.server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple], float] = {}
+        # (名称, 标签) -> [各桶计数..., +Inf 桶, 总数, 总和]
+        self._histograms: Dict[Tuple[str, Tuple], List[float]] = {}
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="PrometheusExporter", daemon=True)
+        self._thread.start()
+
+    def observe(self, event: MetricEvent) -> None:
+        key = (event.name, tuple(sorted(event.labels.items())))
+        with self._lock:
+            if event.kind == "counter":
+                self._counters[key] = self._counters.get(key, 0) + event.value
+            elif event.kind == "gauge":
+                self._gauges[key] = event.value
+            else:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = [0] * (len(TIMING_BUCKETS_MS) + 3)
+                for i, bound in enumerate(TIMING_BUCKETS_MS):
+                    if event.value <= bound:
+                        histogram[i] += 1
+                histogram[-3] += 1     # +Inf 桶
+                histogram[-2] += 1
+                histogram[-1] += event.value
+
+    @staticmethod
+    def _labels(labels: Tuple, extra: str = "") -> str:
+        parts = [f'{name}="{value}"' for name, value in labels]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        """生成 Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            for kind, series in (("counter", self._counters), ("gauge", self._gauges)):
+                declared = set()
+                for (name, labels), value in sorted(series.items()):
+                    metric = self.PREFIX + name + ("_total" if kind == "counter" else "")
+                    if metric not in declared:
+                        declared.add(metric)
+                        lines.append(f"# TYPE {metric} {kind}")
+                    lines.append(f"{metric}{self._labels(labels)} {value}")
+            declared = set()
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                metric = self.PREFIX + name
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                for bound, count in zip(TIMING_BUCKETS_MS + ("+Inf",), histogram):
+                    bucket_labels = self._labels(labels, 'le="%s"' % bound)
+                    lines.append(f"{metric}_bucket{bucket_labels} {count}")
+                lines.append(f"{metric}_count{self._labels(labels)} {histogram[-2]}")
+                lines.append(f"{metric}_sum{self._labels(labels)} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def metrics_from_env() -> Metrics:
+    """按环境变量创建指标入口，未配置时返回没有观察者的 Metrics"""
+    metrics = Metrics()
+    path = os.environ.get("LUCKY_DRAW_METRICS_JSONL")
+    if path:
+        metrics.add_observer(JsonLinesExporter(path))
+    port = os.environ.get("LUCKY_DRAW_METRICS_PORT")
+    if port:
+        try:
+            metrics.add_observer(PrometheusExporter(int(port)))
+        except (OSError, ValueError) as e:
+            print(f"无法启动 Prometheus 导出器: {e}")
+    return metrics
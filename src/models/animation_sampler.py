@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+import threading
+from typing import List, Optional, Tuple
+
+# 每个窗口预先抽取的候选人数
+ANIMATION_WINDOW = 4096
+
+
+class AnimationSampler:
+    """抽奖动画的候选人环形缓冲区
+
+    每轮开始时从剩余参与者中抽取一个窗口的候选人并物化为 (部门, 姓名)，
+    之后每帧只是从环形缓冲区切出 count 人，开销为 O(count)，与名单规模无关。
+    读到窗口一半时在后台线程准备下一个窗口，绕回起点时换上。
+
+    动画使用独立的随机数生成器，不影响抽奖结果的随机序列。
+    参与者池发生变化（抽奖、重置、导入）前须调用 reset，等待后台填充结束并丢弃旧窗口。
+    """
+
+    def __init__(self, pool=None, window: int = ANIMATION_WINDOW):
+        """初始化动画采样器
+
+        Args:
+            pool: 参与者池
+            window: 每个窗口的候选人数
+        """
+        self.pool = pool
+        self.window = window
+        self.rng = random.Random()
+        self._buffer: Optional[List[Tuple[str, str]]] = None
+        self._next: Optional[List[Tuple[str, str]]] = None
+        self._cursor = 0
+        self._refill_thread: Optional[threading.Thread] = None
+
+    def reset(self, pool=None) -> None:
+        """丢弃已准备的窗口
+
+        Args:
+            pool: 新的参与者池，默认沿用当前参与者池
+        """
+        if self._refill_thread is not None:
+            self._refill_thread.join()
+            self._refill_thread = None
+        if pool is not None:
+            self.pool = pool
+        self._buffer = None
+        self._next = None
+        self._cursor = 0
+
+    def _fill(self) -> List[Tuple[str, str]]:
+        """抽取一个窗口的候选人，O(window)"""
+        ids = self.pool.sample(min(self.window, len(self.pool)), rng=self.rng)
+        return [self.pool.get(pid) for pid in ids]
+
+    def _refill(self) -> None:
+        self._next = self._fill()
+
+    def _start_refill(self) -> None:
+        if self._refill_thread is None and self._next is None:
+            self._refill_thread = threading.Thread(target=self._refill, name="AnimationRefill", daemon=True)
+            self._refill_thread.start()
+
+    def next_frame(self, count: int) -> List[Tuple[str, str]]:
+        """获取下一帧要展示的候选人
+
+        Args:
+            count: 本帧展示人数，超过窗口大小时按窗口大小处理
+
+        Returns:
+            List[Tuple[str, str]]: 互不重复的 (部门, 姓名) 列表
+        """
+        if self.pool is None or not len(self.pool) or count <= 0:
+            return []
+        if self._buffer is None:
+            self._buffer = self._fill()
+            self._cursor = 0
+
+        buffer = self._buffer
+        size = len(buffer)
+        count = min(count, size)
+        end = self._cursor + count
+        if end <= size:
+            frame = buffer[self._cursor:end]
+        else:
+            frame = buffer[self._cursor:] + buffer[:end - size]
+        self._cursor = end
+
+        if self._cursor * 2 >= size:
+            self._start_refill()
+        if self._cursor >= size:
+            # 绕回起点：换上后台准备好的窗口，否则继续使用当前窗口
+            self._cursor -= size
+            if self._refill_thread is not None and not self._refill_thread.is_alive():
+                self._refill_thread.join()
+                self._refill_thread = None
+            if self._next is not None and self._refill_thread is None:
+                self._buffer, self._next = self._next, None
+                self._cursor = 0
+        return frame
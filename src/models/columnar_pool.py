@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，未安装时只使用 ParticipantPool
+    np = None
+
+# 暂存行数达到该值时先压缩为 numpy 块，使批量导入时的额外内存保持恒定
+PENDING_CHUNK_ROWS = 65_536
+
+
+def is_available() -> bool:
+    """列式后端是否可用（需要 numpy）"""
+    return np is not None
+
+
+class ColumnarPool:
+    """基于 numpy 的列式参与者池，接口与 ParticipantPool 一致
+
+    部门按字典编码为整数数组，姓名保存在一个连续的定长字符串数组中，
+    剩余参与者是一个ID数组的前缀。抽奖时用 Generator.choice(replace=False)
+    选出位置，再以向量化的交换删除移出中奖者，整体为 O(k)。
+
+    新增的参与者先暂存在列表中并按块压缩，首次查询时再合并进列数组。
+    列数组按容量预留空间（每次扩容约 1/8），名单导入后陆续追加少量参与者时，
+    合并开销与新增人数成正比，而不是每次复制整个数组。
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        """初始化列式参与者池
+
+        Args:
+            rng: 随机数生成器，每次抽样从它派生 numpy Generator 的种子，
+                 使整个模型只有一个随机状态来源
+        """
+        if np is None:
+            raise ImportError("ColumnarPool 需要安装 numpy")
+        self.rng = rng if rng is not None else random.Random()
+        self._departments: List[str] = []        # 部门编码 -> 部门名称
+        self._department_codes: Dict[str, int] = {}
+        self._codes = np.empty(0, dtype=np.int32)  # ID -> 部门编码
+        self._names = np.empty(0, dtype=str)       # ID -> 姓名
+        self._ids = np.empty(0, dtype=np.int64)    # 全部ID的排列，前 _size 项为剩余参与者
+        self._pos = np.empty(0, dtype=np.int64)    # ID -> 在 _ids 中的位置
+        self._total = 0                            # 已合并的参与者数，以上数组只有前 _total 项有效
+        self._size = 0
+        self._pending_codes: List[int] = []
+        self._pending_names: List[str] = []
+        self._pending_chunks: list = []            # 已压缩的暂存块 (codes, names)
+        self._pending_count = 0
+
+    @classmethod
+    def from_columns(cls, departments: List[str], codes, names,
+                     rng: Optional[random.Random] = None) -> 'ColumnarPool':
+        """由已编码的列数组创建参与者池，所有参与者都在剩余池中
+
+        codes 和 names 直接作为列数组使用，不复制，可以是只读的 mmap 视图
+        （见 src.models.roster_cache）；之后追加参与者时才复制到新分配的数组。
+
+        Args:
+            departments: 部门编码 -> 部门名称
+            codes: ID -> 部门编码（int32 数组）
+            names: ID -> 姓名（定长字符串数组）
+            rng: 随机数生成器
+
+        Returns:
+            ColumnarPool: 参与者池
+        """
+        pool = cls(rng)
+        pool._departments = list(departments)
+        pool._department_codes = {department: code for code, department in enumerate(pool._departments)}
+        pool._codes = codes
+        pool._names = names
+        pool._total = pool._size = len(codes)
+        pool._ids = np.arange(pool._total, dtype=np.int64)
+        pool._pos = np.arange(pool._total, dtype=np.int64)
+        return pool
+
+    def columns(self) -> Tuple[List[str], 'np.ndarray', 'np.ndarray']:
+        """部门字典以及全部参与者的部门编码和姓名数组（视图，不可修改），与 from_columns 对应"""
+        self._flush()
+        return self._departments, self._codes[:self._total], self._names[:self._total]
+
+    def _encode(self, department: str) -> int:
+        code = self._department_codes.get(department)
+        if code is None:
+            code = len(self._departments)
+            self._departments.append(department)
+            self._department_codes[department] = code
+        return code
+
+    def _compress_pending(self) -> None:
+        """把暂存列表压缩为一个 numpy 块"""
+        if self._pending_names:
+            self._pending_chunks.append((np.array(self._pending_codes, dtype=np.int32),
+                                         np.array(self._pending_names, dtype=str)))
+            self._pending_codes = []
+            self._pending_names = []
+
+    def _append(self, department: str, name: str) -> None:
+        self._pending_codes.append(self._encode(department))
+        self._pending_names.append(name)
+        self._pending_count += 1
+        if len(self._pending_names) >= PENDING_CHUNK_ROWS:
+            self._compress_pending()
+
+    def _flush(self) -> None:
+        """把暂存的参与者合并进列数组"""
+        if not self._pending_count:
+            return
+        self._compress_pending()
+        start = self._total
+        count = self._pending_count
+        end = start + count
+
+        codes = np.concatenate([codes for codes, _ in self._pending_chunks])
+        names = np.concatenate([names for _, names in self._pending_chunks])
+        self._pending_chunks = []
+        self._pending_count = 0
+        self._reserve(end, names.dtype)
+        self._codes[start:end] = codes
+        self._names[start:end] = names
+
+        # 新ID先放在末尾，再与紧跟剩余前缀的已移除ID成块交换，O(新增人数)
+        new_ids = np.arange(start, end, dtype=np.int64)
+        self._ids[start:end] = new_ids
+        self._pos[start:end] = new_ids
+        swap = min(count, start - self._size)
+        if swap:
+            front = np.arange(self._size, self._size + swap, dtype=np.int64)
+            back = np.arange(end - swap, end, dtype=np.int64)
+            front_ids = self._ids[front].copy()
+            back_ids = self._ids[back].copy()
+            self._ids[front] = back_ids
+            self._ids[back] = front_ids
+            self._pos[back_ids] = front
+            self._pos[front_ids] = back
+        self._total = end
+        self._size += count
+
+    def _reserve(self, capacity: int, name_dtype) -> None:
+        """保证列数组至少有 capacity 项，姓名数组足以容纳 name_dtype 的长度"""
+        if name_dtype.itemsize > self._names.dtype.itemsize:
+            # 出现更长的姓名时加宽姓名数组（同样按比例预留，避免反复加宽）
+            width = max(name_dtype.itemsize, self._names.dtype.itemsize * 5 // 4) // 4
+            self._names = self._names.astype(f'<U{width}')
+        old = len(self._codes)
+        if capacity <= old:
+            return
+        # 首次合并时容量与人数相同，之后按约 1/8 预留，保证追加的均摊开销为 O(1)
+        if old:
+            capacity = max(capacity, old + old // 8 + 4096)
+        for attr in ('_codes', '_names', '_ids', '_pos'):
+            array = getattr(self, attr)
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self._total] = array[:self._total]
+            setattr(self, attr, grown)
+
+    def add(self, department: str, name: str) -> int:
+        """添加一位参与者
+
+        Args:
+            department: 部门
+            name: 姓名
+
+        Returns:
+            int: 新参与者的ID
+        """
+        pid = self.total
+        self._append(department, name)
+        return pid
+
+    def extend(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """批量添加参与者
+
+        Args:
+            rows: (部门, 姓名) 序列
+        """
+        # 每行都会执行，_append 在此内联
+        rows = iter(rows)
+        department_codes = self._department_codes
+        while True:
+            codes, names = self._pending_codes, self._pending_names
+            before = len(names)
+            try:
+                for department, name in islice(rows, PENDING_CHUNK_ROWS - before):
+                    code = department_codes.get(department)
+                    if code is None:
+                        code = self._encode(department)
+                    codes.append(code)
+                    names.append(name)
+            finally:
+                self._pending_count += len(names) - before
+            if len(names) < PENDING_CHUNK_ROWS:
+                return
+            self._compress_pending()
+
+    def __len__(self) -> int:
+        """剩余参与者数量"""
+        return self._size + self._pending_count
+
+    def __contains__(self, pid: int) -> bool:
+        """参与者是否仍在剩余池中"""
+        self._flush()
+        return 0 <= pid < self._total and self._pos[pid] < self._size
+
+    @property
+    def total(self) -> int:
+        """参与者总数（含已中奖）"""
+        return self._total + self._pending_count
+
+    def get(self, pid: int) -> Tuple[str, str]:
+        """获取参与者信息
+
+        Args:
+            pid: 参与者ID
+
+        Returns:
+            Tuple[str, str]: (部门, 姓名)
+        """
+        self._flush()
+        return self._departments[self._codes[pid]], str(self._names[pid])
+
+    def ids(self) -> List[int]:
+        """剩余参与者ID列表（副本）"""
+        self._flush()
+        return self._ids[:self._size].tolist()
+
+    def _swap(self, i: int, j: int) -> None:
+        a, b = int(self._ids[i]), int(self._ids[j])
+        self._ids[i], self._ids[j] = b, a
+        self._pos[a], self._pos[b] = j, i
+
+    def remove(self, pid: int) -> None:
+        """从剩余池中移除参与者（交换删除，O(1)）
+
+        Args:
+            pid: 参与者ID
+        """
+        self._flush()
+        index = int(self._pos[pid])
+        if index >= self._size:
+            raise KeyError(pid)
+        self._swap(index, self._size - 1)
+        self._size -= 1
+
+    def restore(self, pid: int) -> None:
+        """将已移除的参与者放回剩余池（O(1)）
+
+        Args:
+            pid: 参与者ID
+        """
+        self._flush()
+        index = int(self._pos[pid])
+        if index < self._size:
+            return
+        self._swap(index, self._size)
+        self._size += 1
+
+    def _sample_positions(self, count: int, rng: Optional[random.Random] = None):
+        generator = np.random.default_rng((rng or self.rng).getrandbits(64))
+        return generator.choice(self._size, size=count, replace=False)
+
+    def sample(self, count: int, rng: Optional[random.Random] = None) -> List[int]:
+        """随机抽取若干参与者ID，不移除
+
+        Args:
+            count: 抽取数量，超过剩余人数时按剩余人数处理
+            rng: 随机数生成器，默认使用参与者池的生成器
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        self._flush()
+        count = min(count, self._size)
+        if count <= 0:
+            return []
+        return self._ids[self._sample_positions(count, rng)].tolist()
+
+    def take(self, count: int) -> List[int]:
+        """随机抽取若干参与者ID并从剩余池中移除
+
+        Args:
+            count: 抽取数量
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        self._flush()
+        count = min(count, self._size)
+        if count <= 0:
+            return []
+        positions = self._sample_positions(count)
+        chosen = self._ids[positions].copy()
+        self._remove_positions(positions)
+        return chosen.tolist()
+
+    def _remove_positions(self, positions) -> None:
+        """移除前缀内若干互不相同位置上的参与者，O(k)"""
+        chosen = self._ids[positions].copy()
+        count = len(positions)
+        # 向量化交换删除：用前缀末尾未被抽中的ID填补前缀内的空位，
+        # 中奖者整体移到前缀之外
+        new_size = self._size - count
+        holes = positions[positions < new_size]
+        tail = np.arange(new_size, self._size)
+        movers = tail[~np.isin(tail, positions)]
+        moved_ids = self._ids[movers]
+        self._ids[holes] = moved_ids
+        self._pos[moved_ids] = holes
+        self._ids[new_size:self._size] = chosen
+        self._pos[chosen] = tail
+        self._size = new_size
+
+    def remove_many(self, pids: List[int]) -> None:
+        """批量移除参与者，忽略已不在池中的ID，O(k)
+
+        Args:
+            pids: 参与者ID列表
+        """
+        self._flush()
+        if not pids:
+            return
+        positions = np.unique(self._pos[np.asarray(pids, dtype=np.int64)])
+        self._remove_positions(positions[positions < self._size])
+
+    def reset(self, canonical: bool = False) -> None:
+        """恢复所有参与者到剩余池，O(1)
+
+        已移除的ID都在剩余前缀之后，把前缀扩展到整个排列即可；
+        暂存的新参与者合并时本就会放入剩余池。
+
+        Args:
+            canonical: 同时把排列恢复为按ID排列（O(n)），见 ParticipantPool.reset
+        """
+        if canonical:
+            self._flush()
+            self._ids[:self._total] = np.arange(self._total, dtype=np.int64)
+            self._pos[:self._total] = self._ids[:self._total]
+        self._size = self._total
+
+    def clear(self) -> None:
+        """清空参与者池"""
+        self._departments = []
+        self._department_codes = {}
+        self._codes = np.empty(0, dtype=np.int32)
+        self._names = np.empty(0, dtype=str)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._pos = np.empty(0, dtype=np.int64)
+        self._total = 0
+        self._size = 0
+        self._pending_codes = []
+        self._pending_names = []
+        self._pending_chunks = []
+        self._pending_count = 0
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import heapq
+import random
+from typing import Callable, Dict, List, Optional
+
+
+class DepartmentIndex:
+    """按部门划分的剩余参与者索引
+
+    每个部门维护一个剩余ID数组及 ID -> 位置 的反向索引，
+    中奖者移除和放回都是 O(1)，按部门抽取 k 人是 O(k)。
+    索引由模型在首次分层抽奖时构建，之后随抽奖增量维护。
+    """
+
+    def __init__(self, pool):
+        """根据参与者池的剩余参与者构建索引，O(n)
+
+        Args:
+            pool: 参与者池
+        """
+        self.pool = pool
+        self._members: Dict[str, List[int]] = {}     # 部门 -> 剩余ID
+        self._pos: List[int] = [-1] * pool.total       # ID -> 在部门数组中的位置，-1 表示不在索引中
+        for pid in pool.ids():
+            self.add(pid)
+
+    def add(self, pid: int) -> None:
+        """把参与者加入所在部门，O(1)"""
+        if pid >= len(self._pos):
+            self._pos.extend([-1] * (pid + 1 - len(self._pos)))
+        if self._pos[pid] >= 0:
+            return
+        members = self._members.setdefault(self.pool.get(pid)[0], [])
+        self._pos[pid] = len(members)
+        members.append(pid)
+
+    def discard(self, pid: int) -> None:
+        """把参与者移出所在部门（交换删除，O(1)）"""
+        if pid >= len(self._pos) or self._pos[pid] < 0:
+            return
+        members = self._members[self.pool.get(pid)[0]]
+        index = self._pos[pid]
+        last = members.pop()
+        if last != pid:
+            members[index] = last
+            self._pos[last] = index
+        self._pos[pid] = -1
+
+    def count(self, department: str) -> int:
+        """部门剩余人数"""
+        return len(self._members.get(department, ()))
+
+    def counts(self) -> Dict[str, int]:
+        """各部门剩余人数（不含已抽完的部门），O(部门数)"""
+        return {department: len(members) for department, members in self._members.items() if members}
+
+    def sample(self, department: str, count: int, rng: random.Random,
+               weight: Optional[Callable[[int], float]] = None) -> List[int]:
+        """从部门中无放回抽取若干参与者ID，不移除
+
+        Args:
+            department: 部门
+            count: 抽取数量，超过部门剩余人数时按剩余人数处理
+            rng: 随机数生成器
+            weight: 参与者ID -> 权重；提供时按权重抽取，
+                    耗时为 O(部门人数 · log k)
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        members = self._members.get(department, [])
+        count = min(count, len(members))
+        if count <= 0:
+            return []
+        if weight is None:
+            return rng.sample(members, count)
+        # Efraimidis-Spirakis 加权无放回抽样：取 u^(1/w) 最大的 k 个
+        return heapq.nlargest(count, members, key=lambda pid: rng.random() ** (1.0 / weight(pid)))
+
+
+def allocate_proportional(counts: Dict[str, int], num_winners: int,
+                          min_per_department: int = 0,
+                          rng: Optional[random.Random] = None) -> Dict[str, int]:
+    """按部门人数比例分配中奖名额（最大余数法）
+
+    每个部门先分得 min_per_department 个保底名额（不超过部门人数），
+    剩余名额按各部门剩余可分配人数的比例分配，余数相同者随机排序。
+
+    Args:
+        counts: 各部门剩余人数
+        num_winners: 总中奖人数
+        min_per_department: 每个部门的保底名额
+        rng: 随机数生成器，用于余数相同时的排序
+
+    Returns:
+        Dict[str, int]: 部门 -> 名额，只包含名额大于0的部门
+
+    Raises:
+        ValueError: 总人数不足或保底名额之和超过总中奖人数
+    """
+    rng = rng if rng is not None else random.Random()
+    if num_winners > sum(counts.values()):
+        raise ValueError("剩余人数不足")
+
+    quotas = {department: min(min_per_department, count) for department, count in counts.items()}
+    rest = num_winners - sum(quotas.values())
+    if rest < 0:
+        raise ValueError("保底名额之和超过中奖人数")
+
+    capacity = {department: counts[department] - quotas[department] for department in counts}
+    total_capacity = sum(capacity.values())
+    if rest and total_capacity:
+        remainders = []
+        for department, cap in capacity.items():
+            share, remainder = divmod(rest * cap, total_capacity)
+            quotas[department] += share
+            remainders.append((-remainder, rng.random(), department))
+        leftover = num_winners - sum(quotas.values())
+        for _, _, department in sorted(remainders)[:leftover]:
+            quotas[department] += 1
+
+    return {department: quota for department, quota in quotas.items() if quota > 0}
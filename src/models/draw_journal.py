@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def encode_rng_state(rng: random.Random) -> list:
+    """把 random.Random 的状态转换为可写入JSON的列表"""
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def decode_rng_state(state: list) -> tuple:
+    """把 encode_rng_state 的结果还原为 random.Random.setstate 的参数"""
+    version, internal, gauss_next = state
+    return version, tuple(internal), gauss_next
+
+
+class DrawJournal:
+    """只追加的抽奖日志（JSON Lines），用于崩溃后恢复抽奖状态
+
+    每条记录一行，写入后立即 fsync。记录类型:
+        roster  开始一个新会话（导入名单），path 为名单路径
+        round   一轮抽奖，包含轮次、中奖者ID和抽奖后的随机数状态
+        undo    撤销最后一轮，该轮中奖者回到剩余池
+        redraw  某轮中奖者缺席，由补抽者替换，缺席者不再参与抽奖
+        reset   重置抽奖状态
+    恢复时只需回放最后一次 roster/reset 之后的 round/undo/redraw 记录。
+    带随机数状态的记录都把 rng 写在最后一个字段，回放时只解析最新的一个。
+    """
+
+    def __init__(self, path: str):
+        """初始化抽奖日志
+
+        Args:
+            path: 日志文件路径
+        """
+        self.path = path
+        self._tail_checked = False
+
+    def _repair_tail(self) -> None:
+        """截掉崩溃时写了一半的末行，避免与下一条记录粘连"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # 向前查找最后一个换行符
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
+
+    def append(self, *records: Dict[str, Any]) -> None:
+        """追加记录并刷新到磁盘，多条记录只 fsync 一次
+
+        Args:
+            records: 记录内容，须包含 type 字段
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if not self._tail_checked:
+            self._repair_tail()
+            self._tail_checked = True
+        lines = [json.dumps(record, ensure_ascii=False, separators=(',', ':')) for record in records]
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record_roster(self, roster_path: str, total: int, duplicate_policy: Optional[str] = None,
+                      sources: Optional[List[str]] = None) -> None:
+        """记录导入名单，开始新的会话
+
+        参与者ID依赖重复处理方式和多个来源的合并顺序，一并记录。
+        """
+        record = {"type": "roster", "path": os.path.abspath(roster_path), "total": total}
+        if duplicate_policy is not None:
+            record["duplicates"] = duplicate_policy
+        if sources is not None:
+            record["sources"] = [os.path.abspath(path) for path in sources]
+        self.append(record)
+
+    def record_round(self, round_num: int, participant_ids: List[int], rng: random.Random) -> None:
+        """记录一轮抽奖（随机数状态须为最后一个字段，见 read_session）"""
+        self.record_rounds([(round_num, participant_ids)], rng)
+
+    def record_rounds(self, rounds: List[Tuple[int, List[int]]], rng: random.Random) -> None:
+        """一次写入并刷新多轮抽奖记录，随机数状态只写在最后一轮
+
+        Args:
+            rounds: (轮次, 中奖者ID) 列表
+            rng: 抽奖后的随机数生成器
+        """
+        if not rounds:
+            return
+        records = [{"type": "round", "round": round_num, "ids": participant_ids}
+                   for round_num, participant_ids in rounds]
+        records[-1]["rng"] = encode_rng_state(rng)
+        self.append(*records)
+
+    def record_undo(self, round_num: int, rng: random.Random) -> None:
+        """记录撤销第 round_num 轮（须为最后一轮）
+
+        撤销不回退随机数状态，恢复后重新抽奖不会再抽出同样的结果。
+        """
+        self.append({"type": "undo", "round": round_num, "rng": encode_rng_state(rng)})
+
+    def record_redraw(self, round_num: int, absent_id: int, participant_id: int,
+                      rng: random.Random) -> None:
+        """记录第 round_num 轮的缺席者 absent_id 由 participant_id 替换"""
+        self.append({"type": "redraw", "round": round_num, "absent": absent_id,
+                     "id": participant_id, "rng": encode_rng_state(rng)})
+
+    def record_reset(self) -> None:
+        """记录重置抽奖状态"""
+        self.append({"type": "reset"})
+
+    def last_roster(self) -> Optional[Dict[str, Any]]:
+        """最后一个会话的 roster 记录（path，以及记录时的 duplicates 和 sources）
+
+        Returns:
+            Optional[Dict[str, Any]]: roster 记录，日志不存在或没有会话时返回 None
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            if line.startswith('{"type":"roster"'):
+                try:
+                    return json.loads(line)
+                except ValueError:
+                    continue
+        return None
+
+    def read_session(self, roster_path: str, duplicate_policy: Optional[str] = None,
+                     sources: Optional[List[str]] = None) -> Optional[List[Dict[str, Any]]]:
+        """读取最后一个会话中需要回放的 round 记录
+
+        最后一个会话的名单与 roster_path 不一致或日志不存在时返回 None；
+        崩溃时写了一半的末行会被忽略。只有最新的随机数状态需要恢复，
+        其余记录在解析前截掉 rng 字段以加快回放。undo/redraw 记录在返回前
+        应用到 round 记录上：被撤销的轮次不返回，补抽者替换缺席者，
+        缺席者ID列在该轮的 absent 字段中；最新的随机数状态放在最后一轮的 rng 字段。
+
+        Args:
+            roster_path: 当前名单路径
+            duplicate_policy: 当前的重复处理方式，与会话记录不一致时不回放
+            sources: 从多个来源合并名单时的来源列表，与会话记录不一致时不回放
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: 最后一次 roster/reset 之后仍然有效的 round 记录
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        events: List[Dict[str, Any]] = []
+        rng = None
+        collecting = True
+        session_path = None
+        session_policy = None
+        session_sources = None
+        # 从末尾向前扫描：最后一次 roster/reset 之后的记录需要回放，
+        # 再继续向前找到所属的 roster 记录
+        for line in reversed(lines):
+            if not collecting and not line.startswith('{"type":"roster"'):
+                continue
+            if rng is not None:
+                cut = line.rfind(',"rng":')
+                if cut > 0:
+                    line = line[:cut] + '}'
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            kind = record.get("type")
+            if kind in ("round", "undo", "redraw") and collecting:
+                events.append(record)
+                if rng is None:
+                    rng = record.get("rng")
+            elif kind == "reset":
+                collecting = False
+            elif kind == "roster":
+                session_path = record.get("path")
+                session_policy = record.get("duplicates")
+                session_sources = record.get("sources")
+                break
+
+        if sources is not None:
+            sources = [os.path.abspath(path) for path in sources]
+        if (session_path != os.path.abspath(roster_path) or session_policy != duplicate_policy
+                or session_sources != sources):
+            return None
+
+        rounds: List[Dict[str, Any]] = []
+        for record in reversed(events):
+            kind = record["type"]
+            if kind == "round":
+                rounds.append(record)
+            elif kind == "undo":
+                if rounds and rounds[-1]["round"] == record["round"]:
+                    rounds.pop()
+            else:
+                for target in reversed(rounds):
+                    if target["round"] == record["round"]:
+                        if record["absent"] in target["ids"]:
+                            target["ids"][target["ids"].index(record["absent"])] = record["id"]
+                            target.setdefault("absent", []).append(record["absent"])
+                        break
+        if rounds and rng is not None:
+            rounds[-1]["rng"] = rng
+        return rounds
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""抽奖资格：排除规则
+
+往届大奖得主、休假人员和组织者等不参与抽奖。排除规则把这些人编译为参与者ID位图，
+LuckyDrawModel 在加载名单、重置抽奖时以及两轮之间把位图应用到剩余池；
+名单末尾追加的参与者只逐个匹配（见 ExclusionRule.match），不重新编译。
+
+规则:
+    ExclusionList  名单文件中的人（格式同参与者名单：CSV / Excel / Parquet），按身份键匹配
+    PastWinners    抽奖历史库中已结束活动的获奖者，可限定最近几次活动和轮次
+规则之间可用 |（并集）、&（交集）和 -（差集）组合，例如排除最近3次活动第1轮（大奖）的得主、
+休假人员和组织者:
+    PastWinners(3, round_nums=[1]) | ExclusionList("on_leave.csv") | ExclusionList("organizers.csv")
+"""
+
+import os
+import weakref
+from typing import Iterable, List, Optional, Sequence, Set
+
+from src.models.history_store import HistoryStore
+from src.models.identity_index import IdentityIndex
+from src.models.roster_sources import parse_source
+
+
+class IdSet:
+    """参与者ID集合，以位图保存：第 pid 位为1表示包含该参与者
+
+    200万人的位图只有 250KB。并集、交集和差集转换为 Python 整数后按位运算，
+    在C层面按机器字处理；查询单个ID是 O(1)。
+    """
+
+    __slots__ = ("_bitmap",)
+
+    def __init__(self, bitmap: bytes = b""):
+        """初始化参与者ID集合
+
+        Args:
+            bitmap: 小端位图，第 pid 位对应参与者 pid
+        """
+        self._bitmap = bytes(bitmap)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> 'IdSet':
+        """由参与者ID构建，O(k)"""
+        ids = list(ids)
+        if not ids:
+            return cls()
+        bitmap = bytearray((max(ids) >> 3) + 1)
+        for pid in ids:
+            bitmap[pid >> 3] |= 1 << (pid & 7)
+        return cls(bitmap)
+
+    @classmethod
+    def _from_int(cls, bits: int) -> 'IdSet':
+        return cls(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'))
+
+    def _int(self) -> int:
+        return int.from_bytes(self._bitmap, 'little')
+
+    def ids(self) -> List[int]:
+        """按升序排列的参与者ID，O(n / 字长 + k)"""
+        # 反转的二进制串中第 i 个字符即第 i 位，用 str.find 跳过连续的0
+        text = bin(self._int())[:1:-1]
+        ids = []
+        find = text.find
+        index = find('1')
+        while index >= 0:
+            ids.append(index)
+            index = find('1', index + 1)
+        return ids
+
+    def __contains__(self, pid: int) -> bool:
+        index = pid >> 3
+        return index < len(self._bitmap) and bool(self._bitmap[index] >> (pid & 7) & 1)
+
+    def __len__(self) -> int:
+        return self._int().bit_count()
+
+    def __bool__(self) -> bool:
+        return self._bitmap.strip(b"\x00") != b""
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IdSet) and self._bitmap.rstrip(b"\x00") == other._bitmap.rstrip(b"\x00")
+
+    def __or__(self, other: 'IdSet') -> 'IdSet':
+        return IdSet._from_int(self._int() | other._int())
+
+    def __and__(self, other: 'IdSet') -> 'IdSet':
+        return IdSet._from_int(self._int() & other._int())
+
+    def __sub__(self, other: 'IdSet') -> 'IdSet':
+        return IdSet._from_int(self._int() & ~other._int())
+
+
+class ExclusionRule:
+    """排除规则的基类：编译为应排除的参与者ID
+
+    每次编译都重新读取规则依赖的文件或历史库，两轮之间重新编译即可反映其变化。
+    match 只判断新登记的参与者，历史库沿用上次编译的查询结果。
+    """
+
+    def compile(self, identity: IdentityIndex, history: Optional[HistoryStore]) -> IdSet:
+        """编译为当前名单中应排除的参与者
+
+        Args:
+            identity: 当前名单的身份索引
+            history: 抽奖历史库，没有时为None
+
+        Returns:
+            IdSet: 应排除的参与者ID
+
+        Raises:
+            OSError: 规则依赖的文件无法读取
+        """
+        raise NotImplementedError
+
+    def match(self, identity: IdentityIndex, pids: Sequence[int]) -> IdSet:
+        """判断新登记的参与者中哪些应排除，O(len(pids))
+
+        不查询历史库，沿用上次 compile 的结果；文件只在变化时重新解析。
+
+        Args:
+            identity: 当前名单的身份索引
+            pids: 新登记的参与者ID
+
+        Returns:
+            IdSet: pids 中应排除的参与者ID
+
+        Raises:
+            OSError: 规则依赖的文件无法读取
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _match_keys(identity: IdentityIndex, pids: Sequence[int], keys: Set[str]) -> IdSet:
+        """pids 中身份键在 keys 里的参与者"""
+        if not keys:
+            return IdSet()
+        return IdSet.from_ids(pid for pid in pids if identity.key_of(pid) in keys)
+
+    def __or__(self, other: 'ExclusionRule') -> 'ExclusionRule':
+        return UnionRule(self, other)
+
+    def __and__(self, other: 'ExclusionRule') -> 'ExclusionRule':
+        return IntersectionRule(self, other)
+
+    def __sub__(self, other: 'ExclusionRule') -> 'ExclusionRule':
+        return DifferenceRule(self, other)
+
+
+class ExclusionList(ExclusionRule):
+    """名单文件中的人
+
+    文件格式与参与者名单相同（department、name 列，可选 employee_id 列），
+    按与 IdentityIndex 相同的身份键匹配，不在当前名单中的人被忽略。
+    解析结果按文件大小和修改时间缓存；文件和名单都未变时（如两轮之间、重置抽奖时）
+    直接返回上次的编译结果，不再逐个匹配。
+    """
+
+    def __init__(self, path: str):
+        """初始化排除名单
+
+        Args:
+            path: 名单文件路径（CSV / Excel / Parquet）
+        """
+        self.path = path
+        self._stamp = None
+        self._keys: List[str] = []
+        self._key_set: Optional[Set[str]] = None  # 供 match 查找，首次 match 时构建
+        self._compiled = None  # (身份索引的弱引用, 文件标记, 名单人数, 编译结果)
+
+    def keys(self) -> List[str]:
+        """名单中的身份键"""
+        stat = os.stat(self.path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            self._keys = parse_source(self.path).unpack()[2]
+            self._key_set = None
+            self._stamp = stamp
+        return self._keys
+
+    def compile(self, identity: IdentityIndex, history: Optional[HistoryStore]) -> IdSet:
+        keys = self.keys()
+        if self._compiled is not None:
+            ref, stamp, count, excluded = self._compiled
+            if ref() is identity and stamp == self._stamp and count == len(identity):
+                return excluded
+        excluded = IdSet.from_ids(identity.resolve(keys))
+        self._compiled = (weakref.ref(identity), self._stamp, len(identity), excluded)
+        return excluded
+
+    def match(self, identity: IdentityIndex, pids: Sequence[int]) -> IdSet:
+        keys = self.keys()
+        if self._key_set is None:
+            self._key_set = set(keys)
+        return self._match_keys(identity, pids, self._key_set)
+
+
+class PastWinners(ExclusionRule):
+    """抽奖历史库中已结束活动的获奖者，见 HistoryStore.winner_keys"""
+
+    def __init__(self, within_events: Optional[int] = None, round_nums: Optional[Sequence[int]] = None):
+        """初始化往届获奖者规则
+
+        Args:
+            within_events: 只统计最近的若干次活动，默认统计全部历史
+            round_nums: 只统计这些轮次（例如大奖所在的轮次），默认统计所有轮次
+        """
+        self.within_events = within_events
+        self.round_nums = list(round_nums) if round_nums else None
+        self._keys: Set[str] = set()  # 上次编译时查到的获奖者身份键，供 match 使用
+
+    def compile(self, identity: IdentityIndex, history: Optional[HistoryStore]) -> IdSet:
+        if history is None:
+            self._keys = set()
+            return IdSet()
+        keys = history.winner_keys(self.within_events, self.round_nums)
+        self._keys = set(keys)
+        return IdSet.from_ids(identity.resolve(keys))
+
+    def match(self, identity: IdentityIndex, pids: Sequence[int]) -> IdSet:
+        return self._match_keys(identity, pids, self._keys)
+
+
+class UnionRule(ExclusionRule):
+    """满足任一规则即排除"""
+
+    def __init__(self, *rules: ExclusionRule):
+        self.rules = list(rules)
+
+    def compile(self, identity: IdentityIndex, history: Optional[HistoryStore]) -> IdSet:
+        bits = 0
+        for rule in self.rules:
+            bits |= rule.compile(identity, history)._int()
+        return IdSet._from_int(bits)
+
+    def match(self, identity: IdentityIndex, pids: Sequence[int]) -> IdSet:
+        bits = 0
+        for rule in self.rules:
+            bits |= rule.match(identity, pids)._int()
+        return IdSet._from_int(bits)
+
+
+class IntersectionRule(ExclusionRule):
+    """同时满足所有规则才排除"""
+
+    def __init__(self, *rules: ExclusionRule):
+        if not rules:
+            raise ValueError("交集规则至少需要一条规则")
+        self.rules = list(rules)
+
+    def compile(self, identity: IdentityIndex, history: Optional[HistoryStore]) -> IdSet:
+        bits = self.rules[0].compile(identity, history)._int()
+        for rule in self.rules[1:]:
+            bits &= rule.compile(identity, history)._int()
+        return IdSet._from_int(bits)
+
+    def match(self, identity: IdentityIndex, pids: Sequence[int]) -> IdSet:
+        bits = self.rules[0].match(identity, pids)._int()
+        for rule in self.rules[1:]:
+            bits &= rule.match(identity, pids)._int()
+        return IdSet._from_int(bits)
+
+
+class DifferenceRule(ExclusionRule):
+    """满足 include 但不满足 exclude 的人（例如往届得主中本次特邀的人仍可参与）"""
+
+    def __init__(self, include: ExclusionRule, exclude: ExclusionRule):
+        self.include = include
+        self.exclude = exclude
+
+    def compile(self, identity: IdentityIndex, history: Optional[HistoryStore]) -> IdSet:
+        return self.include.compile(identity, history) - self.exclude.compile(identity, history)
+
+    def match(self, identity: IdentityIndex, pids: Sequence[int]) -> IdSet:
+        return self.include.match(identity, pids) - self.exclude.match(identity, pids)
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""抽奖历史库（SQLite）
+
+round_N.csv 每次抽奖活动都会从第1轮重新写起，历史结果会被覆盖；历史库则长期保存
+所有活动的每一轮抽奖，供跨活动查询（例如某人最近几次活动是否中过奖）和审计。
+
+表结构:
+    events        一次抽奖活动：导入名单或重置抽奖时开始，下一次开始时结束
+    participants  在历史中出现过的人，按身份键（见 IdentityIndex）去重，跨活动唯一
+    rounds        每一轮抽奖，撤销的轮次保留并记录撤销时间
+    winners       每轮的获奖者及其获奖时的部门和姓名；缺席后被补抽替换者的状态为 absent
+    event_departments  每次活动各部门的有效获奖人数，随每轮写入、撤销和补抽在同一事务中增量维护，
+                  按部门统计时不必扫描全部获奖记录
+
+数据库使用 WAL 模式，每次写入一个事务；抽奖日志（DrawJournal）负责崩溃恢复，
+历史库写入失败只打印错误，不影响抽奖。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.models.identity_index import IdentityIndex
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    roster_path TEXT NOT NULL,
+    roster_total INTEGER NOT NULL,
+    duplicate_policy TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    id INTEGER PRIMARY KEY,
+    identity_key TEXT NOT NULL UNIQUE,
+    department TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    event_id INTEGER NOT NULL REFERENCES events(id),
+    round_num INTEGER NOT NULL,
+    drawn_at REAL NOT NULL,
+    undone_at REAL
+);
+CREATE TABLE IF NOT EXISTS winners (
+    id INTEGER PRIMARY KEY,
+    round_id INTEGER NOT NULL REFERENCES rounds(id),
+    position INTEGER NOT NULL,
+    participant_id INTEGER NOT NULL REFERENCES participants(id),
+    roster_id INTEGER NOT NULL,
+    department TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'won'
+);
+CREATE TABLE IF NOT EXISTS event_departments (
+    event_id INTEGER NOT NULL REFERENCES events(id),
+    department TEXT NOT NULL,
+    winners INTEGER NOT NULL,
+    PRIMARY KEY (event_id, department)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS events_roster ON events(roster_path, id);
+CREATE INDEX IF NOT EXISTS rounds_event ON rounds(event_id, round_num);
+CREATE INDEX IF NOT EXISTS winners_round ON winners(round_id, position);
+CREATE INDEX IF NOT EXISTS winners_participant ON winners(participant_id, round_id);
+"""
+
+# 单条查询最多绑定的参数个数（旧版 SQLite 的上限为 999）
+MAX_QUERY_PARAMS = 500
+
+# 每轮获奖者: (参与者池中的ID, 身份键, 部门, 姓名)
+Winner = Tuple[int, str, str, str]
+
+
+class HistoryStore:
+    """抽奖历史库
+
+    连接在首次使用时打开；界面的导入线程和主线程都会写入，连接由锁保护。
+    """
+
+    def __init__(self, path: str):
+        """初始化抽奖历史库
+
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # WAL 下 NORMAL 只在检查点时 fsync；抽奖日志已逐条 fsync，足以恢复
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                connection.executescript(SCHEMA)
+                connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._connection = connection
+        return self._connection
+
+    def _write(self, action, *args) -> Any:
+        """在一个事务中执行 action(connection, *args)，失败时回滚并返回None"""
+        with self._lock:
+            try:
+                connection = self._connect()
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    result = action(connection, *args)
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+                connection.execute("COMMIT")
+                return result
+            except sqlite3.Error as e:
+                print(f"写入抽奖历史出错: {e}")
+                return None
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    # ---- 写入 ----
+
+    def start_event(self, roster_path: str, total: int, duplicate_policy: str) -> Optional[int]:
+        """开始一次抽奖活动，同一名单尚未结束的活动随之结束
+
+        Args:
+            roster_path: 名单路径
+            total: 名单人数
+            duplicate_policy: 重复处理方式
+
+        Returns:
+            Optional[int]: 活动ID，写入失败时为None
+        """
+        def start(connection, roster_path):
+            now = time.time()
+            connection.execute("UPDATE events SET ended_at = ? WHERE roster_path = ? AND ended_at IS NULL",
+                               (now, roster_path))
+            return connection.execute(
+                "INSERT INTO events (roster_path, roster_total, duplicate_policy, started_at) "
+                "VALUES (?, ?, ?, ?)", (roster_path, total, duplicate_policy, now)).lastrowid
+
+        return self._write(start, os.path.abspath(roster_path))
+
+    def end_event(self, event_id: int) -> None:
+        """结束一次抽奖活动"""
+        def end(connection):
+            connection.execute("UPDATE events SET ended_at = ? WHERE id = ? AND ended_at IS NULL",
+                               (time.time(), event_id))
+
+        self._write(end)
+
+    def resume_event(self, roster_path: str, duplicate_policy: str) -> Optional[int]:
+        """同一名单和重复处理方式下尚未结束的最近一次活动
+
+        Returns:
+            Optional[int]: 活动ID，没有时为None
+        """
+        try:
+            rows = self._query("SELECT id, duplicate_policy FROM events "
+                               "WHERE roster_path = ? AND ended_at IS NULL ORDER BY id DESC LIMIT 1",
+                               (os.path.abspath(roster_path),))
+        except sqlite3.Error as e:
+            print(f"读取抽奖历史出错: {e}")
+            return None
+        if rows and rows[0][1] == duplicate_policy:
+            return rows[0][0]
+        return None
+
+    @staticmethod
+    def _participant_ids(connection, winners: Sequence[Winner]) -> List[int]:
+        """登记获奖者并返回历史库中的参与者ID，部门或姓名变化时更新为最新值"""
+        connection.executemany(
+            "INSERT INTO participants (identity_key, department, name) VALUES (?, ?, ?) "
+            "ON CONFLICT(identity_key) DO UPDATE SET department = excluded.department, "
+            "name = excluded.name", [(key, department, name) for _, key, department, name in winners])
+        keys = [key for _, key, _, _ in winners]
+        ids: Dict[str, int] = {}
+        for start in range(0, len(keys), MAX_QUERY_PARAMS):
+            chunk = keys[start:start + MAX_QUERY_PARAMS]
+            ids.update(connection.execute(
+                f"SELECT identity_key, id FROM participants WHERE identity_key IN ({','.join('?' * len(chunk))})",
+                chunk))
+        return [ids[key] for key in keys]
+
+    @staticmethod
+    def _count_departments(connection, event_id: int, departments: Iterable[str], sign: int) -> None:
+        """按获奖者的部门增减活动的部门获奖人数（sign 为 1 或 -1）"""
+        counts = Counter(departments)
+        connection.executemany(
+            "INSERT INTO event_departments (event_id, department, winners) VALUES (?, ?, ?) "
+            "ON CONFLICT(event_id, department) DO UPDATE SET winners = winners + excluded.winners",
+            [(event_id, department, sign * count) for department, count in counts.items()])
+
+    @classmethod
+    def _insert_round(cls, connection, event_id: int, round_num: int, winners: Sequence[Winner],
+                      drawn_at: float) -> None:
+        round_id = connection.execute("INSERT INTO rounds (event_id, round_num, drawn_at) VALUES (?, ?, ?)",
+                                      (event_id, round_num, drawn_at)).lastrowid
+        participant_ids = cls._participant_ids(connection, winners)
+        connection.executemany(
+            "INSERT INTO winners (round_id, position, participant_id, roster_id, department, name) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(round_id, position, participant_id, roster_id, department, name)
+             for position, (participant_id, (roster_id, _, department, name))
+             in enumerate(zip(participant_ids, winners))])
+        cls._count_departments(connection, event_id, (department for _, _, department, _ in winners), 1)
+
+    @classmethod
+    def _undo_round(cls, connection, event_id: int, round_id: int, undone_at: float) -> None:
+        connection.execute("UPDATE rounds SET undone_at = ? WHERE id = ?", (undone_at, round_id))
+        departments = connection.execute("SELECT department FROM winners WHERE round_id = ? AND status = 'won'",
+                                         (round_id,)).fetchall()
+        cls._count_departments(connection, event_id, (department for department, in departments), -1)
+
+    @staticmethod
+    def _round_id(connection, event_id: int, round_num: int) -> Optional[int]:
+        """活动中第 round_num 轮（未撤销）的ID"""
+        row = connection.execute("SELECT id FROM rounds WHERE event_id = ? AND round_num = ? "
+                                 "AND undone_at IS NULL ORDER BY id DESC LIMIT 1",
+                                 (event_id, round_num)).fetchone()
+        return row[0] if row else None
+
+    def record_rounds(self, event_id: Optional[int], rounds: Sequence[Tuple[int, Sequence[Winner]]]) -> None:
+        """在一个事务中写入若干轮抽奖
+
+        Args:
+            event_id: 活动ID，为None（创建活动失败）时不写入
+            rounds: (轮次, 获奖者) 列表
+        """
+        if event_id is None:
+            return
+
+        def record(connection):
+            now = time.time()
+            for round_num, winners in rounds:
+                self._insert_round(connection, event_id, round_num, winners, now)
+
+        self._write(record)
+
+    def undo_round(self, event_id: Optional[int], round_num: int) -> None:
+        """记录撤销活动的第 round_num 轮"""
+        if event_id is None:
+            return
+
+        def undo(connection):
+            round_id = self._round_id(connection, event_id, round_num)
+            if round_id is not None:
+                self._undo_round(connection, event_id, round_id, time.time())
+
+        self._write(undo)
+
+    def record_redraw(self, event_id: Optional[int], round_num: int, absent_id: int, winner: Winner) -> None:
+        """记录第 round_num 轮的缺席者（参与者池中的ID为 absent_id）由 winner 替换"""
+        if event_id is None:
+            return
+
+        def redraw(connection):
+            round_id = self._round_id(connection, event_id, round_num)
+            if round_id is None:
+                return
+            row = connection.execute("SELECT id, position, department FROM winners WHERE round_id = ? "
+                                     "AND roster_id = ? AND status = 'won'", (round_id, absent_id)).fetchone()
+            if row is None:
+                return
+            absent_row, position, absent_department = row
+            connection.execute("UPDATE winners SET status = 'absent' WHERE id = ?", (absent_row,))
+            participant_id = self._participant_ids(connection, [winner])[0]
+            roster_id, _, department, name = winner
+            connection.execute(
+                "INSERT INTO winners (round_id, position, participant_id, roster_id, department, name) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (round_id, position, participant_id, roster_id, department, name))
+            self._count_departments(connection, event_id, [absent_department], -1)
+            self._count_departments(connection, event_id, [department], 1)
+
+        self._write(redraw)
+
+    def sync_event(self, event_id: Optional[int], round_count: int,
+                   winners_of: Callable[[int], Sequence[Winner]]) -> None:
+        """按回放抽奖日志得到的状态补齐活动记录
+
+        写入日志后、写入历史库前崩溃时，历史库会少若干轮或多出已撤销的轮次：
+        补写历史库中缺少的轮次，撤销日志中已不存在的轮次。
+
+        Args:
+            event_id: 活动ID，为None时不写入
+            round_count: 回放后的轮数
+            winners_of: 轮次 -> 该轮获奖者，只对缺少的轮次调用
+        """
+        if event_id is None:
+            return
+
+        def sync(connection):
+            now = time.time()
+            extra = connection.execute("SELECT id FROM rounds WHERE event_id = ? AND round_num > ? "
+                                       "AND undone_at IS NULL", (event_id, round_count)).fetchall()
+            for round_id, in extra:
+                self._undo_round(connection, event_id, round_id, now)
+            recorded = connection.execute("SELECT MAX(round_num) FROM rounds WHERE event_id = ? "
+                                          "AND undone_at IS NULL", (event_id,)).fetchone()[0] or 0
+            for round_num in range(recorded + 1, round_count + 1):
+                self._insert_round(connection, event_id, round_num, winners_of(round_num), now)
+
+        self._write(sync)
+
+    # ---- 查询 ----
+
+    def events(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近的抽奖活动（新的在前）
+
+        Args:
+            limit: 最多返回的活动数
+
+        Returns:
+            List[Dict[str, Any]]: 活动ID、名单、人数、开始和结束时间，以及有效轮数和获奖人数
+        """
+        rows = self._query(
+            "SELECT e.id, e.roster_path, e.roster_total, e.started_at, e.ended_at, "
+            "(SELECT COUNT(*) FROM rounds r WHERE r.event_id = e.id AND r.undone_at IS NULL), "
+            "(SELECT COALESCE(SUM(d.winners), 0) FROM event_departments d WHERE d.event_id = e.id) "
+            "FROM events e ORDER BY e.id DESC LIMIT ?", (limit,))
+        keys = ("id", "roster_path", "roster_total", "started_at", "ended_at", "rounds", "winners")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def has_won(self, department: str, name: str, employee_id: str = "", within_events: int = 3) -> bool:
+        """某人在最近 within_events 次活动中是否中过奖（不含已撤销的轮次和缺席者）
+
+        Args:
+            department: 部门
+            name: 姓名
+            employee_id: 工号；名单含工号时须提供，身份键与 IdentityIndex 一致
+            within_events: 最近的活动数
+
+        Returns:
+            bool: 中过奖返回True
+        """
+        key = IdentityIndex().prepare(department, name, employee_id)[2]
+        rows = self._query(
+            "SELECT EXISTS (SELECT 1 FROM participants p "
+            "JOIN winners w ON w.participant_id = p.id "
+            "JOIN rounds r ON r.id = w.round_id "
+            "WHERE p.identity_key = ? AND w.status = 'won' AND r.undone_at IS NULL "
+            "AND r.event_id >= (SELECT MIN(id) FROM (SELECT id FROM events ORDER BY id DESC LIMIT ?)))",
+            (key, within_events))
+        return bool(rows[0][0])
+
+    def winner_keys(self, within_events: Optional[int] = None,
+                    round_nums: Optional[Sequence[int]] = None) -> List[str]:
+        """已结束的活动中获奖者的身份键（不含已撤销的轮次和缺席者）
+
+        进行中的活动（本次会话）不计入，其获奖者本就不在剩余池中。
+
+        Args:
+            within_events: 只统计最近的若干次已结束活动，默认统计全部历史
+            round_nums: 只统计这些轮次（例如大奖所在的轮次），默认统计所有轮次
+
+        Returns:
+            List[str]: 身份键，不重复；读取失败时为空
+        """
+        sql = ("SELECT DISTINCT p.identity_key FROM rounds r "
+               "JOIN winners w ON w.round_id = r.id JOIN participants p ON p.id = w.participant_id "
+               "WHERE w.status = 'won' AND r.undone_at IS NULL AND r.event_id IN "
+               "(SELECT id FROM events WHERE ended_at IS NOT NULL ORDER BY id DESC LIMIT ?)")
+        params: list = [within_events if within_events is not None else -1]
+        if round_nums:
+            round_nums = sorted(set(round_nums))
+            sql += f" AND r.round_num IN ({','.join('?' * len(round_nums))})"
+            params.extend(round_nums)
+        try:
+            return [key for key, in self._query(sql, params)]
+        except sqlite3.Error as e:
+            print(f"读取抽奖历史出错: {e}")
+            return []
+
+    def winners_per_department(self, event_id: Optional[int] = None) -> Dict[str, int]:
+        """各部门的获奖人数（不含已撤销的轮次和缺席者），部门为获奖时所在的部门
+
+        Args:
+            event_id: 活动ID，默认统计全部历史
+
+        Returns:
+            Dict[str, int]: 部门 -> 获奖人数，人数多的在前
+        """
+        sql = "SELECT department, SUM(winners) AS total FROM event_departments"
+        params: tuple = ()
+        if event_id is not None:
+            sql += " WHERE event_id = ?"
+            params = (event_id,)
+        sql += " GROUP BY department HAVING total > 0 ORDER BY total DESC, department"
+        return dict(self._query(sql, params))
+
+    def audit(self, event_id: int) -> List[Dict[str, Any]]:
+        """活动的完整抽奖记录，包括已撤销的轮次和缺席者
+
+        Args:
+            event_id: 活动ID
+
+        Returns:
+            List[Dict[str, Any]]: 按轮次和名次排列的记录：轮次、抽奖时间、撤销时间、名次、
+            部门、姓名、身份键、参与者池中的ID和状态（won / absent）
+        """
+        rows = self._query(
+            "SELECT r.round_num, r.drawn_at, r.undone_at, w.position, w.department, w.name, "
+            "p.identity_key, w.roster_id, w.status "
+            "FROM rounds r JOIN winners w ON w.round_id = r.id JOIN participants p ON p.id = w.participant_id "
+            "WHERE r.event_id = ? ORDER BY r.id, w.position, w.id", (event_id,))
+        keys = ("round", "drawn_at", "undone_at", "position", "department", "name",
+                "identity_key", "roster_id", "status")
+        return [dict(zip(keys, row)) for row in rows]
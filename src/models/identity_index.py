@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unicodedata
+from itertools import count
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 重复参与者的处理方式
+#   merge    保留第一次出现的记录，其余忽略
+#   reject   名单中出现重复即加载失败（追加读取时只能跳过重复行）
+#   tickets  合并为一人，每次重复出现增加一票（重复行的 weight，默认为1）
+DUPLICATE_POLICIES = ("merge", "reject", "tickets")
+
+# 报告中最多保留的重复明细数量（总数仍全部计入）
+MAX_DUPLICATE_DETAILS = 100
+
+# 最多缓存的部门种类数
+MAX_CACHED_DEPARTMENTS = 4096
+
+
+class DuplicateParticipantError(ValueError):
+    """reject 策略下名单包含重复参与者"""
+
+
+def normalize_text(text: str) -> str:
+    """规范化部门或姓名：全角转半角（NFKC）、去掉首尾空白并把连续空白合并为一个空格
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        str: 规范化后的文本
+    """
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    return ' '.join(text.split())
+
+
+class IdentityIndex:
+    """参与者身份索引：规范化的身份键 -> 参与者ID
+
+    名单包含 employee_id 列且该行工号不为空时以工号为身份，否则以
+    (部门, 姓名) 为身份；键在 normalize_text 的基础上忽略大小写。
+    每行一次哈希查找，加载整体为 O(n)。参与者ID按登记顺序分配，
+    所有进入参与者池的记录都须先经过 admit。
+    """
+
+    def __init__(self, policy: str = "merge"):
+        """初始化身份索引
+
+        Args:
+            policy: 重复处理方式，见 DUPLICATE_POLICIES
+        """
+        if policy not in DUPLICATE_POLICIES:
+            raise ValueError(f"未知的重复处理方式: {policy}")
+        self.policy = policy
+        self._ids: Dict[str, int] = {}
+        self.duplicate_count = 0                            # 重复行总数
+        self.duplicates: List[Tuple[int, int]] = []         # (重复记录的序号, 已有参与者的ID)
+        self.normalized_count = 0                           # 经规范化后文本发生变化的行数
+        # 部门种类很少，缓存 原始部门 -> (规范化部门, 键前缀)
+        self._departments: Dict[str, Tuple[str, str]] = {}
+        self._deferred: Optional[Callable[[], List[str]]] = None  # 尚未载入的身份键，见 defer
+        self._keys: Optional[List[str]] = None              # 参与者ID -> 身份键，首次 key_of 时构建
+
+    def __len__(self) -> int:
+        if self._keys is not None:
+            return len(self._keys)
+        self._materialize()
+        return len(self._ids)
+
+    def keys(self) -> List[str]:
+        """按参与者ID排列的身份键"""
+        self._materialize()
+        return list(self._ids)
+
+    def key_of(self, pid: int) -> str:
+        """参与者ID对应的身份键
+
+        首次调用时构建 ID -> 键 的列表（O(n)），之后随登记增量维护；
+        身份键尚未载入时只载入键列表，不构建索引。
+        """
+        if self._keys is None:
+            self._keys = self._deferred() if self._deferred is not None else list(self._ids)
+        return self._keys[pid]
+
+    def defer(self, load_keys: Callable[[], List[str]]) -> None:
+        """稍后再载入按参与者ID排列的身份键，首次查找或登记时才构建索引
+
+        从名单缓存打开时使用：只有读取追加的行时才需要身份索引，
+        不必在每次启动时都构建。
+
+        Args:
+            load_keys: 返回身份键列表的函数
+        """
+        self._ids = {}
+        self._keys = None
+        self._deferred = load_keys
+
+    def _materialize(self) -> None:
+        if self._deferred is not None:
+            load_keys, self._deferred = self._deferred, None
+            self._ids = dict(zip(self._keys if self._keys is not None else load_keys(), count()))
+
+    def resolve(self, keys: Iterable[str]) -> List[int]:
+        """批量查找身份键对应的参与者ID，忽略不在名单中的键
+
+        身份键尚未载入时扫描键列表（O(n)），不为全部参与者构建索引。
+
+        Args:
+            keys: 身份键
+
+        Returns:
+            List[int]: 参与者ID
+        """
+        if self._deferred is not None:
+            wanted = set(keys)
+            if self._keys is None:
+                self._keys = self._deferred()
+            return [pid for pid, key in enumerate(self._keys) if key in wanted]
+        ids = self._ids
+        return [ids[key] for key in keys if key in ids]
+
+    @staticmethod
+    def key(department: str, name: str, employee_id: str = "") -> str:
+        """计算身份键（参数须已经过 normalize_text）"""
+        if employee_id:
+            return "#" + employee_id.casefold()
+        return department.casefold() + "\x1f" + name.casefold()
+
+    def lookup(self, department: str, name: str, employee_id: str = "") -> Optional[int]:
+        """按身份查找参与者ID
+
+        Returns:
+            Optional[int]: 参与者ID，不存在时返回None
+        """
+        self._materialize()
+        return self._ids.get(self.key(normalize_text(department), normalize_text(name),
+                                      normalize_text(employee_id)))
+
+    def prepare(self, department: str, name: str, employee_id: str = "") -> Tuple[str, str, str]:
+        """规范化一行名单记录并计算身份键，不登记
+
+        不访问已登记的身份，可在解析名单的工作进程中预先完成，见 src.models.roster_sources。
+
+        Args:
+            department: 部门
+            name: 姓名
+            employee_id: 工号，可为空
+
+        Returns:
+            Tuple[str, str, str]: 规范化后的部门、姓名，以及身份键
+        """
+        # 每行都会调用，normalize_text 和 key 在此内联
+        cached = self._departments.get(department)
+        if cached is None:
+            clean_department = normalize_text(department)
+            cached = (clean_department, clean_department.casefold() + "\x1f")
+            if len(self._departments) < MAX_CACHED_DEPARTMENTS:
+                self._departments[department] = cached
+        clean_department, prefix = cached
+        clean_name = ' '.join((name if name.isascii() else unicodedata.normalize('NFKC', name)).split())
+        if clean_department != department or clean_name != name:
+            self.normalized_count += 1
+
+        if employee_id:
+            if not employee_id.isascii():
+                employee_id = normalize_text(employee_id)
+            return clean_department, clean_name, "#" + employee_id.casefold()
+        return clean_department, clean_name, prefix + clean_name.casefold()
+
+    def admit_key(self, department: str, name: str, key: str,
+                  record_no: int = 0, strict: bool = True) -> Optional[int]:
+        """登记 prepare 的结果
+
+        Args:
+            department: 规范化后的部门
+            name: 规范化后的姓名
+            key: 身份键
+            record_no: 记录序号，用于报告和错误信息
+            strict: 见 admit
+
+        Returns:
+            Optional[int]: 重复时已有参与者的ID，新参与者为None
+
+        Raises:
+            DuplicateParticipantError: reject 策略且 strict 时出现重复
+        """
+        if self._deferred is not None:
+            self._materialize()
+        ids = self._ids
+        existing = ids.get(key)
+        if existing is None:
+            ids[key] = len(ids)
+            if self._keys is not None:
+                self._keys.append(key)
+            return None
+
+        self.duplicate_count += 1
+        if len(self.duplicates) < MAX_DUPLICATE_DETAILS:
+            self.duplicates.append((record_no, existing))
+        if self.policy == "reject" and strict:
+            raise DuplicateParticipantError(
+                f"第{record_no}条记录与已有参与者 {department} {name} 重复")
+        return existing
+
+    def admit(self, department: str, name: str, employee_id: str = "",
+              record_no: int = 0, strict: bool = True) -> Tuple[str, str, Optional[int]]:
+        """登记一行名单记录
+
+        新参与者按登记顺序分配ID（与参与者池中的ID一致），重复记录返回已有ID。
+
+        Args:
+            department: 部门
+            name: 姓名
+            employee_id: 工号，可为空
+            record_no: 记录序号，用于报告和错误信息
+            strict: reject 策略下遇到重复时是否抛出异常；为False时只计入报告
+
+        Returns:
+            Tuple[str, str, Optional[int]]: 规范化后的部门、姓名，以及重复时已有参与者的ID
+            （新参与者为None）
+
+        Raises:
+            DuplicateParticipantError: reject 策略且 strict 时出现重复
+        """
+        department, name, key = self.prepare(department, name, employee_id)
+        return department, name, self.admit_key(department, name, key, record_no, strict)
@@ -1,68 +1,709 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import bisect
+import csv
 import os
-import pandas as pd
 import random
-from typing import List, Tuple, Dict, Optional
+import time
+from typing import Callable, Iterable, Iterator, List, Tuple, Dict, Optional
+
+from src.metrics import Metrics
+from src.models.animation_sampler import AnimationSampler
+from src.models.department_index import DepartmentIndex, allocate_proportional
+from src.models.draw_journal import DrawJournal, decode_rng_state
+from src.models.eligibility import ExclusionRule, IdSet
+from src.models.history_store import HistoryStore
+from src.models.identity_index import DUPLICATE_POLICIES, IdentityIndex
+from src.models.participant_pool import ParticipantPool
+from src.models.result_writer import ResultWriter
+from src.models.roster_loader import LoadReport, ProgressCallback, estimate_rows, iter_roster, read_appended
+from src.models.roster_sources import SourceRows, estimate_source_rows, iter_sources, source_format
+from src.models.weighted_pool import WeightedPool
+
+# 名单人数达到该阈值且安装了 numpy 时，使用列式参与者池
+COLUMNAR_THRESHOLD = 200_000
+
+
+def write_results_csv(path: str, winners: List[Tuple[str, str]]) -> None:
+    """把获奖者写入CSV文件
+    
+    Args:
+        path: 输出文件路径
+        winners: 获奖者列表
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['department', 'name'])
+        writer.writerows(winners)
+
+
+class HistoryEvent:
+    """历史库中的一次活动；活动在后台写入线程中创建，创建后填入 id"""
+    
+    __slots__ = ("id",)
+    
+    def __init__(self, event_id: Optional[int] = None):
+        self.id = event_id  # 活动ID，尚未创建或写入失败时为None
+
+
+class LoadedRoster:
+    """已解析、尚未装入抽奖模型的名单，见 LuckyDrawModel.parse_sources"""
+    
+    def __init__(self, sources: List[str], pool, report: LoadReport, identity: IdentityIndex,
+                 source_offsets: List[int], excluded: IdSet, from_cache: bool):
+        self.sources = sources                # 名单来源，按此顺序分配参与者ID
+        self.pool = pool                      # 新的参与者池（加权抽奖时为 WeightedPool）
+        self.report = report                  # 加载报告
+        self.identity = identity              # 身份索引
+        self.source_offsets = source_offsets  # 各来源最后一位参与者之后的ID
+        self.excluded = excluded              # 按排除规则应移出剩余池的参与者
+        self.from_cache = from_cache          # 是否从名单二进制缓存打开
+
 
 class LuckyDrawModel:
     """抽奖数据模型，处理抽奖逻辑和数据"""
     
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, journal_path: Optional[str] = None, load: bool = True,
+                 metrics: Optional[Metrics] = None, duplicate_policy: str = "merge",
+                 sources: Optional[List[str]] = None, workers: Optional[int] = None,
+                 use_cache: bool = True, history_path: Optional[str] = None,
+                 exclusion: Optional[ExclusionRule] = None, output_dir: Optional[str] = None,
+                 save_round_files: bool = True):
         """初始化抽奖管理器
         
         Args:
             csv_path: 参与者CSV文件路径
+            journal_path: 抽奖日志路径，默认为输出目录下的 draw_journal.jsonl
+            load: 是否立即加载名单；为False时需稍后调用 open()，
+                  界面可先显示窗口再解析名单
+            metrics: 指标上报入口，默认不上报
+            duplicate_policy: 重复参与者的处理方式（merge / reject / tickets），
+                              见 src.models.identity_index
+            sources: 从多个来源（CSV / Excel / Parquet）合并名单时的来源列表，默认只有 csv_path
+            workers: 解析多个来源时的工作进程数，默认为CPU核数
+            use_cache: 是否使用名单二进制缓存（见 src.models.roster_cache）
+            history_path: 抽奖历史库路径，默认为输出目录下的 history.sqlite3
+            exclusion: 排除规则（见 src.models.eligibility），加载名单时应用，可稍后用 set_exclusion 更改
+            output_dir: 输出目录（日志、历史库、名单缓存和每轮结果），默认为名单所在目录的 ../../output
+            save_round_files: 是否把每轮结果写入输出目录下的 round_N.csv
         """
         self.csv_path = csv_path
-        self.participants = []  # 所有参与者
-        self.remaining = []     # 剩余未抽中参与者
+        self._output_dir = output_dir
+        self.save_round_files = save_round_files
+        self.sources = list(sources) if sources else [csv_path]  # 名单来源，按此顺序分配参与者ID
+        self.source_offsets = []  # 各来源最后一位参与者之后的ID，见 source_of
+        self.import_workers = workers
+        self.use_cache = use_cache  # 大名单解析后写入二进制缓存，下次打开时直接映射
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.rng = random.Random()
+        self.pool = ParticipantPool(self.rng)  # 参与者池（按ID索引）
         self.winners = []       # 已抽中参与者
+        self.winner_ids = []    # 已抽中参与者ID
+        self.round_offsets = [] # 每轮第一位获奖者在 winners 中的位置
+        self.round_absent = []  # 每轮缺席并已被补抽替换的参与者ID
         self.current_round = 0  # 当前轮数
+        self._department_index = None  # 按部门的剩余参与者索引，首次分层抽奖时构建
+        self.load_report = LoadReport()  # 最近一次加载名单的报告
+        self.identity = IdentityIndex(duplicate_policy)  # 规范化身份 -> 参与者ID
+        self.load_error = ""             # 最近一次加载失败的原因
+        self._roster_shrunk = False      # 名单文件已变短（被替换或截断），已提示过用户
+        self.writer = ResultWriter(metrics=self.metrics)  # 后台写入抽奖结果
+        self.animation = AnimationSampler()  # 动画候选人缓冲区
+        self.journal = DrawJournal(journal_path or os.path.join(self.output_dir(), "draw_journal.jsonl"))
+        self.history = HistoryStore(history_path or os.path.join(self.output_dir(), "history.sqlite3"))
+        self.history_event: Optional[HistoryEvent] = None  # 历史库中的当前活动，本次会话第一轮抽奖时创建
+        self._history_writes = 0  # 已提交的历史库写入数，用作写入任务的键
+        self.exclusion = exclusion  # 排除规则
+        self.excluded = IdSet()     # 按排除规则移出剩余池的参与者
+        self.loaded = False     # 是否已调用 open()
+        
+        if load:
+            self.open()
+    
+    def use_journal_roster(self) -> bool:
+        """改用抽奖日志最后一个会话的名单，须在 open() 之前调用
         
-        # 加载参与者数据
-        self.load_participants()
+        导入名单后程序异常退出时，下次启动应回放导入的名单，而不是默认名单。
+        名单文件已不存在时保留当前名单。
+        
+        Returns:
+            bool: 改用了日志中的名单返回True
+        """
+        record = self.journal.last_roster()
+        if record is None or "path" not in record:
+            return False
+        paths = record.get("sources") or [record["path"]]
+        policy = record.get("duplicates", self.identity.policy)
+        if policy not in DUPLICATE_POLICIES or not all(os.path.exists(path) for path in paths):
+            return False
+        self.csv_path, self.sources = record["path"], list(paths)
+        self.identity = IdentityIndex(policy)
+        return True
     
-    def add_csv_path(self, csv_path: str) -> None:
+    def open(self, progress: Optional[ProgressCallback] = None) -> None:
+        """加载参与者数据并回放抽奖日志，恢复上次未完成的抽奖状态
+        
+        Args:
+            progress: 进度回调，见 load_participants
+        """
+        self.load_participants(progress)
+        if not self.restore_from_journal():
+            self.journal.record_roster(self.csv_path, self.pool.total, self.identity.policy,
+                                       self._journal_sources())
+        elif self.round_offsets:
+            # 继续历史库中的活动，补齐崩溃前未写入的轮次（启动时同步执行）
+            event_id = self.history.resume_event(self.csv_path, self.identity.policy)
+            if event_id is None:
+                event_id = self.history.start_event(self.csv_path, self.pool.total, self.identity.policy)
+            self.history_event = HistoryEvent(event_id)
+            self.history.sync_event(event_id, len(self.round_offsets), self._history_round)
+        self.loaded = True
+    
+    def add_csv_path(self, csv_path: str, progress: Optional[ProgressCallback] = None) -> bool:
         """添加CSV文件路径
         
         Args:
             csv_path: 参与者CSV文件路径
+            progress: 进度回调，见 load_participants
+            
+        Returns:
+            bool: 加载成功返回True，否则返回False
         """
-        self.csv_path = csv_path
-        self.load_participants()
+        return self.add_sources([csv_path], progress)
+    
+    def add_sources(self, paths: List[str], progress: Optional[ProgressCallback] = None) -> bool:
+        """从一个或多个来源导入名单，替换当前名单并开始新会话
+        
+        即 parse_sources 之后 install_sources。界面在后台线程中调用 parse_sources，
+        再回到界面线程调用 install_sources，解析期间当前名单保持不变。
+        
+        Args:
+            paths: 来源文件路径（CSV / Excel / Parquet）
+            progress: 进度回调，见 load_participants
+            
+        Returns:
+            bool: 加载成功返回True，否则返回False
+        """
+        loaded = self.parse_sources(paths, progress)
+        if loaded is None:
+            return False
+        self.install_sources(loaded)
+        return True
+    
+    def install_sources(self, loaded: LoadedRoster) -> None:
+        """装入 parse_sources 导入的名单并开始新会话，须在使用抽奖模型的线程中调用
+        
+        Args:
+            loaded: parse_sources 的结果
+        """
+        self._install_roster(loaded)
+        # 导入名单开始新活动，日志从这里开始新会话，获奖者和轮次须与之一致
+        self._end_history_event()
+        self._clear_rounds()
+        self.journal.record_roster(self.csv_path, self.pool.total, self.identity.policy,
+                                   self._journal_sources())
+        if self.exclusion is not None:
+            # 刚结束的活动的获奖者此时才算作往届获奖者
+            self.apply_exclusion()
+    
+    @property
+    def streaming(self) -> bool:
+        """名单是否为单个CSV文件：在当前进程中流式解析，并可读取追加的行"""
+        return self._is_streaming(self.sources)
+    
+    @staticmethod
+    def _is_streaming(paths: List[str]) -> bool:
+        return len(paths) == 1 and source_format(paths[0]) == 'csv'
+    
+    def source_of(self, pid: int) -> str:
+        """参与者所属的名单来源（重复出现时为首次出现的来源）
+        
+        Args:
+            pid: 参与者ID
+            
+        Returns:
+            str: 来源文件路径
+        """
+        return self.sources[min(bisect.bisect_right(self.source_offsets, pid), len(self.sources) - 1)]
     
-    def load_participants(self) -> bool:
-        """从CSV文件加载参与者数据
+    def _journal_sources(self) -> Optional[List[str]]:
+        """写入日志的来源列表，只有一个来源时不记录"""
+        return self.sources if len(self.sources) > 1 else None
+    
+    @property
+    def participants(self) -> List[Tuple[str, str]]:
+        """所有参与者 (部门, 姓名) 列表"""
+        return [self.pool.get(pid) for pid in range(self.pool.total)]
+    
+    @property
+    def remaining(self) -> List[Tuple[str, str]]:
+        """剩余未抽中参与者 (部门, 姓名) 列表"""
+        return [self.pool.get(pid) for pid in self.pool.ids()]
+    
+    def load_participants(self, progress: Optional[ProgressCallback] = None) -> bool:
+        """重新加载 self.sources 并替换当前名单，不改变抽奖结果和日志
+        
+        Args:
+            progress: 进度回调 progress(已读行数, 已读字节数, 文件总字节数)，
+                      多个来源时每合并完一个来源回调一次
         
         Returns:
             bool: 加载成功返回True，否则返回False
         """
+        loaded = self.parse_sources(self.sources, progress)
+        if loaded is None:
+            return False
+        self._install_roster(loaded)
+        return True
+    
+    def parse_sources(self, paths: List[str],
+                      progress: Optional[ProgressCallback] = None) -> Optional[LoadedRoster]:
+        """解析名单到新的参与者池，不修改当前名单
+        
+        单个CSV文件流式读取，多个来源在工作进程中并行解析后按给定顺序合并（重复的参与者
+        按 duplicate_policy 处理）。只读取重复处理方式和排除规则等设置，可在后台线程中调用。
+        
+        Args:
+            paths: 来源文件路径（CSV / Excel / Parquet）
+            progress: 进度回调，见 load_participants
+        
+        Returns:
+            Optional[LoadedRoster]: 解析结果；失败时返回None，原因见 load_error
+        """
+        start = time.perf_counter()
+        self.load_error = ""
         try:
-            if not os.path.exists(self.csv_path):
-                return False
+            missing = [path for path in paths if not os.path.exists(path)]
+            if missing:
+                self.load_error = f"名单文件不存在: {missing[0]}"
+                self.metrics.count("load_errors", reason="missing")
+                return None
             
-            df = pd.read_csv(self.csv_path)
+            # 逐行读入新的参与者池，经身份索引去重
+            csv_path = paths[0]
+            streaming = self._is_streaming(paths)
+            report = LoadReport()
+            identity = IdentityIndex(self.identity.policy)
+            tickets = {}
+            cache = self._open_roster_cache(csv_path) if streaming else None
+            if cache is not None:
+                # 名单未变（或只在末尾追加了行）：直接使用缓存中已去重的结果
+                report = cache.report
+                identity = cache.create_identity()
+                pool = cache.create_pool(self.rng)
+                weights = cache.weights.tolist() if cache.weights is not None else None
+                source_offsets = [pool.total]
+                if progress is not None:
+                    progress(report.rows, report.end_offset, os.path.getsize(csv_path))
+            elif streaming:
+                weights = []
+                employee_ids = []
+                pool = self._create_pool(estimate_rows(csv_path))
+                rows = iter_roster(csv_path, report=report, progress=progress,
+                                   weights=weights, employee_ids=employee_ids)
+                pool.extend(self._admit_rows(rows, identity, report, weights, employee_ids, tickets, strict=True))
+                source_offsets = [pool.total]
+            else:
+                pool, weights, source_offsets = self._load_sources(paths, report, identity, tickets, progress)
             
-            # 检查必要的列是否存在
-            if 'department' not in df.columns or 'name' not in df.columns:
-                return False
+            # 排除规则在替换名单之前编译，规则无法读取时加载失败、保留原有名单
+            excluded = self._compile_exclusion(identity)
             
-            self.participants = list(zip(df['department'].tolist(), df['name'].tolist()))
-            self.remaining = self.participants.copy()
+            # 名单包含 weight 列或按重复次数计票时启用加权抽奖
+            base_pool = pool
+            weighted = report.has_weight or identity.policy == "tickets"
+            if weighted:
+                if cache is None:
+                    if not report.has_weight:
+                        weights = [1.0] * pool.total
+                    for pid, extra in tickets.items():
+                        weights[pid] += extra
+                pool = WeightedPool(pool, weights)
             
-            return True
+            if cache is not None:
+                self.metrics.count("roster_cache_hits")
+            elif streaming and self.use_cache and not isinstance(base_pool, ParticipantPool):
+                # 只缓存列式参与者池（大名单）
+                self._write_roster_cache(csv_path, base_pool, report, identity, weights if weighted else None)
+            
+            elapsed = time.perf_counter() - start
+            self.metrics.timing("load_ms", elapsed * 1000)
+            self.metrics.gauge("load_rows_per_sec", report.rows / elapsed if elapsed > 0 else 0)
+            self.metrics.count("load_bad_rows", report.bad_row_count)
+            self.metrics.count("load_duplicates", identity.duplicate_count)
+            return LoadedRoster(list(paths), pool, report, identity, source_offsets, excluded, cache is not None)
         except Exception as e:
             print(f"加载参与者数据出错: {e}")
-            return False
+            self.load_error = str(e)
+            self.metrics.count("load_errors", reason="error")
+            return None
+    
+    def _install_roster(self, loaded: LoadedRoster) -> None:
+        """用 parse_sources 的结果替换当前名单，不改变抽奖结果和日志"""
+        self.csv_path, self.sources = loaded.sources[0], loaded.sources
+        self.animation.reset(loaded.pool)
+        self.pool = loaded.pool
+        self._department_index = None
+        self.load_report = loaded.report
+        self.identity = loaded.identity
+        self.source_offsets = loaded.source_offsets
+        self.excluded = IdSet()
+        self._apply_exclusion(loaded.excluded)
+        self._roster_shrunk = False
+        
+        # 缓存之后名单末尾追加的行
+        if loaded.from_cache and self.load_report.end_offset < os.path.getsize(self.csv_path):
+            self._ingest_appended()
+        self.metrics.gauge("pool_size", len(self.pool))
+    
+    def ingest_appended(self) -> int:
+        """把名单文件末尾新追加的行加入参与者池
+        
+        只解析上次读取位置之后的完整行，开销与新增行数成正比；
+        已抽中的获奖者、当前轮次和抽奖日志都不受影响。新参与者的ID接在已有ID之后，
+        与重新加载整个文件时的编号一致，因此日志回放仍然有效。
+        
+        Returns:
+            int: 新增的参与者人数；名单文件变短（被替换或截断）时不做处理并返回0
+        """
+        if not self.loaded or not self.streaming or not os.path.exists(self.csv_path):
+            return 0
+        return self._ingest_appended()
+    
+    def _ingest_appended(self) -> int:
+        """读取名单追加的行，见 ingest_appended"""
+        start = time.perf_counter()
+        weights = [] if self.weighted else None
+        employee_ids = []
+        tickets = {}
+        new_ids = []
+        try:
+            rows = read_appended(self.load_report, weights, employee_ids)
+            if rows is None:
+                # 每次轮询都会发现文件变短，只在状态变化时提示一次
+                if not self._roster_shrunk:
+                    print(f"名单文件已被替换或截断，请重新导入: {self.csv_path}")
+                    self._roster_shrunk = True
+                return 0
+            self._roster_shrunk = False
+            # 重复的签到按策略合并或计票；reject 策略下只能跳过
+            for department, name in self._admit_rows(rows, self.identity, self.load_report,
+                                                     weights, employee_ids, tickets, strict=False):
+                if not new_ids:
+                    self.animation.reset()
+                if self.weighted:
+                    new_ids.append(self.pool.add(department, name, weights.pop() if weights else 1.0))
+                else:
+                    new_ids.append(self.pool.add(department, name))
+        except Exception as e:
+            print(f"读取新增参与者出错: {e}")
+            self.metrics.count("load_errors", reason="append")
+        
+        if tickets:
+            self.animation.reset()
+            for pid, extra in tickets.items():
+                self.pool.add_tickets(pid, extra)
+        if not new_ids:
+            return 0
+        self.source_offsets[-1] = self.pool.total
+        if self._department_index is not None:
+            for pid in new_ids:
+                self._department_index.add(pid)
+        if self.exclusion is not None:
+            # 新参与者可能在排除名单中：只逐个匹配新参与者，不重新编译整个规则
+            try:
+                self._apply_exclusion(self.excluded | self.exclusion.match(self.identity, new_ids))
+            except Exception as e:
+                print(f"应用排除规则出错: {e}")
+                self.metrics.count("exclusion_errors")
+        
+        self.metrics.count("ingested_rows", len(new_ids))
+        self.metrics.timing("ingest_ms", (time.perf_counter() - start) * 1000)
+        self.metrics.gauge("pool_size", len(self.pool))
+        return len(new_ids)
+    
+    def _roster_cache_path(self, csv_path: str) -> str:
+        """名单的二进制缓存路径"""
+        from src.models.roster_cache import cache_path
+        return cache_path(os.path.join(self.output_dir(), "cache"), csv_path)
+    
+    def _open_roster_cache(self, csv_path: str):
+        """打开名单的二进制缓存（见 src.models.roster_cache）
+        
+        只有会使用列式参与者池的大名单才使用缓存，小名单直接解析已经足够快。
+        
+        Returns:
+            RosterCache，不使用缓存或缓存无效时返回None
+        """
+        if not self.use_cache or estimate_rows(csv_path) < COLUMNAR_THRESHOLD:
+            return None
+        from src.models import columnar_pool
+        if not columnar_pool.is_available():
+            return None
+        from src.models.roster_cache import read_cache
+        return read_cache(self._roster_cache_path(csv_path), csv_path, self.identity.policy)
+    
+    def _write_roster_cache(self, csv_path: str, pool, report: LoadReport, identity: IdentityIndex,
+                            weights: Optional[List[float]]) -> None:
+        """把刚解析的名单写入二进制缓存，失败时只打印提示"""
+        from src.models.roster_cache import write_cache
+        start = time.perf_counter()
+        try:
+            write_cache(self._roster_cache_path(csv_path), csv_path, pool, report, identity, weights)
+        except (OSError, ValueError) as e:
+            print(f"写入名单缓存失败: {e}")
+            return
+        self.metrics.timing("roster_cache_write_ms", (time.perf_counter() - start) * 1000)
+    
+    def _load_sources(self, paths: List[str], report: LoadReport, identity: IdentityIndex,
+                      tickets: Dict[int, float], progress: Optional[ProgressCallback]):
+        """并行解析多个来源并按顺序合并到新的参与者池
+        
+        Args:
+            paths: 来源文件路径
+            report: 合并后的加载报告
+            identity: 身份索引
+            tickets: 见 _admit_rows
+            progress: 进度回调
+            
+        Returns:
+            新的参与者池、每位参与者的权重、各来源的结束ID
+        """
+        sizes = [os.path.getsize(path) for path in paths]
+        total_bytes = sum(sizes)
+        done_bytes = 0
+        pool = self._create_pool(sum(estimate_source_rows(path) for path in paths))
+        weights = []
+        source_offsets = []
+        for source, size in zip(iter_sources(paths, self.import_workers), sizes):
+            report.add_source(source.report)
+            identity.normalized_count += source.normalized_count
+            pool.extend(self._admit_source(source, identity, report.rows - len(source), weights, tickets))
+            source_offsets.append(pool.total)
+            done_bytes += size
+            if progress is not None:
+                progress(report.rows, done_bytes, total_bytes)
+        return pool, weights, source_offsets
     
-    def reset(self) -> None:
-        """重置抽奖状态，恢复所有候选人"""
-        self.remaining = self.participants.copy()
+    @staticmethod
+    def _admit_source(source: SourceRows, identity: IdentityIndex, first_record: int,
+                      weights: List[float], tickets: Dict[int, float]) -> Iterable[Tuple[str, str]]:
+        """登记一个来源中已规范化的行，返回新参与者，新参与者的权重追加到 weights
+        
+        Args:
+            source: 来源的解析结果
+            identity: 身份索引
+            first_record: 该来源之前的记录数，用于记录序号
+            weights: 每位参与者的权重
+            tickets: 见 _admit_rows
+            
+        Returns:
+            Iterable[Tuple[str, str]]: 新参与者的 (部门, 姓名)
+        """
+        departments, names, keys = source.unpack()
+        source_weights = source.weights if source.weights is not None else [1.0] * len(keys)
+        admit_key = identity.admit_key
+        duplicates = []
+        for record_no, department, name, key in zip(range(first_record + 1, first_record + len(keys) + 1),
+                                                     departments, names, keys):
+            existing = admit_key(department, name, key, record_no)
+            if existing is not None:
+                duplicates.append((record_no - first_record - 1, existing))
+        
+        # 重复记录通常很少，只在出现重复时才逐行筛选
+        if duplicates:
+            count_tickets = identity.policy == "tickets"
+            skipped = set()
+            for index, existing in duplicates:
+                skipped.add(index)
+                if count_tickets:
+                    tickets[existing] = tickets.get(existing, 0.0) + source_weights[index]
+            keep = [index for index in range(len(keys)) if index not in skipped]
+            departments = [departments[index] for index in keep]
+            names = [names[index] for index in keep]
+            source_weights = [source_weights[index] for index in keep]
+        weights.extend(source_weights)
+        return zip(departments, names)
+    
+    @staticmethod
+    def _admit_rows(rows: Iterable[Tuple[str, str]], identity: IdentityIndex, report: LoadReport,
+                    weights: Optional[List[float]], employee_ids: List[str],
+                    tickets: Dict[int, float], strict: bool) -> Iterator[Tuple[str, str]]:
+        """让名单行经过身份索引，只产出新参与者
+        
+        weights / employee_ids 与 iter_roster 共用：每读出一行各追加一项，
+        这里取走工号，重复行的权重也被取走并按策略记入 tickets（参与者ID -> 追加票数）。
+        
+        Args:
+            rows: iter_roster 或 read_appended 产生的行
+            identity: 身份索引
+            report: 加载报告，report.rows 为当前记录的序号
+            weights: 权重列表，未读取权重时为None
+            employee_ids: 工号列表
+            tickets: 重复行追加的票数
+            strict: 见 IdentityIndex.admit
+            
+        Yields:
+            Tuple[str, str]: 规范化后的 (部门, 姓名)
+        """
+        count_tickets = identity.policy == "tickets"
+        for department, name in rows:
+            employee_id = employee_ids.pop() if employee_ids else ""
+            department, name, existing = identity.admit(department, name, employee_id, report.rows, strict)
+            if existing is None:
+                yield department, name
+                continue
+            weight = weights.pop() if weights else 1.0
+            if count_tickets:
+                tickets[existing] = tickets.get(existing, 0.0) + weight
+    
+    @property
+    def weighted(self) -> bool:
+        """是否为加权抽奖模式（名单包含 weight 列）"""
+        return isinstance(self.pool, WeightedPool)
+    
+    def _create_pool(self, size: int):
+        """按名单规模选择参与者池实现
+        
+        Args:
+            size: 名单人数
+            
+        Returns:
+            ParticipantPool 或 ColumnarPool
+        """
+        if size >= COLUMNAR_THRESHOLD:
+            # 延迟导入：只有大名单才需要加载 numpy
+            from src.models import columnar_pool
+            if columnar_pool.is_available():
+                return columnar_pool.ColumnarPool(self.rng)
+        return ParticipantPool(self.rng)
+    
+    def reset(self, canonical: bool = False) -> None:
+        """重置抽奖状态，恢复所有候选人
+
+        参与者池的重置是 O(1)；部门索引在下次分层抽奖时重新构建。
+        设置了排除规则时重新编译并应用（刚结束的活动的获奖者可能因此被排除），O(被排除人数)。
+
+        Args:
+            canonical: 同时把参与者池恢复为刚加载时的排列（O(n)），
+                       之后设置的随机种子得到的结果与之前的抽奖无关
+        """
+        start = time.perf_counter()
+        self.animation.reset()
+        self.pool.reset(canonical)
+        self._department_index = None
+        self._clear_rounds()
+        self.journal.record_reset()
+        self._end_history_event()
+        previous, self.excluded = self.excluded, IdSet()
+        if not self.apply_exclusion():
+            # 规则无法重新编译时沿用上次的排除结果
+            self._apply_exclusion(previous)
+        self.metrics.timing("reset_ms", (time.perf_counter() - start) * 1000)
+        self.metrics.gauge("pool_size", len(self.pool))
+    
+    def _clear_rounds(self) -> None:
+        """清空获奖者和轮次，不改变参与者池"""
         self.winners = []
+        self.winner_ids = []
+        self.round_offsets = []
+        self.round_absent = []
         self.current_round = 0
     
+    def set_exclusion(self, rule: Optional[ExclusionRule]) -> bool:
+        """更换排除规则，名单已加载时立即应用，可在两轮之间调用
+        
+        新规则排除的人移出剩余池；原先被排除、新规则不再排除的人回到剩余池（已中奖者除外）。
+        
+        Args:
+            rule: 排除规则，None 表示不排除任何人
+            
+        Returns:
+            bool: 规则已应用返回True；规则无法读取时保留原有规则并返回False
+        """
+        previous, self.exclusion = self.exclusion, rule
+        if self.loaded and not self.apply_exclusion():
+            self.exclusion = previous
+            return False
+        return True
+    
+    def apply_exclusion(self) -> bool:
+        """重新编译排除规则并应用到剩余池，反映排除名单文件或历史库的变化
+        
+        Returns:
+            bool: 成功返回True；规则无法读取时排除结果不变并返回False
+        """
+        try:
+            excluded = self._compile_exclusion(self.identity)
+        except Exception as e:
+            print(f"应用排除规则出错: {e}")
+            self.metrics.count("exclusion_errors")
+            return False
+        self._apply_exclusion(excluded)
+        return True
+    
+    def _compile_exclusion(self, identity: IdentityIndex) -> IdSet:
+        """按 identity 对应的名单编译排除规则"""
+        if self.exclusion is None:
+            return IdSet()
+        start = time.perf_counter()
+        # 规则可能查询历史库：先等待排队的历史库写入完成
+        self.writer.flush()
+        excluded = self.exclusion.compile(identity, self.history)
+        self.metrics.timing("exclusion_compile_ms", (time.perf_counter() - start) * 1000)
+        return excluded
+    
+    def _apply_exclusion(self, excluded: IdSet) -> None:
+        """把剩余池从按 self.excluded 排除调整为按 excluded 排除，O(变化的人数)"""
+        start = time.perf_counter()
+        added = excluded - self.excluded
+        released = self.excluded - excluded
+        if added:
+            self.pool.remove_many(added.ids())
+        if released:
+            drawn = set(self.winner_ids)
+            drawn.update(pid for absent in self.round_absent for pid in absent)
+            for pid in released.ids():
+                if pid not in drawn:
+                    self.pool.restore(pid)
+        if added or released:
+            self.animation.reset()
+            self._department_index = None
+        self.excluded = excluded
+        self.metrics.timing("exclusion_apply_ms", (time.perf_counter() - start) * 1000)
+        self.metrics.gauge("excluded", len(excluded))
+        self.metrics.gauge("pool_size", len(self.pool))
+    
+    def restore_from_journal(self) -> bool:
+        """回放抽奖日志中当前名单最后一个会话的抽奖记录
+        
+        Returns:
+            bool: 日志属于当前名单并已回放时返回True
+        """
+        rounds = self.journal.read_session(self.csv_path, self.identity.policy, self._journal_sources())
+        if rounds is None:
+            return False
+        winner_ids = [pid for record in rounds for pid in record["ids"]]
+        absent_ids = [pid for record in rounds for pid in record.get("absent", [])]
+        # 名单被改短时日志中的ID已失效
+        if winner_ids and max(winner_ids + absent_ids) >= self.pool.total:
+            return False
+        
+        self.animation.reset()
+        self.pool.remove_many(winner_ids + absent_ids)
+        for record in rounds:
+            self.round_offsets.append(len(self.winner_ids))
+            self.round_absent.append(record.get("absent", []))
+            self.winner_ids.extend(record["ids"])
+        self.winners.extend(self.pool.get(pid) for pid in winner_ids)
+        if rounds:
+            self.current_round = rounds[-1]["round"]
+            self.rng.setstate(decode_rng_state(rounds[-1]["rng"]))
+        self._department_index = None
+        return True
+    
     def can_draw(self, num_winners: int) -> bool:
         """检查是否可以进行当前轮抽奖
         
@@ -72,10 +713,10 @@ class LuckyDrawModel:
         Returns:
             bool: 如果剩余人数足够，返回True，否则返回False
         """
-        return len(self.remaining) >= num_winners
+        return len(self.pool) >= num_winners
     
     def draw(self, num_winners: int) -> List[Tuple[str, str]]:
-        """执行抽奖
+        """执行抽奖，加权模式下按票数无放回抽取
         
         Args:
             num_winners: 要抽取的获奖者数量
@@ -86,35 +727,344 @@ class LuckyDrawModel:
         if not self.can_draw(num_winners):
             return []
         
-        current_winners = random.sample(self.remaining, num_winners)
+        # 抽取并移除中奖者ID，O(k)
+        start = time.perf_counter()
+        self.animation.reset()
+        winners = self._commit_rounds([self.pool.take(num_winners)])[0]
+        self.metrics.timing("draw_ms", (time.perf_counter() - start) * 1000, kind="draw")
+        return winners
+    
+    def run_schedule(self, round_sizes: List[int]) -> List[List[Tuple[str, str]]]:
+        """一次执行多轮抽奖
+        
+        所有轮次在一次抽取中完成（等价于依次抽奖），
+        日志与结果文件各只写入一次。
+        
+        Args:
+            round_sizes: 每轮中奖人数
+            
+        Returns:
+            List[List[Tuple[str, str]]]: 每轮的获奖者列表；人数不足时返回空列表
+        """
+        total = sum(round_sizes)
+        if not round_sizes or min(round_sizes) <= 0 or not self.can_draw(total):
+            return []
+        
+        start = time.perf_counter()
+        self.animation.reset()
+        winner_ids = self.pool.take(total)
+        rounds = []
+        offset = 0
+        for size in round_sizes:
+            rounds.append(winner_ids[offset:offset + size])
+            offset += size
+        results = self._commit_rounds(rounds)
+        self.metrics.timing("draw_ms", (time.perf_counter() - start) * 1000, kind="schedule")
+        return results
+    
+    @property
+    def department_index(self) -> DepartmentIndex:
+        """按部门的剩余参与者索引，首次访问时构建"""
+        if self._department_index is None:
+            self._department_index = DepartmentIndex(self.pool)
+        return self._department_index
+    
+    def get_department_counts(self) -> Dict[str, int]:
+        """获取各部门剩余人数
+        
+        Returns:
+            Dict[str, int]: 部门 -> 剩余人数
+        """
+        return self.department_index.counts()
+    
+    def can_draw_quota(self, quotas: Dict[str, int]) -> bool:
+        """检查各部门剩余人数是否满足名额要求
+        
+        Args:
+            quotas: 部门 -> 名额
+            
+        Returns:
+            bool: 所有部门人数足够时返回True
+        """
+        index = self.department_index
+        return all(quota >= 0 and index.count(department) >= quota
+                   for department, quota in quotas.items())
+    
+    def draw_quota(self, quotas: Dict[str, int]) -> List[Tuple[str, str]]:
+        """按部门名额执行一轮抽奖，O(k)
+        
+        Args:
+            quotas: 部门 -> 名额
+            
+        Returns:
+            List[Tuple[str, str]]: 获奖者列表，按部门分组
+        """
+        if not any(quotas.values()) or not self.can_draw_quota(quotas):
+            return []
+        
+        start = time.perf_counter()
+        index = self.department_index
+        weight = self.pool.weight if self.weighted else None
+        self.animation.reset()
+        winner_ids = []
+        for department, quota in quotas.items():
+            winner_ids.extend(index.sample(department, quota, self.rng, weight))
+        for pid in winner_ids:
+            self.pool.remove(pid)
+        
+        winners = self._commit_rounds([winner_ids])[0]
+        self.metrics.timing("draw_ms", (time.perf_counter() - start) * 1000, kind="quota")
+        return winners
+    
+    def allocate_proportional(self, num_winners: int, min_per_department: int = 0) -> Dict[str, int]:
+        """按部门剩余人数比例分配名额
+        
+        Args:
+            num_winners: 总中奖人数
+            min_per_department: 每个部门的保底名额
+            
+        Returns:
+            Dict[str, int]: 部门 -> 名额；无法分配时返回空字典
+        """
+        try:
+            return allocate_proportional(self.get_department_counts(), num_winners,
+                                         min_per_department, self.rng)
+        except ValueError:
+            return {}
+    
+    def draw_proportional(self, num_winners: int, min_per_department: int = 0) -> List[Tuple[str, str]]:
+        """按部门人数比例执行一轮分层抽奖
+        
+        Args:
+            num_winners: 总中奖人数
+            min_per_department: 每个部门的保底名额
+            
+        Returns:
+            List[Tuple[str, str]]: 获奖者列表，按部门分组
+        """
+        return self.draw_quota(self.allocate_proportional(num_winners, min_per_department))
+    
+    def _commit_rounds(self, rounds: List[List[int]]) -> List[List[Tuple[str, str]]]:
+        """记录若干轮已从参与者池移除的中奖者
+        
+        Args:
+            rounds: 每轮中奖者ID
+            
+        Returns:
+            List[List[Tuple[str, str]]]: 每轮的获奖者列表
+        """
+        if self._department_index is not None:
+            for winner_ids in rounds:
+                for pid in winner_ids:
+                    self._department_index.discard(pid)
+        
+        records = []
+        results = []
+        for winner_ids in rounds:
+            current_winners = [self.pool.get(pid) for pid in winner_ids]
+            
+            # 更新获奖者列表和轮数
+            self.round_offsets.append(len(self.winners))
+            self.round_absent.append([])
+            self.winner_ids.extend(winner_ids)
+            self.winners.extend(current_winners)
+            self.current_round += 1
+            
+            records.append((self.current_round, winner_ids))
+            results.append((self.current_round, current_winners))
+        
+        # 先写入日志，保证崩溃后可恢复
+        self.journal.record_rounds(records, self.rng)
+        event = self._history_event()
+        history_rounds = [(round_num, self._history_winners(winner_ids, current_winners))
+                          for (round_num, winner_ids), (_, current_winners) in zip(records, results)]
+        self._history_write(lambda: self.history.record_rounds(event.id, history_rounds))
+        
+        # 保存结果
+        self._save_rounds(results)
+        
+        self.metrics.count("winners", sum(len(winner_ids) for winner_ids in rounds))
+        self.metrics.gauge("pool_size", len(self.pool))
+        
+        return [current_winners for _, current_winners in results]
+    
+    def undo_round(self) -> List[Tuple[str, str]]:
+        """撤销最后一轮抽奖，O(k)
+
+        该轮中奖者（以及已被补抽替换的缺席者）回到剩余池（已被排除规则排除的人除外），轮数减一，
+        日志记录撤销，该轮的结果文件被删除。随机数状态不回退，重新抽奖会得到新的结果。
+        
+        Returns:
+            List[Tuple[str, str]]: 被撤销的获奖者列表；没有可撤销的轮次时返回空列表
+        """
+        if not self.round_offsets:
+            return []
+        
+        start = time.perf_counter()
+        self.animation.reset()
+        offset = self.round_offsets.pop()
+        restored = self.winner_ids[offset:] + self.round_absent.pop()
+        undone = self.winners[offset:]
+        del self.winner_ids[offset:]
+        del self.winners[offset:]
+        for pid in restored:
+            if pid in self.excluded:
+                # 中奖之后才被排除的人不回到剩余池
+                continue
+            self.pool.restore(pid)
+            if self._department_index is not None:
+                self._department_index.add(pid)
+        
+        round_num = self.current_round
+        self.current_round -= 1
+        self.journal.record_undo(round_num, self.rng)
+        if self.history_event is not None:
+            event = self.history_event
+            self._history_write(lambda: self.history.undo_round(event.id, round_num))
+        self._remove_round_file(round_num)
+        
+        self.metrics.timing("undo_ms", (time.perf_counter() - start) * 1000)
+        self.metrics.gauge("pool_size", len(self.pool))
+        return undone
+    
+    def redraw_absent(self, position: int) -> Optional[Tuple[str, str]]:
+        """缺席的获奖者由剩余参与者中补抽的一人替换，O(k)
+        
+        缺席者不回到剩余池；补抽者在该轮中占据缺席者的位置，加权模式下同样按票数抽取。
+        日志记录替换，该轮的结果文件重新写入。
+        
+        Args:
+            position: 缺席获奖者在 winners 中的位置（即结果表格的行号）
+            
+        Returns:
+            Optional[Tuple[str, str]]: 补抽的获奖者；位置无效或已无剩余参与者时返回None
+        """
+        if not 0 <= position < len(self.winner_ids) or not self.can_draw(1):
+            return None
+        pid = self.winner_ids[position]
+        
+        self.animation.reset()
+        replacement = self.pool.take(1)[0]
+        if self._department_index is not None:
+            self._department_index.discard(replacement)
+        winner = self.pool.get(replacement)
+        self.winner_ids[position] = replacement
+        self.winners[position] = winner
         
-        # 更新剩余参与者和获奖者列表
-        for winner in current_winners:
-            self.remaining.remove(winner)
-            self.winners.append(winner)
+        round_num = bisect.bisect_right(self.round_offsets, position)
+        self.round_absent[round_num - 1].append(pid)
+        self.journal.record_redraw(round_num, pid, replacement, self.rng)
+        event = self._history_event()
+        history_winner = self._history_winners([replacement], [winner])[0]
+        self._history_write(lambda: self.history.record_redraw(event.id, round_num, pid, history_winner))
+        end = self.round_offsets[round_num] if round_num < len(self.round_offsets) else len(self.winners)
+        self._save_rounds([(round_num, self.winners[self.round_offsets[round_num - 1]:end])])
         
-        # 更新轮数
-        self.current_round += 1
+        self.metrics.count("redraws")
+        self.metrics.gauge("pool_size", len(self.pool))
+        return winner
+    
+    def _history_write(self, task: Callable[[], None]) -> None:
+        """把历史库写入交给后台写入线程，按提交顺序执行，不阻塞调用线程
         
-        # 保存本轮结果
-        self.save_results(current_winners)
+        抽奖日志已同步写入，崩溃后可据此补齐历史库（见 HistoryStore.sync_event）。
+        每个任务使用不同的键，不会被合并。
+        """
+        self._history_writes += 1
+        self.writer.submit(f"history:{self._history_writes}", task)
+    
+    def _history_event(self) -> HistoryEvent:
+        """历史库中的当前活动，尚未创建时开始一次新活动（在后台写入线程中创建）"""
+        if self.history_event is None:
+            event = self.history_event = HistoryEvent()
+            roster_path, total, policy = self.csv_path, self.pool.total, self.identity.policy
+            
+            def start():
+                event.id = self.history.start_event(roster_path, total, policy)
+            
+            self._history_write(start)
+        return self.history_event
+    
+    def _end_history_event(self) -> None:
+        """结束历史库中的当前活动，下一轮抽奖时再开始新活动"""
+        if self.history_event is not None:
+            event, self.history_event = self.history_event, None
+            
+            def end():
+                if event.id is not None:
+                    self.history.end_event(event.id)
+            
+            self._history_write(end)
+    
+    def _history_winners(self, winner_ids: List[int],
+                         winners: Optional[List[Tuple[str, str]]] = None) -> List[Tuple[int, str, str, str]]:
+        """历史库的获奖者记录: (参与者ID, 身份键, 部门, 姓名)
         
-        return current_winners
+        Args:
+            winner_ids: 获奖者ID
+            winners: 对应的 (部门, 姓名)，默认从参与者池读取
+        """
+        if winners is None:
+            winners = [self.pool.get(pid) for pid in winner_ids]
+        key_of = self.identity.key_of
+        return [(pid, key_of(pid), department, name) for pid, (department, name) in zip(winner_ids, winners)]
+    
+    def _history_round(self, round_num: int) -> List[Tuple[int, str, str, str]]:
+        """第 round_num 轮的历史库获奖者记录"""
+        end = self.round_offsets[round_num] if round_num < len(self.round_offsets) else len(self.winner_ids)
+        return self._history_winners(self.winner_ids[self.round_offsets[round_num - 1]:end])
+    
+    def output_dir(self) -> str:
+        """抽奖结果输出目录"""
+        if self._output_dir is not None:
+            return self._output_dir
+        return os.path.join(os.path.dirname(self.csv_path), "..", "..", "output")
     
     def save_results(self, winners: List[Tuple[str, str]]) -> None:
-        """保存抽奖结果到CSV文件
+        """在后台线程保存当前轮抽奖结果到CSV文件
         
         Args:
             winners: 当前轮的获奖者列表
         """
-        output_dir = os.path.join(os.path.dirname(self.csv_path), "..", "..", "output")
-        os.makedirs(output_dir, exist_ok=True)
+        self._save_rounds([(self.current_round, winners)])
+    
+    def _save_rounds(self, results: List[Tuple[int, List[Tuple[str, str]]]]) -> None:
+        """把若干轮结果作为一个后台写入任务提交
+        
+        Args:
+            results: (轮次, 获奖者列表) 列表
+        """
+        if not self.save_round_files:
+            return
+        files = [(os.path.join(self.output_dir(), f"round_{round_num}.csv"), list(winners))
+                 for round_num, winners in results]
+        
+        metrics = self.metrics
         
-        output_path = os.path.join(output_dir, f"round_{self.current_round}.csv")
+        def write():
+            start = time.perf_counter()
+            for path, rows in files:
+                write_results_csv(path, rows)
+            metrics.timing("save_ms", (time.perf_counter() - start) * 1000)
         
-        # 创建DataFrame并保存
-        df = pd.DataFrame(winners, columns=['department', 'name'])
-        df.to_csv(output_path, index=False, encoding='utf-8')
+        self.writer.submit("|".join(path for path, _ in files), write)
+    
+    def _remove_round_file(self, round_num: int) -> None:
+        """在后台删除某一轮的结果文件，排在该文件尚未执行的写入之后"""
+        if not self.save_round_files:
+            return
+        path = os.path.join(self.output_dir(), f"round_{round_num}.csv")
+        
+        def remove():
+            if os.path.exists(path):
+                os.remove(path)
+        
+        self.writer.submit(path, remove)
+    
+    def close(self) -> None:
+        """等待后台写入完成并停止写入线程，关闭历史库"""
+        self.writer.close()
+        self.history.close()
     
     def get_remaining_count(self) -> int:
         """获取剩余未抽奖人数
@@ -122,10 +1072,21 @@ class LuckyDrawModel:
         Returns:
             int: 剩余人数
         """
-        return len(self.remaining)
+        return len(self.pool)
+    
+    def get_round_winners(self) -> List[List[Tuple[str, str]]]:
+        """获取每轮的获奖者
+        
+        Returns:
+            List[List[Tuple[str, str]]]: 按轮次排列的获奖者列表
+        """
+        bounds = self.round_offsets + [len(self.winners)]
+        return [self.winners[bounds[i]:bounds[i + 1]] for i in range(len(self.round_offsets))]
     
     def get_random_names(self, count: int) -> List[Tuple[str, str]]:
-        """获取随机的参与者，用于动画展示
+        """获取随机的参与者，用于动画展示（加权模式下同样按票数抽取）
+        
+        候选人取自预先抽取的环形缓冲区，每帧开销只与 count 有关。
         
         Args:
             count: 要获取的随机参与者数量
@@ -133,9 +1094,4 @@ class LuckyDrawModel:
         Returns:
             List[Tuple[str, str]]: 随机参与者列表 (部门, 姓名)
         """
-        if not self.remaining or count <= 0:
-            return []
-        
-        # 从剩余参与者中随机抽取
-        sample_size = min(count, len(self.remaining))
-        return random.sample(self.remaining, sample_size)
\ No newline at end of file
+        return self.animation.next_frame(count)
\ No newline at end of file
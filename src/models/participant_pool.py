@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ParticipantPool:
+    """参与者池，为每位参与者分配稳定的整数ID
+
+    全部ID保存在一个排列数组中，前 _size 项为剩余参与者，并维护 ID -> 数组位置
+    的反向索引，因此移除中奖者是 O(1) 的交换删除，抽取 k 人是 O(k)，
+    成员检查是 O(1)。同名同部门的参与者拥有不同的ID，互不影响。
+    已移除的ID仍留在排列中（前缀之外），重置只需把前缀恢复为整个数组，是 O(1)。
+
+    参与者以紧凑的列保存，不为每人创建对象：部门编码为 array('H') 中的小整数，
+    姓名以UTF-8拼接在一个缓冲区中并由偏移数组定位，ID和位置也是定长整数数组。
+    (部门, 姓名) 元组只在 get 时才生成，百万人时每人约占 24 字节，见 benchmarks/bench_memory.py。
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        """初始化参与者池
+
+        Args:
+            rng: 随机数生成器，默认新建一个
+        """
+        self.rng = rng if rng is not None else random.Random()
+        self._departments: List[str] = []          # 部门编码 -> 部门名称
+        self._department_codes: Dict[str, int] = {}
+        self._codes = array('H')                   # ID -> 部门编码，部门超过 65536 个时改为 'I'
+        self._names = bytearray()                  # 全部姓名的UTF-8编码
+        self._offsets = array('I', [0])            # 姓名 ID 位于 _names[_offsets[ID]:_offsets[ID + 1]]
+        self._ids = array('i')                     # 全部ID的排列，前 _size 项为剩余参与者
+        self._pos = array('i')                     # ID -> 在 _ids 中的位置
+        self._size = 0
+
+    def _encode(self, department: str) -> int:
+        code = self._department_codes.get(department)
+        if code is None:
+            code = len(self._departments)
+            if code == 1 << 16:
+                self._codes = array('I', self._codes)
+            self._departments.append(department)
+            self._department_codes[department] = code
+        return code
+
+    def add(self, department: str, name: str) -> int:
+        """添加一位参与者
+
+        Args:
+            department: 部门
+            name: 姓名
+
+        Returns:
+            int: 新参与者的ID
+        """
+        pid = len(self._codes)
+        self._codes.append(self._encode(department))
+        self._names += name.encode('utf-8')
+        self._offsets.append(len(self._names))
+        self._pos.append(pid)
+        self._ids.append(pid)
+        self._swap(pid, self._size)
+        self._size += 1
+        return pid
+
+    def extend(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """批量添加参与者
+
+        Args:
+            rows: (部门, 姓名) 序列
+        """
+        # 每行都会执行，add 在此内联
+        department_codes = self._department_codes
+        codes, names, offsets = self._codes, self._names, self._offsets
+        start = len(codes)
+        for department, name in rows:
+            code = department_codes.get(department)
+            if code is None:
+                code = self._encode(department)
+                codes = self._codes
+            codes.append(code)
+            names += name.encode('utf-8')
+            offsets.append(len(names))
+
+        # 新ID先放在末尾，再与紧跟剩余前缀的已移除ID交换，O(新增人数)
+        end = len(codes)
+        self._ids.extend(range(start, end))
+        self._pos.extend(range(start, end))
+        swap = min(end - start, start - self._size)
+        for i in range(swap):
+            self._swap(self._size + i, end - swap + i)
+        self._size += end - start
+
+    def __len__(self) -> int:
+        """剩余参与者数量"""
+        return self._size
+
+    def __contains__(self, pid: int) -> bool:
+        """参与者是否仍在剩余池中"""
+        return 0 <= pid < len(self._pos) and self._pos[pid] < self._size
+
+    @property
+    def total(self) -> int:
+        """参与者总数（含已中奖）"""
+        return len(self._codes)
+
+    def get(self, pid: int) -> Tuple[str, str]:
+        """获取参与者信息
+
+        Args:
+            pid: 参与者ID
+
+        Returns:
+            Tuple[str, str]: (部门, 姓名)
+        """
+        offsets = self._offsets
+        return (self._departments[self._codes[pid]],
+                self._names[offsets[pid]:offsets[pid + 1]].decode('utf-8'))
+
+    def ids(self) -> List[int]:
+        """剩余参与者ID列表（副本）"""
+        return self._ids[:self._size].tolist()
+
+    def _swap(self, i: int, j: int) -> None:
+        a, b = self._ids[i], self._ids[j]
+        self._ids[i], self._ids[j] = b, a
+        self._pos[a], self._pos[b] = j, i
+
+    def remove(self, pid: int) -> None:
+        """从剩余池中移除参与者（交换删除，O(1)）
+
+        Args:
+            pid: 参与者ID
+        """
+        index = self._pos[pid]
+        if index >= self._size:
+            raise KeyError(pid)
+        self._size -= 1
+        self._swap(index, self._size)
+
+    def remove_many(self, pids: List[int]) -> None:
+        """批量移除参与者，忽略已不在池中的ID，O(k)
+
+        Args:
+            pids: 参与者ID列表
+        """
+        for pid in pids:
+            if pid in self:
+                self.remove(pid)
+
+    def restore(self, pid: int) -> None:
+        """将已移除的参与者放回剩余池（O(1)）
+
+        Args:
+            pid: 参与者ID
+        """
+        index = self._pos[pid]
+        if index < self._size:
+            return
+        self._swap(index, self._size)
+        self._size += 1
+
+    def sample(self, count: int, rng: Optional[random.Random] = None) -> List[int]:
+        """随机抽取若干参与者ID，不移除
+
+        Args:
+            count: 抽取数量，超过剩余人数时按剩余人数处理
+            rng: 随机数生成器，默认使用参与者池的生成器
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        count = min(count, self._size)
+        if count <= 0:
+            return []
+        # 抽取前缀内的位置（与直接对剩余ID列表抽样的结果相同），不复制前缀
+        ids = self._ids
+        return [ids[index] for index in (rng or self.rng).sample(range(self._size), count)]
+
+    def take(self, count: int) -> List[int]:
+        """随机抽取若干参与者ID并从剩余池中移除
+
+        Args:
+            count: 抽取数量
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        chosen = self.sample(count)
+        for pid in chosen:
+            self.remove(pid)
+        return chosen
+
+    def reset(self, canonical: bool = False) -> None:
+        """恢复所有参与者到剩余池，O(1)
+
+        已移除的ID都在剩余前缀之后，把前缀扩展到整个排列即可。
+
+        Args:
+            canonical: 同时把排列恢复为按ID排列（O(n)），此后按同一随机种子
+                       抽样的结果与之前的抽奖无关
+        """
+        if canonical:
+            self._ids = array('i', range(self.total))
+            self._pos = array('i', range(self.total))
+        self._size = self.total
+
+    def clear(self) -> None:
+        """清空参与者池"""
+        self._departments = []
+        self._department_codes = {}
+        self._codes = array('H')
+        self._names = bytearray()
+        self._offsets = array('I', [0])
+        self._ids = array('i')
+        self._pos = array('i')
+        self._size = 0
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from src.metrics import Metrics
+
+
+class ResultWriter:
+    """后台结果写入线程
+
+    写入任务按目标键（通常是文件路径）排队，由单个后台线程按提交顺序依次执行，
+    调用方不会被磁盘延迟阻塞。同一键尚未执行的旧任务会被新任务替换（写入合并），
+    新任务排到队尾；排队任务达到上限时提交方等待，避免无界增长。进程退出时自动刷新。
+
+    上报的指标: write_ms（每个任务的耗时）、write_queue_depth（提交和完成时的排队深度）、
+    writes_coalesced 和 write_errors。
+    """
+
+    def __init__(self, max_pending: int = 64, metrics: Optional[Metrics] = None):
+        """初始化并启动写入线程
+
+        Args:
+            max_pending: 最多排队的写入任务数
+            metrics: 指标上报入口，默认不上报
+        """
+        self.max_pending = max_pending
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._pending: "OrderedDict[str, Callable[[], None]]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="ResultWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, key: str, task: Callable[[], None]) -> None:
+        """提交写入任务
+
+        Args:
+            key: 目标键，同键的未执行任务会被替换
+            task: 执行写入的无参函数
+        """
+        with self._cond:
+            if self._closed:
+                # 已关闭时直接在调用线程写入，保证结果不丢失
+                task()
+                return
+            if key in self._pending:
+                # 替换后排到队尾：键可能覆盖同一文件（如多轮合并写入与单个文件的删除），
+                # 须按提交顺序执行
+                self._pending[key] = task
+                self._pending.move_to_end(key)
+                self.metrics.count("writes_coalesced")
+                return
+            while len(self._pending) >= self.max_pending:
+                self._cond.wait()
+            self._pending[key] = task
+            depth = len(self._pending) + (1 if self._busy else 0)
+            self._cond.notify_all()
+        self.metrics.gauge("write_queue_depth", depth)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                _, task = self._pending.popitem(last=False)
+                self._busy = True
+                self._cond.notify_all()
+
+            start = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                self.metrics.count("write_errors")
+                print(f"保存抽奖结果出错: {e}")
+            self.metrics.timing("write_ms", (time.perf_counter() - start) * 1000)
+
+            with self._cond:
+                self._busy = False
+                depth = len(self._pending)
+                self._cond.notify_all()
+            self.metrics.gauge("write_queue_depth", depth)
+
+    @property
+    def queue_depth(self) -> int:
+        """排队及正在执行的写入任务数"""
+        with self._cond:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待所有已提交的写入完成
+
+        Args:
+            timeout: 最长等待秒数，默认一直等待
+
+        Returns:
+            bool: 全部完成返回True，超时返回False
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self) -> None:
+        """刷新剩余写入并停止写入线程"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        atexit.unregister(self.close)
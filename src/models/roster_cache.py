@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""名单二进制缓存
+
+首次解析大名单后，把规范化、去重后的结果写成紧凑的二进制文件；之后打开同一名单时
+直接 mmap 该文件，部门编码和姓名数组作为 numpy 视图交给 ColumnarPool，不再解析CSV。
+
+文件布局（小端）:
+    魔数 b"LDRC"、格式版本 uint32、元数据长度 uint32
+    元数据 JSON（UTF-8）：来源指纹、重复处理方式、加载报告、部门字典、各段位置
+    部门编码  int32[n]
+    姓名      <U{width}[n]，UTF-32 定长，与 ColumnarPool 的姓名数组布局相同，可零拷贝使用
+    权重      float64[n]，仅加权名单
+    身份键    UTF-8，换行分隔（规范化后的文本不含换行）
+各段按 64 字节对齐。
+
+来源指纹为路径、大小、修改时间以及已解析部分内容的哈希。大小和修改时间都未变时
+直接使用缓存；否则校验已解析部分的哈希，一致说明名单只是在末尾追加了行，
+仍可使用缓存，再按 read_appended 读取追加的部分。其余情况重新解析并覆盖缓存。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import List, Optional
+
+import numpy as np
+
+from src.models.columnar_pool import ColumnarPool
+from src.models.identity_index import IdentityIndex
+from src.models.roster_loader import LoadReport
+
+MAGIC = b"LDRC"
+VERSION = 3
+ALIGNMENT = 64
+_HEADER = struct.Struct("<4sII")
+
+# 加载报告中写入缓存的字段
+_REPORT_FIELDS = ("path", "encoding", "has_weight", "has_employee_id", "rows", "bad_row_count",
+                  "bad_rows", "columns", "end_offset", "partial_bytes", "line_num")
+
+
+def cache_path(cache_dir: str, roster_path: str) -> str:
+    """名单对应的缓存文件路径"""
+    digest = hashlib.sha1(os.path.abspath(roster_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"roster-{digest}.bin")
+
+
+def content_hash(path: str, length: int) -> str:
+    """文件前 length 字节的哈希"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 20))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class RosterCache:
+    """已打开的名单缓存，数组为只读的 mmap 视图"""
+
+    def __init__(self, buffer: mmap.mmap, meta: dict):
+        self._buffer = buffer
+        self.meta = meta
+        sections = meta["sections"]
+        count = meta["count"]
+        self.departments: List[str] = meta["departments"]
+        self.codes = np.frombuffer(buffer, dtype='<i4', count=count, offset=sections["codes"])
+        self.names = np.frombuffer(buffer, dtype=f'<U{meta["name_width"]}', count=count,
+                                   offset=sections["names"])
+        self.weights = (np.frombuffer(buffer, dtype='<f8', count=count, offset=sections["weights"])
+                        if "weights" in sections else None)
+
+        self.report = LoadReport()
+        for field in _REPORT_FIELDS:
+            setattr(self.report, field, meta["report"][field])
+        self.report.bad_rows = [tuple(row) for row in self.report.bad_rows]
+
+    def create_pool(self, rng=None) -> ColumnarPool:
+        """以缓存中的列数组创建参与者池（不复制）"""
+        return ColumnarPool.from_columns(self.departments, self.codes, self.names, rng)
+
+    def create_identity(self) -> IdentityIndex:
+        """恢复身份索引，身份键在首次使用时才解码"""
+        identity = IdentityIndex(self.meta["policy"])
+        identity.duplicate_count = self.meta["duplicate_count"]
+        identity.duplicates = [tuple(item) for item in self.meta["duplicates"]]
+        identity.normalized_count = self.meta["normalized_count"]
+        identity.defer(self._keys)
+        return identity
+
+    def _keys(self) -> List[str]:
+        start, length = self.meta["sections"]["keys"]
+        if not length:
+            return []
+        return self._buffer[start:start + length].decode('utf-8').split('\n')
+
+
+def read_cache(path: str, roster_path: str, policy: str) -> Optional[RosterCache]:
+    """打开名单缓存
+
+    Args:
+        path: 缓存文件路径
+        roster_path: 名单文件路径
+        policy: 当前的重复处理方式
+
+    Returns:
+        Optional[RosterCache]: 缓存不存在、已损坏或与名单不一致时返回None；
+        名单在缓存之后追加了行时仍返回缓存，report.end_offset 之后的部分需另行读取
+    """
+    try:
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    cache = None
+    try:
+        magic, version, meta_length = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        meta = json.loads(buffer[_HEADER.size:_HEADER.size + meta_length].decode('utf-8'))
+        source = meta["source"]
+        if source["path"] != os.path.abspath(roster_path) or meta["policy"] != policy:
+            return None
+        stat = os.stat(roster_path)
+        if stat.st_size != source["size"] or stat.st_mtime_ns != source["mtime_ns"]:
+            # 名单被修改过：只有已解析部分的内容完全一致（只在末尾追加）时才可使用
+            end_offset = meta["report"]["end_offset"]
+            if stat.st_size < end_offset or content_hash(roster_path, end_offset) != source["hash"]:
+                return None
+        cache = RosterCache(buffer, meta)
+        return cache
+    except (KeyError, TypeError, ValueError, OSError, struct.error) as e:
+        print(f"名单缓存无效，将重新解析: {e}")
+        return None
+    finally:
+        if cache is None:
+            buffer.close()
+
+
+def write_cache(path: str, roster_path: str, pool: ColumnarPool, report: LoadReport,
+                identity: IdentityIndex, weights: Optional[List[float]]) -> None:
+    """把解析结果写入名单缓存（先写临时文件再替换）
+
+    Args:
+        path: 缓存文件路径
+        roster_path: 名单文件路径
+        pool: 刚加载、尚未抽奖的列式参与者池
+        report: 加载报告，end_offset 为已解析的字节数
+        identity: 身份索引
+        weights: 按参与者ID排列的最终权重，非加权名单为None
+    """
+    departments, codes, names = pool.columns()
+    keys = "\n".join(identity.keys()).encode('utf-8')
+    stat = os.stat(roster_path)
+    meta = {
+        "source": {
+            "path": os.path.abspath(roster_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": content_hash(roster_path, report.end_offset),
+        },
+        "policy": identity.policy,
+        "count": len(codes),
+        "name_width": names.dtype.itemsize // 4,
+        "departments": departments,
+        "report": {field: getattr(report, field) for field in _REPORT_FIELDS},
+        "duplicate_count": identity.duplicate_count,
+        "duplicates": identity.duplicates,
+        "normalized_count": identity.normalized_count,
+    }
+
+    # 各段位置依赖元数据长度，元数据又包含各段位置：预留足够的位置后再定稿
+    blocks = [("codes", codes.astype('<i4', copy=False)), ("names", names)]
+    if weights is not None:
+        blocks.append(("weights", np.asarray(weights, dtype='<f8')))
+    meta["sections"] = {name: 0 for name, _ in blocks}
+    meta["sections"]["keys"] = [0, len(keys)]
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    offset = _align(_HEADER.size + len(meta_bytes) + 256)
+    for name, array in blocks:
+        meta["sections"][name] = offset
+        offset = _align(offset + array.nbytes)
+    meta["sections"]["keys"] = [offset, len(keys)]
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        for name, array in blocks:
+            f.seek(meta["sections"][name])
+            f.write(np.ascontiguousarray(array).data)
+        f.seek(meta["sections"]["keys"][0])
+        f.write(keys)
+    os.replace(tmp_path, path)
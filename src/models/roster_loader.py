@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import codecs
+import csv
+import io
+import math
+import os
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# 探测编码时读取的字节数
+SNIFF_BYTES = 64 * 1024
+
+# 每读取多少行回调一次进度
+PROGRESS_INTERVAL = 50_000
+
+# 报告中最多保留的错误行明细数量（总数仍全部计入）
+MAX_BAD_ROW_DETAILS = 100
+
+ProgressCallback = Callable[[int, int, int], None]
+
+
+class LoadReport:
+    """名单加载报告"""
+
+    def __init__(self):
+        self.path = ""
+        self.encoding = ""
+        self.has_weight = False                        # 名单是否包含 weight 列
+        self.has_employee_id = False                   # 名单是否包含 employee_id 列
+        self.rows = 0                                  # 成功读取的行数
+        self.bad_row_count = 0                         # 错误行总数
+        self.bad_rows: List[Tuple[int, str]] = []      # (行号, 原因)，最多保留 MAX_BAD_ROW_DETAILS 条
+        self.columns: List[str] = []                   # 表头列名，追加读取时沿用
+        self.end_offset = 0                            # 最后一个完整行之后的字节位置，追加读取从这里继续
+        self.partial_bytes = 0                         # end_offset 之后没有换行符、暂未读取的末行字节数
+        self.line_num = 0                              # 已读取的物理行数，用于错误行行号
+        self.sources: List['LoadReport'] = []          # 从多个来源导入时各来源的报告
+
+    def add_bad_row(self, line_no: int, reason: str) -> None:
+        """记录一条错误行"""
+        self.bad_row_count += 1
+        if len(self.bad_rows) < MAX_BAD_ROW_DETAILS:
+            self.bad_rows.append((line_no, reason))
+
+    def add_source(self, other: 'LoadReport') -> None:
+        """并入一个来源的报告，错误行原因前加上来源文件名"""
+        self.sources.append(other)
+        self.rows += other.rows
+        self.bad_row_count += other.bad_row_count
+        file_name = os.path.basename(other.path)
+        for line_no, reason in other.bad_rows[:MAX_BAD_ROW_DETAILS - len(self.bad_rows)]:
+            self.bad_rows.append((line_no, f"{file_name}: {reason}"))
+        self.has_weight = self.has_weight or other.has_weight
+        self.has_employee_id = self.has_employee_id or other.has_employee_id
+
+
+def detect_encoding(path: str) -> str:
+    """探测CSV文件编码
+
+    带BOM的文件识别为 utf-8-sig；否则能按UTF-8解码的视为 utf-8，
+    其余按 gb18030（GBK 的超集）处理。
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 编码名称
+    """
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 增量解码，避免截断在多字节字符中间时误判
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'gb18030'
+
+
+def estimate_rows(path: str) -> int:
+    """根据文件开头的平均行长估算总行数
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        int: 估算的数据行数
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    lines = head.count(b'\n')
+    if lines == 0:
+        return 1 if size else 0
+    return int(size / (len(head) / lines))
+
+
+def _parse_weight(value: str) -> Optional[float]:
+    """解析权重，空白视为1，非正数或无法解析时返回None"""
+    value = value.strip()
+    if not value:
+        return 1.0
+    try:
+        weight = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(weight) or weight <= 0:
+        return None
+    return weight
+
+
+def iter_roster(path: str, encoding: Optional[str] = None,
+                report: Optional[LoadReport] = None,
+                progress: Optional[ProgressCallback] = None,
+                weights: Optional[List[float]] = None,
+                employee_ids: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+    """逐行读取参与者名单，不构建中间 DataFrame
+
+    表头需包含 department 和 name 列（忽略BOM和首尾空白），可选的 weight 列
+    为票数，可选的 employee_id 列为工号，其余列忽略。列数不足、部门或姓名为空、权重不是正数的行计入报告
+    并跳过，空行直接忽略。与 read_appended 一样只读取完整的行：没有换行符的末行可能尚未写完，
+    不读取，其字节数记入 report.partial_bytes，补上换行符后由 read_appended 读取。
+
+    Args:
+        path: CSV文件路径
+        encoding: 文件编码，默认自动探测
+        report: 加载报告，读取过程中更新
+        progress: 进度回调 progress(已读行数, 已读字节数, 文件总字节数)
+        weights: 若提供且名单包含 weight 列，每读出一行就追加该行的权重（空白为1）
+        employee_ids: 若提供且名单包含 employee_id 列，每读出一行就追加该行的工号
+
+    Yields:
+        Tuple[str, str]: (部门, 姓名)
+
+    Raises:
+        ValueError: 缺少 department 或 name 列
+    """
+    report = report if report is not None else LoadReport()
+    encoding = encoding or detect_encoding(path)
+    report.path = path
+    report.encoding = encoding
+    total_bytes = os.path.getsize(path)
+
+    with open(path, 'rb') as raw:
+        text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+        reader = csv.reader(_complete_lines(text))
+
+        header = next(reader, None)
+        if header is None:
+            return
+        _read_header(header, report)
+
+        yield from _iter_rows(reader, report, weights, employee_ids, 0,
+                              lambda: progress(report.rows, raw.tell(), total_bytes) if progress else None)
+        # 读取位置停在最后一个换行符之后，之后追加的行由 read_appended 处理
+        end = raw.tell()
+        report.partial_bytes = _partial_line_bytes(raw, end)
+        report.end_offset = end - report.partial_bytes
+
+    if progress is not None:
+        progress(report.rows, total_bytes, total_bytes)
+
+
+def _complete_lines(lines: Iterator[str]) -> Iterator[str]:
+    """逐行产出文本，跳过没有换行符的末行；表头行总是产出"""
+    previous = next(lines, None)
+    if previous is None:
+        return
+    yield previous
+    previous = None
+    for line in lines:
+        if previous is not None:
+            yield previous
+        previous = line
+    if previous is not None and previous.endswith('\n'):
+        yield previous
+
+
+def _partial_line_bytes(f, end: int) -> int:
+    """文件前 end 字节中最后一个换行符之后的字节数；没有换行符（只有表头）时为0"""
+    position = end
+    while position > 0:
+        start = max(0, position - SNIFF_BYTES)
+        f.seek(start)
+        newline = f.read(position - start).rfind(b'\n')
+        if newline >= 0:
+            return end - (start + newline + 1)
+        position = start
+    return 0
+
+
+def iter_table(rows: Iterable[List[str]], report: LoadReport,
+               weights: Optional[List[float]] = None,
+               employee_ids: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+    """逐行读取已拆分为单元格的名单表格（如 Excel 工作表），首行为表头
+
+    列和错误行的规则与 iter_roster 相同，行号为表格中的行号。
+
+    Args:
+        rows: 各行单元格文本
+        report: 加载报告，调用方须先设置 path 和 encoding
+        weights: 见 iter_roster
+        employee_ids: 见 iter_roster
+
+    Yields:
+        Tuple[str, str]: (部门, 姓名)
+
+    Raises:
+        ValueError: 缺少 department 或 name 列
+    """
+    reader = _TableReader(rows)
+    header = next(reader, None)
+    if header is None:
+        return
+    _read_header(header, report)
+    yield from _iter_rows(reader, report, weights, employee_ids, 0, lambda: None)
+
+
+class _TableReader:
+    """为表格行迭代器提供与 csv.reader 相同的 line_num"""
+
+    def __init__(self, rows: Iterable[List[str]]):
+        self._rows = iter(rows)
+        self.line_num = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> List[str]:
+        row = next(self._rows)
+        self.line_num += 1
+        return row
+
+
+def _read_header(header: List[str], report: LoadReport) -> None:
+    """解析表头（忽略BOM和首尾空白），缺少必需列时抛出 ValueError"""
+    report.columns = [column.strip().lstrip('\ufeff') for column in header]
+    if 'department' not in report.columns or 'name' not in report.columns:
+        raise ValueError(f"名单缺少 department 或 name 列: {header}")
+    report.has_weight = 'weight' in report.columns
+    report.has_employee_id = 'employee_id' in report.columns
+
+
+def _iter_rows(reader, report: LoadReport, weights: Optional[List[float]],
+               employee_ids: Optional[List[str]], first_line: int,
+               on_progress: Callable[[], None]) -> Iterator[Tuple[str, str]]:
+    """按 report.columns 解析数据行，更新报告
+
+    Args:
+        reader: csv.reader
+        report: 加载报告
+        weights: 见 iter_roster
+        employee_ids: 见 iter_roster
+        first_line: reader 第一行之前已读取的物理行数，用于错误行行号
+        on_progress: 每 PROGRESS_INTERVAL 行调用一次
+    """
+    columns = report.columns
+    dept_index = columns.index('department')
+    name_index = columns.index('name')
+    weight_index = columns.index('weight') if 'weight' in columns else None
+    read_weight = weights is not None and weight_index is not None
+    id_index = columns.index('employee_id') if employee_ids is not None and 'employee_id' in columns else None
+    min_columns = max(dept_index, name_index) + 1
+
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < min_columns:
+            report.add_bad_row(first_line + reader.line_num, "列数不足")
+            continue
+        department = row[dept_index].strip()
+        name = row[name_index].strip()
+        if not department or not name:
+            report.add_bad_row(first_line + reader.line_num, "部门或姓名为空")
+            continue
+        if read_weight:
+            weight = _parse_weight(row[weight_index] if weight_index < len(row) else "")
+            if weight is None:
+                report.add_bad_row(first_line + reader.line_num, "权重不是正数")
+                continue
+            weights.append(weight)
+        if id_index is not None:
+            employee_ids.append(row[id_index].strip() if id_index < len(row) else "")
+
+        report.rows += 1
+        if report.rows % PROGRESS_INTERVAL == 0:
+            on_progress()
+        yield department, name
+    report.line_num = first_line + reader.line_num
+
+
+def read_appended(report: LoadReport, weights: Optional[List[float]] = None,
+                  employee_ids: Optional[List[str]] = None) -> Optional[Iterator[Tuple[str, str]]]:
+    """读取名单在 report.end_offset 之后追加的完整行
+
+    只读取新增的字节，开销与新增行数成正比。末尾尚未写完（没有换行符）的行
+    留到下次读取，其字节数记入 partial_bytes。end_offset 立即更新，行数和错误行
+    随返回的迭代器推进而更新。
+
+    Args:
+        report: iter_roster 或上一次 read_appended 更新过的加载报告
+        weights: 见 iter_roster
+        employee_ids: 见 iter_roster
+
+    Returns:
+        Optional[Iterator[Tuple[str, str]]]: 新增的 (部门, 姓名)；文件变短
+        （被替换或截断）时返回 None，需要重新加载整个名单
+    """
+    size = os.path.getsize(report.path)
+    if size < report.end_offset:
+        return None
+    if size == report.end_offset or not report.columns:
+        report.partial_bytes = 0
+        return iter(())
+
+    with open(report.path, 'rb') as f:
+        f.seek(report.end_offset)
+        data = f.read(size - report.end_offset)
+    end = data.rfind(b'\n') + 1
+    report.partial_bytes = len(data) - end
+    if end == 0:
+        return iter(())
+
+    # BOM 只可能出现在文件开头
+    encoding = 'utf-8' if report.encoding == 'utf-8-sig' else report.encoding
+    text = data[:end].decode(encoding, errors='replace')
+    report.end_offset += end
+    return _iter_rows(csv.reader(io.StringIO(text, newline='')), report, weights, employee_ids,
+                      report.line_num, lambda: None)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""从多个名单来源并行导入
+
+支持的来源格式（按扩展名识别，其余按CSV处理）:
+    CSV      .csv / .txt，见 iter_roster
+    Excel    .xlsx / .xlsm，读取第一个工作表，需要 openpyxl
+    Parquet  .parquet / .pq，需要 pyarrow
+
+每个来源在独立的工作进程中解析，并在进程内完成规范化和身份键计算
+（IdentityIndex.prepare）；主进程只按来源的给定顺序登记身份、构建参与者池，
+因此参与者ID与各进程完成的先后无关，抽奖日志可以回放。
+"""
+
+import os
+from typing import Iterator, List, Optional, Tuple, Union
+
+from src.models.identity_index import IdentityIndex
+from src.models.roster_loader import LoadReport, estimate_rows, iter_roster, iter_table
+
+# 扩展名 -> 来源格式
+SOURCE_FORMATS = {
+    '.csv': 'csv',
+    '.txt': 'csv',
+    '.xlsx': 'xlsx',
+    '.xlsm': 'xlsx',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+# Parquet 中读取的列
+ROSTER_COLUMNS = ('department', 'name', 'weight', 'employee_id')
+
+# 在进程间传递时拼接字段的分隔符
+FIELD_SEPARATOR = '\x00'
+
+
+def source_format(path: str) -> str:
+    """按扩展名判断来源格式，未知扩展名按CSV处理"""
+    return SOURCE_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+
+
+def estimate_source_rows(path: str) -> int:
+    """估算来源的数据行数，用于提前选择参与者池实现
+
+    Args:
+        path: 来源文件路径
+
+    Returns:
+        int: 估算的数据行数
+    """
+    kind = source_format(path)
+    if kind == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if kind == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        try:
+            return max((workbook.worksheets[0].max_row or 1) - 1, 0)
+        finally:
+            workbook.close()
+    return estimate_rows(path)
+
+
+def _cell_text(value) -> str:
+    """单元格的值转为文本，整数值的浮点数去掉小数部分（如工号 1001.0）"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _xlsx_rows(path: str) -> Iterator[List[str]]:
+    """按行读取 Excel 第一个工作表"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [_cell_text(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def _parquet_rows(path: str) -> Iterator[List[str]]:
+    """按批读取 Parquet 中的名单列，首行为表头"""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    columns = [name for name in parquet.schema_arrow.names if name.strip() in ROSTER_COLUMNS]
+    yield columns
+    for batch in parquet.iter_batches(columns=columns):
+        values = batch.to_pydict()
+        for row in zip(*(values[name] for name in columns)):
+            yield [_cell_text(value) for value in row]
+
+
+def _iter_source(path: str, report: LoadReport, weights: List[float],
+                 employee_ids: List[str]) -> Iterator[Tuple[str, str]]:
+    """按格式逐行读取一个来源，约定同 iter_roster"""
+    kind = source_format(path)
+    if kind == 'csv':
+        return iter_roster(path, report=report, weights=weights, employee_ids=employee_ids)
+    report.path = path
+    report.encoding = kind
+    rows = _xlsx_rows(path) if kind == 'xlsx' else _parquet_rows(path)
+    return iter_table(rows, report, weights, employee_ids)
+
+
+def _pack(values: List[str]) -> Union[str, List[str]]:
+    """把字段拼接为一个字符串，字段本身含分隔符时保留列表"""
+    packed = FIELD_SEPARATOR.join(values)
+    if values and packed.count(FIELD_SEPARATOR) != len(values) - 1:
+        return values
+    return packed
+
+
+def _unpack(packed: Union[str, List[str]], count: int) -> List[str]:
+    if not isinstance(packed, str):
+        return packed
+    return packed.split(FIELD_SEPARATOR) if count else []
+
+
+class SourceRows:
+    """一个来源的解析结果
+
+    部门、姓名和身份键各拼接为一个字符串在进程间传递，序列化开销
+    远小于数百万个小字符串对象。
+    """
+
+    def __init__(self, path: str, report: LoadReport, departments: List[str], names: List[str],
+                 keys: List[str], weights: Optional[List[float]], normalized_count: int):
+        """初始化解析结果
+
+        Args:
+            path: 来源文件路径
+            report: 该来源的加载报告
+            departments: 规范化后的部门
+            names: 规范化后的姓名
+            keys: 身份键，见 IdentityIndex.prepare
+            weights: 各行权重，来源不含 weight 列时为None
+            normalized_count: 经规范化后文本发生变化的行数
+        """
+        self.path = path
+        self.report = report
+        self.count = len(keys)
+        self._departments = _pack(departments)
+        self._names = _pack(names)
+        self._keys = _pack(keys)
+        self.weights = weights
+        self.normalized_count = normalized_count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def unpack(self) -> Tuple[List[str], List[str], List[str]]:
+        """还原为部门、姓名和身份键列表"""
+        return (_unpack(self._departments, self.count), _unpack(self._names, self.count),
+                _unpack(self._keys, self.count))
+
+
+def parse_source(path: str) -> SourceRows:
+    """解析一个来源并完成规范化（在工作进程中执行）
+
+    Args:
+        path: 来源文件路径
+
+    Returns:
+        SourceRows: 解析结果
+    """
+    report = LoadReport()
+    weights: List[float] = []
+    employee_ids: List[str] = []
+    identity = IdentityIndex()
+    departments, names, keys = [], [], []
+    for department, name in _iter_source(path, report, weights, employee_ids):
+        department, name, key = identity.prepare(department, name,
+                                                 employee_ids.pop() if employee_ids else "")
+        departments.append(department)
+        names.append(name)
+        keys.append(key)
+    return SourceRows(path, report, departments, names, keys,
+                      weights if report.has_weight else None, identity.normalized_count)
+
+
+def iter_sources(paths: List[str], workers: Optional[int] = None) -> Iterator[SourceRows]:
+    """解析多个来源，按 paths 的顺序产出结果
+
+    各来源在进程池中并行解析，较大的文件先提交；只有一个来源或 workers 为1时
+    在当前进程中解析。
+
+    Args:
+        paths: 来源文件路径
+        workers: 工作进程数，默认为CPU核数
+
+    Yields:
+        SourceRows: 各来源的解析结果
+    """
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield parse_source(path)
+        return
+
+    # 延迟导入：单个来源时不需要进程池
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # 界面进程中有其他线程，使用 spawn 而不是 fork 创建工作进程
+    executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {}
+        for path in sorted(set(paths), key=os.path.getsize, reverse=True):
+            futures[path] = executor.submit(parse_source, path)
+        for path in paths:
+            yield futures[path].result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+# 一次移除的人数超过总人数的 1/BULK_REMOVE_RATIO 时整体重建已移除权重（需要 numpy）；
+# 人数少于 BULK_REMOVE_MIN_SIZE 的名单逐个更新已经足够快，不为此加载 numpy
+BULK_REMOVE_RATIO = 256
+BULK_REMOVE_MIN_SIZE = 200_000
+
+
+class WeightedPool:
+    """加权参与者池，包装 ParticipantPool 或 ColumnarPool
+
+    用树状数组（Fenwick tree）按参与者ID维护权重，每次按权重抽取并移除一人是 O(log n)，
+    无需每次重建累计权重。其余接口与被包装的参与者池一致，移除、恢复和重置时同步更新权重。
+
+    剩余权重 = 全部权重 - 已移除者的权重，两者各用一个树状数组维护。已移除权重树的
+    每个节点带有代数标记，代数与当前不同的节点视为0，因此重置只需把代数加一，是 O(1)。
+    """
+
+    def __init__(self, pool, weights: Sequence[float], rng: Optional[random.Random] = None):
+        """初始化加权参与者池
+
+        Args:
+            pool: 被包装的参与者池
+            weights: 按参与者ID排列的权重（票数），须为正数
+            rng: 随机数生成器，默认使用参与者池的生成器
+        """
+        if len(weights) != pool.total:
+            raise ValueError("权重数量与参与者数量不一致")
+        self.pool = pool
+        self.rng = rng if rng is not None else pool.rng
+        # 权重以 array('d') 保存，每人 8 字节，而不是列表中的 float 对象
+        self._weights = array('d', weights)  # 原始权重
+        self._tree = array('d', [0.0])       # 全部权重的 1-based 树状数组
+        self._removed = array('d', [0.0])    # 已移除者权重的树状数组，只有代数为当前的节点有效
+        self._stamps = array('I', [0])       # 已移除权重树各节点的代数
+        self._generation = 0
+        self._rebuild()
+        if len(pool) < pool.total:
+            self._remove_weights([pid for pid in range(pool.total) if pid not in pool])
+
+    def _rebuild(self) -> None:
+        """按原始权重重建树状数组并清空已移除权重，O(n)"""
+        tree = array('d', [0.0])
+        tree.extend(self._weights)
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._removed = array('d', [0.0]) * size
+        self._stamps = array('I', [self._generation]) * size
+
+    def _update(self, pid: int, delta: float) -> None:
+        i = pid + 1
+        size = len(self._tree)
+        while i < size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _update_removed(self, pid: int, delta: float) -> None:
+        removed, stamps, generation = self._removed, self._stamps, self._generation
+        i = pid + 1
+        size = len(removed)
+        while i < size:
+            if stamps[i] == generation:
+                removed[i] += delta
+            else:
+                stamps[i] = generation
+                removed[i] = delta
+            i += i & -i
+
+    def _remove_weights(self, pids: List[int]) -> None:
+        """把若干（互不相同的）参与者的权重记入已移除权重树
+
+        人数较多且安装了 numpy 时，先用这些权重整体建一棵树状数组（按层向量化，O(n)），
+        再逐节点加到已移除权重树上；否则逐个更新，O(k log n)。
+        """
+        size = len(self._removed)
+        if size <= BULK_REMOVE_MIN_SIZE or len(pids) * BULK_REMOVE_RATIO < size:
+            for pid in pids:
+                self._update_removed(pid, self._weights[pid])
+            return
+        from src.models import columnar_pool
+        if not columnar_pool.is_available():
+            for pid in pids:
+                self._update_removed(pid, self._weights[pid])
+            return
+
+        import numpy as np
+        nodes = np.asarray(pids, dtype=np.int64) + 1
+        delta = np.zeros(size)
+        delta[nodes] = np.frombuffer(self._weights, dtype=np.float64)[nodes - 1]
+        step = 1
+        while step < size:
+            # 最低位为 step 的节点加到父节点 i + step，同一层的父节点互不相同
+            children = np.arange(step, size - step, 2 * step)
+            delta[children + step] += delta[children]
+            step *= 2
+        removed = np.frombuffer(self._removed, dtype=np.float64)
+        stamps = np.frombuffer(self._stamps, dtype=f'u{self._stamps.itemsize}')
+        stale = stamps != self._generation
+        removed[stale] = 0.0
+        stamps[stale] = self._generation
+        removed += delta
+
+    def _node(self, i: int) -> float:
+        """树状数组第 i 个节点的剩余权重"""
+        if self._stamps[i] == self._generation:
+            return self._tree[i] - self._removed[i]
+        return self._tree[i]
+
+    def _prefix_all(self, count: int) -> float:
+        """前 count 个参与者的全部权重之和"""
+        total = 0.0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _prefix_removed(self, count: int) -> float:
+        """前 count 个参与者中已移除者的权重之和"""
+        total = 0.0
+        i = count
+        while i > 0:
+            if self._stamps[i] == self._generation:
+                total += self._removed[i]
+            i -= i & -i
+        return total
+
+    def _prefix(self, count: int) -> float:
+        """前 count 个参与者的剩余权重之和"""
+        return self._prefix_all(count) - self._prefix_removed(count)
+
+    def _find(self, target: float) -> int:
+        """找到累计剩余权重首次超过 target 的参与者ID，O(log n)"""
+        index = 0
+        size = len(self._tree)
+        step = 1 << (size - 1).bit_length()
+        while step:
+            nxt = index + step
+            if nxt < size:
+                value = self._node(nxt)
+                if value <= target:
+                    index = nxt
+                    target -= value
+            step >>= 1
+        return min(index, size - 2)
+
+    @property
+    def total_weight(self) -> float:
+        """剩余参与者的权重之和"""
+        return self._prefix(len(self._weights))
+
+    def weight(self, pid: int) -> float:
+        """参与者的原始权重"""
+        return self._weights[pid]
+
+    def add(self, department: str, name: str, weight: float = 1.0) -> int:
+        """添加一位参与者
+
+        Args:
+            department: 部门
+            name: 姓名
+            weight: 权重（票数）
+
+        Returns:
+            int: 新参与者的ID
+        """
+        pid = self.pool.add(department, name)
+        weight = float(weight)
+        # 新节点覆盖区间 (i - lowbit(i), i]，其中只有自身以外的部分已在树中；
+        # 新参与者在剩余池中，已移除权重树的新节点不含自身
+        i = len(self._tree)
+        lower = i - (i & -i)
+        self._weights.append(weight)
+        self._tree.append(weight + self._prefix_all(i - 1) - self._prefix_all(lower))
+        self._removed.append(self._prefix_removed(i - 1) - self._prefix_removed(lower))
+        self._stamps.append(self._generation)
+        return pid
+
+    def add_tickets(self, pid: int, tickets: float) -> None:
+        """增加参与者的权重（票数），O(log n)
+
+        Args:
+            pid: 参与者ID
+            tickets: 增加的票数
+        """
+        self._weights[pid] += tickets
+        self._update(pid, tickets)
+        if pid not in self.pool:
+            self._update_removed(pid, tickets)
+
+    def extend(self, rows: Iterable[Tuple[str, str]]) -> None:
+        """批量添加权重为1的参与者
+
+        Args:
+            rows: (部门, 姓名) 序列
+        """
+        for department, name in rows:
+            self.add(department, name)
+
+    def __len__(self) -> int:
+        return len(self.pool)
+
+    def __contains__(self, pid: int) -> bool:
+        return pid in self.pool
+
+    @property
+    def total(self) -> int:
+        return self.pool.total
+
+    def get(self, pid: int) -> Tuple[str, str]:
+        return self.pool.get(pid)
+
+    def ids(self) -> List[int]:
+        return self.pool.ids()
+
+    def remove(self, pid: int) -> None:
+        """从剩余池中移除参与者，O(log n)"""
+        self.pool.remove(pid)
+        self._update_removed(pid, self._weights[pid])
+
+    def remove_many(self, pids: List[int]) -> None:
+        """批量移除参与者，忽略已不在池中的ID，O(k log n)；人数很多时为 O(n)，见 _remove_weights"""
+        present = [pid for pid in dict.fromkeys(pids) if pid in self.pool]
+        self.pool.remove_many(present)
+        self._remove_weights(present)
+
+    def restore(self, pid: int) -> None:
+        """将已移除的参与者放回剩余池，O(log n)"""
+        if pid in self.pool:
+            return
+        self.pool.restore(pid)
+        self._update_removed(pid, -self._weights[pid])
+
+    def _pick(self, rng: Optional[random.Random] = None) -> int:
+        """按权重抽取一位剩余参与者（不移除）"""
+        rng = rng or self.rng
+        while True:
+            pid = self._find(rng.random() * self.total_weight)
+            # 浮点累计误差可能落到已移除者上，重新抽取即可
+            if pid in self.pool:
+                return pid
+
+    def take(self, count: int) -> List[int]:
+        """按权重无放回地抽取若干参与者ID并移除，O(k log n)
+
+        Args:
+            count: 抽取数量
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        chosen = []
+        for _ in range(min(count, len(self.pool))):
+            pid = self._pick()
+            self.remove(pid)
+            chosen.append(pid)
+        return chosen
+
+    def sample(self, count: int, rng: Optional[random.Random] = None) -> List[int]:
+        """按权重无放回地抽取若干参与者ID，不移除也不修改权重树
+
+        逐个按权重抽取并跳过重复者；重复过多（接近抽完全部剩余参与者）时，
+        剩余名额从未选中者中均匀补足。
+
+        Args:
+            count: 抽取数量
+            rng: 随机数生成器，默认使用参与者池的生成器
+
+        Returns:
+            List[int]: 参与者ID列表
+        """
+        rng = rng or self.rng
+        count = min(count, len(self.pool))
+        chosen: List[int] = []
+        seen = set()
+        attempts = 0
+        while len(chosen) < count and attempts < 4 * count + 16:
+            attempts += 1
+            pid = self._pick(rng)
+            if pid not in seen:
+                seen.add(pid)
+                chosen.append(pid)
+        if len(chosen) < count:
+            rest = [pid for pid in self.pool.ids() if pid not in seen]
+            chosen.extend(rng.sample(rest, count - len(chosen)))
+        return chosen
+
+    def reset(self, canonical: bool = False) -> None:
+        """恢复所有参与者到剩余池，O(1)：代数加一即清空已移除权重
+
+        Args:
+            canonical: 见 ParticipantPool.reset；按权重抽样本身与排列无关
+        """
+        self.pool.reset(canonical)
+        self._generation += 1
+
+    def clear(self) -> None:
+        """清空参与者池"""
+        self.pool.clear()
+        self._weights = array('d')
+        self._rebuild()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from src.cli import main
+
+
+def write_roster(path, count=10):
+    path.write_text("department,name\n" + "".join(f"D{i % 3},N{i}\n" for i in range(count)), encoding="utf-8")
+    return str(path)
+
+
+def test_draw_writes_to_output_dir(tmp_path, monkeypatch):
+    roster = write_roster(tmp_path / "p.csv")
+    monkeypatch.chdir(tmp_path)
+    assert main(["draw", "--roster", roster, "--rounds", "2", "--seed", "1"]) == 0
+    assert sorted(path.name for path in (tmp_path / "output").iterdir()) == [
+        "draw_journal.jsonl", "history.sqlite3", "round_1.csv"]
+
+
+def test_draw_with_output_file_skips_round_files(tmp_path):
+    roster = write_roster(tmp_path / "p.csv")
+    out_dir = tmp_path / "state"
+    assert main(["draw", "--roster", roster, "--rounds", "2,1", "-o", str(tmp_path / "w.csv"),
+                 "--output-dir", str(out_dir)]) == 0
+    assert len((tmp_path / "w.csv").read_text(encoding="utf-8").splitlines()) == 4
+    assert not list(out_dir.glob("round_*.csv"))
+
+
+def test_draw_reports_unwritable_output_dir(tmp_path, capsys):
+    roster = write_roster(tmp_path / "p.csv")
+    blocker = tmp_path / "blocker"
+    blocker.write_text("", encoding="utf-8")
+    assert main(["draw", "--roster", roster, "--rounds", "2", "--output-dir", str(blocker)]) == 1
+    assert main(["draw", "--roster", roster, "--rounds", "2", "--output-dir", str(blocker / "sub")]) == 1
+    assert "Traceback" not in capsys.readouterr().err
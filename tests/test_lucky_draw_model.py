@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+
+from src.models.eligibility import PastWinners
+from src.models.history_store import HistoryStore
+from src.models.lucky_draw_model import LuckyDrawModel
+
+
+def write_roster(path, rows, header="department,name"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(header + "\n" + "".join(f"{row}\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def open_model(tmp_path, roster, **kwargs):
+    return LuckyDrawModel(roster, str(tmp_path / "journal.jsonl"),
+                          history_path=str(tmp_path / "history.sqlite3"), **kwargs)
+
+
+def test_failed_import_keeps_history_event(tmp_path):
+    roster = write_roster(tmp_path / "data" / "p.csv", [f"D{i % 3},N{i}" for i in range(30)])
+    bad = write_roster(tmp_path / "data" / "bad.csv", ["x,y"], header="a,b")
+    model = open_model(tmp_path, roster, exclusion=PastWinners())
+    model.draw(3)
+    first_round = list(model.winner_ids)
+
+    assert not model.add_csv_path(bad)
+    assert model.csv_path == roster
+    model.draw(3)
+    # 同一活动的获奖者不算作往届获奖者
+    assert not any(pid in model.excluded for pid in first_round)
+    model.close()
+
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    events = history.events()
+    history.close()
+    assert len(events) == 1
+    assert events[0]["rounds"] == 2
+
+
+def test_import_ends_history_event(tmp_path):
+    roster = write_roster(tmp_path / "data" / "p.csv", [f"D{i % 3},N{i}" for i in range(30)])
+    model = open_model(tmp_path, roster, exclusion=PastWinners())
+    model.draw(5)
+    winners = list(model.winners)
+
+    assert model.add_csv_path(roster)
+    assert model.winners == [] and model.current_round == 0
+    # 上一次活动的获奖者在新活动中被排除
+    assert len(model.excluded) == 5
+    assert sorted(model.pool.get(pid) for pid in model.excluded.ids()) == sorted(winners)
+    model.close()
+
+
+def test_parse_sources_leaves_model_unchanged(tmp_path):
+    roster = write_roster(tmp_path / "data" / "p.csv", [f"D{i % 3},N{i}" for i in range(30)])
+    other = write_roster(tmp_path / "data" / "q.csv", [f"E,M{i}" for i in range(5)])
+    model = open_model(tmp_path, roster)
+    model.draw(3)
+    pool, identity, winners = model.pool, model.identity, list(model.winners)
+
+    loaded = model.parse_sources([other])
+    assert loaded is not None and loaded.pool.total == 5
+    assert model.pool is pool and model.identity is identity and model.winners == winners
+    assert model.csv_path == roster
+
+    model.install_sources(loaded)
+    assert model.pool is loaded.pool and model.csv_path == other
+    assert model.winners == [] and model.current_round == 0
+    model.close()
+
+
+def test_history_written_off_caller_thread(tmp_path):
+    roster = write_roster(tmp_path / "data" / "p.csv", [f"D{i % 3},N{i}" for i in range(30)])
+    model = open_model(tmp_path, roster)
+    threads = []
+    record_rounds = model.history.record_rounds
+
+    def spy(event_id, rounds):
+        threads.append(threading.current_thread())
+        record_rounds(event_id, rounds)
+
+    model.history.record_rounds = spy
+    model.draw(3)
+    model.draw(2)
+    model.close()
+    assert threads and threading.current_thread() not in threads
+
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    events = history.events()
+    history.close()
+    assert events[0]["rounds"] == 2 and events[0]["winners"] == 5
+
+
+def test_shrunk_roster_reported_once(tmp_path, capsys):
+    roster = write_roster(tmp_path / "data" / "p.csv", [f"D{i % 3},N{i}" for i in range(30)])
+    model = open_model(tmp_path, roster)
+    write_roster(tmp_path / "data" / "p.csv", ["D0,N0"])
+    assert model.ingest_appended() == 0
+    assert model.ingest_appended() == 0
+    assert capsys.readouterr().out.count("名单文件已被替换或截断") == 1
+    model.close()
+
+
+def test_redraw_absent_by_position(tmp_path):
+    roster = write_roster(tmp_path / "data" / "p.csv", [f"D{i % 3},N{i}" for i in range(30)])
+    model = open_model(tmp_path, roster)
+    model.draw(3)
+    model.draw(2)
+    absent = model.winner_ids[3]
+
+    winner = model.redraw_absent(3)
+    assert winner is not None and model.winners[3] == winner
+    assert model.winner_ids[3] != absent and absent not in model.pool
+    assert model.round_absent == [[], [absent]]
+    assert model.redraw_absent(len(model.winner_ids)) is None
+    model.close()
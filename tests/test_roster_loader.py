@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from src.models.roster_loader import LoadReport, iter_roster, read_appended
+
+
+def test_unterminated_tail_is_read_once_complete(tmp_path):
+    path = tmp_path / "p.csv"
+    path.write_bytes(b"department,name\nD1,A\nD2,Zha")
+    report = LoadReport()
+
+    # 末行可能尚未写完，不作为参与者读入
+    assert list(iter_roster(str(path), report=report)) == [("D1", "A")]
+    assert report.end_offset == len(b"department,name\nD1,A\n") and report.partial_bytes == len(b"D2,Zha")
+    assert list(read_appended(report)) == []
+
+    with open(path, "ab") as f:
+        f.write(b"ng San\nD3,B\n")
+    assert list(read_appended(report)) == [("D2", "Zhang San"), ("D3", "B")]
+    assert report.partial_bytes == 0 and report.line_num == 4